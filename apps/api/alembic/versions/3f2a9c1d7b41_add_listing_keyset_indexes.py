@@ -0,0 +1,32 @@
+"""Add composite indexes for keyset pagination of public listings
+
+Revision ID: 3f2a9c1d7b41
+Revises: ea6d1be99847
+Create Date: 2026-10-17 09:12:40.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f2a9c1d7b41'
+down_revision = 'ea6d1be99847'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_properties_published_created_at_id', 'properties', ['created_at', 'id'],
+        unique=False, postgresql_where=sa.text('published'),
+    )
+    op.create_index(
+        'ix_properties_published_price_id', 'properties', ['price_amount', 'id'],
+        unique=False, postgresql_where=sa.text('published'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_properties_published_price_id', table_name='properties')
+    op.drop_index('ix_properties_published_created_at_id', table_name='properties')
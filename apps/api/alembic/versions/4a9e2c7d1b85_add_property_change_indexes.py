@@ -0,0 +1,26 @@
+"""Index property change timestamps for the map index polls
+
+Revision ID: 4a9e2c7d1b85
+Revises: c3f8a1d6b572
+Create Date: 2026-10-17 19:02:44.518903
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4a9e2c7d1b85'
+down_revision = 'c3f8a1d6b572'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_properties_updated_at'), 'properties', ['updated_at'], unique=False)
+    op.create_index(op.f('ix_properties_pois_updated_at'), 'properties', ['pois_updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_properties_pois_updated_at'), table_name='properties')
+    op.drop_index(op.f('ix_properties_updated_at'), table_name='properties')
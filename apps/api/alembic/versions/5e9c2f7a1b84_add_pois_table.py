@@ -0,0 +1,38 @@
+"""Add pois table for the local OpenStreetMap POI store
+
+Revision ID: 5e9c2f7a1b84
+Revises: d41f6a9b3e07
+Create Date: 2026-10-17 12:41:09.518302
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e9c2f7a1b84'
+down_revision = 'd41f6a9b3e07'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('pois',
+    sa.Column('id', sa.String(length=32), nullable=False),
+    sa.Column('category', sa.String(length=50), nullable=False),
+    sa.Column('name', sa.String(length=500), nullable=False),
+    sa.Column('name_en', sa.String(length=500), nullable=True),
+    sa.Column('name_ar', sa.String(length=500), nullable=True),
+    sa.Column('lat', sa.Float(), nullable=False),
+    sa.Column('lng', sa.Float(), nullable=False),
+    sa.Column('poi_type', sa.String(length=100), nullable=True),
+    sa.Column('address', sa.String(length=500), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_pois_category'), 'pois', ['category'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_pois_category'), table_name='pois')
+    op.drop_table('pois')
@@ -0,0 +1,62 @@
+"""Add search analytics rollup tables
+
+Revision ID: 7b3d9e5f2a61
+Revises: e8b1c5a7d324
+Create Date: 2026-10-17 16:12:40.218734
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b3d9e5f2a61'
+down_revision = 'e8b1c5a7d324'
+branch_labels = None
+depends_on = None
+
+
+def _create_rollup_table(name: str) -> None:
+    op.create_table(
+        name,
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('query_normalized', sa.String(length=500), nullable=False),
+        sa.Column('filters_key', sa.String(length=255), nullable=False),
+        sa.Column('searches', sa.Integer(), nullable=False),
+        sa.Column('zero_results', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('bucket_start', 'query_normalized', 'filters_key'),
+    )
+
+
+def upgrade() -> None:
+    op.add_column('search_analytics', sa.Column('query_normalized', sa.String(length=500), nullable=True))
+    op.add_column('search_analytics', sa.Column('filters_key', sa.String(length=255), nullable=True))
+    
+    # Existing rows: approximate app.core.text.normalize_query in SQL; new
+    # rows are normalized in Python by the tracking flusher
+    op.execute(
+        "UPDATE search_analytics SET "
+        "query_normalized = nullif(lower(btrim(regexp_replace(normalize_ar(query), '[[:space:][:punct:]]+', ' ', 'g'))), ''), "
+        "filters_key = CASE WHEN jsonb_typeof(filters) = 'object' THEN ("
+        "  SELECT left(string_agg(key, '+' ORDER BY key), 255) FROM jsonb_each(filters) "
+        "  WHERE value NOT IN ('null', '\"\"', '[]', '{}')"
+        ") END"
+    )
+    
+    _create_rollup_table('search_rollups_hourly')
+    _create_rollup_table('search_rollups_daily')
+    op.create_table(
+        'rollup_watermarks',
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('watermark', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('rollup_watermarks')
+    op.drop_table('search_rollups_daily')
+    op.drop_table('search_rollups_hourly')
+    op.drop_column('search_analytics', 'filters_key')
+    op.drop_column('search_analytics', 'query_normalized')
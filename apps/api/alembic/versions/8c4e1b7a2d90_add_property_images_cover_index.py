@@ -0,0 +1,27 @@
+"""Add covering index for the first image of each property
+
+Revision ID: 8c4e1b7a2d90
+Revises: 3f2a9c1d7b41
+Create Date: 2026-10-17 10:03:11.584312
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c4e1b7a2d90'
+down_revision = '3f2a9c1d7b41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_property_images_property_id_sort_order', 'property_images', ['property_id', 'sort_order'],
+        unique=False, postgresql_include=['file_key'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_property_images_property_id_sort_order', table_name='property_images')
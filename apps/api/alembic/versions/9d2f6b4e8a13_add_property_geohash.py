@@ -0,0 +1,76 @@
+"""Add a geohash column to properties for radius searches
+
+Revision ID: 9d2f6b4e8a13
+Revises: 4a9e2c7d1b85
+Create Date: 2026-10-17 20:14:09.672315
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d2f6b4e8a13'
+down_revision = '4a9e2c7d1b85'
+branch_labels = None
+depends_on = None
+
+# Frozen copies of the app.core.geo constants as of this revision
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 9
+
+
+def upgrade() -> None:
+    # Same bisection as app.core.geo.geohash_encode, so prefixes computed in
+    # Python match the stored hashes
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION geohash_encode(lat numeric, lng numeric, hash_length integer)
+        RETURNS text LANGUAGE plpgsql IMMUTABLE STRICT PARALLEL SAFE AS $$
+        DECLARE
+            lat_low float8 := -90;
+            lat_high float8 := 90;
+            lng_low float8 := -180;
+            lng_high float8 := 180;
+            mid float8;
+            even boolean := true;
+            bits integer := 0;
+            code integer := 0;
+            hash text := '';
+        BEGIN
+            WHILE length(hash) < hash_length LOOP
+                IF even THEN
+                    mid := (lng_low + lng_high) / 2;
+                    IF lng::float8 >= mid THEN code := code * 2 + 1; lng_low := mid;
+                    ELSE code := code * 2; lng_high := mid;
+                    END IF;
+                ELSE
+                    mid := (lat_low + lat_high) / 2;
+                    IF lat::float8 >= mid THEN code := code * 2 + 1; lat_low := mid;
+                    ELSE code := code * 2; lat_high := mid;
+                    END IF;
+                END IF;
+                even := NOT even;
+                bits := bits + 1;
+                IF bits = 5 THEN
+                    hash := hash || substr('{GEOHASH_ALPHABET}', code + 1, 1);
+                    bits := 0;
+                    code := 0;
+                END IF;
+            END LOOP;
+            RETURN hash;
+        END
+        $$
+    """)
+    
+    # "C" collation so prefix ranges (geohash >= 'sv9j' AND geohash < 'sv9j~') use the B-tree
+    op.add_column('properties', sa.Column(
+        'geohash', sa.String(length=12, collation='C'),
+        sa.Computed(f'geohash_encode(lat, lng, {GEOHASH_PRECISION})', persisted=True), nullable=True,
+    ))
+    op.create_index(op.f('ix_properties_geohash'), 'properties', ['geohash'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_properties_geohash'), table_name='properties')
+    op.drop_column('properties', 'geohash')
+    op.execute("DROP FUNCTION IF EXISTS geohash_encode(numeric, numeric, integer)")
@@ -0,0 +1,31 @@
+"""Add properties.pois_updated_at and a POI bounding-box index for the batched POI refresh job
+
+Revision ID: a3f8d2c6e915
+Revises: 5e9c2f7a1b84
+Create Date: 2026-10-17 13:02:44.170256
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3f8d2c6e915'
+down_revision = '5e9c2f7a1b84'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('properties', sa.Column('pois_updated_at', sa.DateTime(), nullable=True))
+    # Properties that already have cached POIs count as refreshed now
+    op.execute(
+        "UPDATE properties SET pois_updated_at = now() "
+        "WHERE id IN (SELECT DISTINCT property_id FROM property_pois)"
+    )
+    op.create_index('ix_pois_lat_lng', 'pois', ['lat', 'lng'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_pois_lat_lng', table_name='pois')
+    op.drop_column('properties', 'pois_updated_at')
@@ -0,0 +1,35 @@
+"""Add search_analytics.inserted_at for the rollup watermark
+
+Revision ID: b5e7c2a9d4f1
+Revises: 9d2f6b4e8a13
+Create Date: 2026-10-18 09:12:44.215630
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5e7c2a9d4f1'
+down_revision = '9d2f6b4e8a13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('search_analytics', sa.Column('inserted_at', sa.DateTime(), nullable=True))
+    # The rollup watermark has so far been on created_at; copying it keeps the
+    # rows already counted behind the watermark and the others ahead of it
+    op.execute('UPDATE search_analytics SET inserted_at = created_at')
+    op.alter_column(
+        'search_analytics',
+        'inserted_at',
+        nullable=False,
+        server_default=sa.text("(now() AT TIME ZONE 'utc')"),
+    )
+    op.create_index('ix_search_analytics_inserted_at', 'search_analytics', ['inserted_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_search_analytics_inserted_at', table_name='search_analytics')
+    op.drop_column('search_analytics', 'inserted_at')
@@ -0,0 +1,36 @@
+"""Add search_outbox table for search index synchronization
+
+Revision ID: b7d3e5f1a2c6
+Revises: 8c4e1b7a2d90
+Create Date: 2026-10-17 11:26:52.904117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d3e5f1a2c6'
+down_revision = '8c4e1b7a2d90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'search_outbox',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('entity_type', sa.String(length=20), nullable=False),
+        sa.Column('entity_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_search_outbox_entity_id'), 'search_outbox', ['entity_id'], unique=False)
+    op.create_index(op.f('ix_search_outbox_created_at'), 'search_outbox', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_search_outbox_created_at'), table_name='search_outbox')
+    op.drop_index(op.f('ix_search_outbox_entity_id'), table_name='search_outbox')
+    op.drop_table('search_outbox')
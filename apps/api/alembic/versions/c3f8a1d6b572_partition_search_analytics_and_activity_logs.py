@@ -0,0 +1,91 @@
+"""Partition search_analytics and activity_logs by month
+
+Revision ID: c3f8a1d6b572
+Revises: 7b3d9e5f2a61
+Create Date: 2026-10-17 18:05:12.407391
+
+"""
+from datetime import date, datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3f8a1d6b572'
+down_revision = '7b3d9e5f2a61'
+branch_labels = None
+depends_on = None
+
+# Months of partitions created ahead; the worker keeps extending them
+MONTHS_AHEAD = 3
+
+INDEXES = {
+    'search_analytics': ['created_at', 'query'],
+    'activity_logs': ['activity_type', 'created_at', 'resource_id', 'resource_type', 'user_id'],
+}
+
+
+# Frozen copies of the app.db.partitions helpers, so later changes to them
+# don't alter this revision
+def _month_start(value) -> date:
+    return date(value.year, value.month, 1)
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_partitions(table: str, first: date, last: date) -> None:
+    """Create the monthly partitions <table>_yYYYYmMM from `first` through `last`."""
+    month = first
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE {table}_y{month.year}m{month.month:02d} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+        )
+        month = _add_months(month, 1)
+
+
+def _rebuild(table: str, partitioned: bool) -> None:
+    """Copy `table` into a new partitioned (or plain) table of the same columns and swap it in."""
+    old = f'{table}_old'
+    for column in INDEXES[table]:
+        op.drop_index(f'ix_{table}_{column}', table_name=table)
+    op.execute(f'ALTER TABLE {table} RENAME TO {old}')
+    op.execute(f'ALTER TABLE {old} DROP CONSTRAINT {table}_pkey')
+    
+    if partitioned:
+        op.execute(f'CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)')
+        # The partition key has to be part of the primary key
+        op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id, created_at)')
+        
+        bind = op.get_bind()
+        this_month = _month_start(datetime.utcnow())
+        first = bind.execute(sa.text(f'SELECT min(created_at) FROM {old}')).scalar()
+        _create_partitions(table, min(_month_start(first), this_month) if first else this_month, _add_months(this_month, MONTHS_AHEAD))
+    else:
+        op.execute(f'CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS)')
+        op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id)')
+    
+    op.execute(f'INSERT INTO {table} SELECT * FROM {old}')
+    op.execute(f'DROP TABLE {old}')  # Drops the old partitions too when going back
+    
+    if table == 'activity_logs':
+        op.create_foreign_key('activity_logs_user_id_fkey', 'activity_logs', 'users', ['user_id'], ['id'])
+    # Indexes on the parent are created on every partition, current and future
+    for column in INDEXES[table]:
+        op.create_index(f'ix_{table}_{column}', table, [column], unique=False)
+
+
+def upgrade() -> None:
+    # Rewrites both tables under an exclusive lock; run during a quiet period
+    # (tracked searches wait in the Redis buffer meanwhile)
+    _rebuild('search_analytics', partitioned=True)
+    _rebuild('activity_logs', partitioned=True)
+
+
+def downgrade() -> None:
+    _rebuild('activity_logs', partitioned=False)
+    _rebuild('search_analytics', partitioned=False)
@@ -0,0 +1,63 @@
+"""Replace per-property POI copies with property_poi_links
+
+Revision ID: c62e4b9d8f13
+Revises: a3f8d2c6e915
+Create Date: 2026-10-17 13:31:52.604418
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'c62e4b9d8f13'
+down_revision = 'a3f8d2c6e915'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('property_poi_links',
+    sa.Column('property_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('poi_id', sa.String(length=32), nullable=False),
+    sa.Column('distance', sa.Float(), nullable=False),
+    sa.Column('rank', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['property_id'], ['properties.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['poi_id'], ['pois.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('property_id', 'poi_id')
+    )
+    op.create_index(op.f('ix_property_poi_links_poi_id'), 'property_poi_links', ['poi_id'], unique=False)
+
+    # The old copies carry no OSM ids to link; recompute them with
+    # `python -m app.scripts.refresh_pois`
+    op.drop_index(op.f('ix_property_pois_category'), table_name='property_pois')
+    op.drop_index(op.f('ix_property_pois_property_id'), table_name='property_pois')
+    op.drop_table('property_pois')
+    op.execute("UPDATE properties SET pois_updated_at = NULL")
+
+
+def downgrade() -> None:
+    op.create_table('property_pois',
+    sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('property_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('category', sa.String(length=50), nullable=False),
+    sa.Column('name', sa.String(length=500), nullable=False),
+    sa.Column('name_en', sa.String(length=500), nullable=True),
+    sa.Column('name_ar', sa.String(length=500), nullable=True),
+    sa.Column('lat', sa.Numeric(precision=10, scale=8), nullable=False),
+    sa.Column('lng', sa.Numeric(precision=11, scale=8), nullable=False),
+    sa.Column('distance', sa.Numeric(precision=10, scale=1), nullable=False),
+    sa.Column('poi_type', sa.String(length=100), nullable=True),
+    sa.Column('address', sa.String(length=500), nullable=True),
+    sa.Column('sort_order', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['property_id'], ['properties.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_property_pois_property_id'), 'property_pois', ['property_id'], unique=False)
+    op.create_index(op.f('ix_property_pois_category'), 'property_pois', ['category'], unique=False)
+    op.execute("UPDATE properties SET pois_updated_at = NULL")
+    op.drop_index(op.f('ix_property_poi_links_poi_id'), table_name='property_poi_links')
+    op.drop_table('property_poi_links')
@@ -0,0 +1,73 @@
+"""Add Arabic-normalized full-text search columns and indexes
+
+Revision ID: d41f6a9b3e07
+Revises: b7d3e5f1a2c6
+Create Date: 2026-10-17 12:08:37.215630
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'd41f6a9b3e07'
+down_revision = 'b7d3e5f1a2c6'
+branch_labels = None
+depends_on = None
+
+# Frozen copy of the app.core.text folding as of this revision, so later
+# changes to it don't alter what this migration creates
+ARABIC_FOLD_FROM = "أإآٱىةؤئ"
+ARABIC_FOLD_TO = "اااايهوي"
+ARABIC_STRIP = "\u064b\u064c\u064d\u064e\u064f\u0650\u0651\u0652\u0670\u0640"  # Harakat, superscript alef, tatweel
+
+PROPERTY_SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(title_en, '')), 'A') || "
+    "setweight(to_tsvector('simple', normalize_ar(coalesce(title_ar, ''))), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description_en, '')), 'C') || "
+    "setweight(to_tsvector('simple', normalize_ar(coalesce(description_ar, ''))), 'C')"
+)
+
+LOCATION_SEARCH_VECTOR = (
+    "to_tsvector('english', coalesce(name_en, '')) || "
+    "to_tsvector('simple', normalize_ar(coalesce(name_ar, '')))"
+)
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    
+    # Same folding as app.core.text.normalize_arabic: translate() maps the
+    # variant letters and drops characters past the end of the target list
+    op.execute(
+        "CREATE OR REPLACE FUNCTION normalize_ar(value text) RETURNS text "
+        "LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE AS "
+        f"$$ SELECT translate(value, '{ARABIC_FOLD_FROM}{ARABIC_STRIP}', '{ARABIC_FOLD_TO}') $$"
+    )
+    
+    op.add_column('properties', sa.Column(
+        'search_vector', postgresql.TSVECTOR(),
+        sa.Computed(PROPERTY_SEARCH_VECTOR, persisted=True), nullable=True,
+    ))
+    op.create_index('ix_properties_search_vector', 'properties', ['search_vector'], unique=False, postgresql_using='gin')
+    
+    op.add_column('locations', sa.Column(
+        'search_vector', postgresql.TSVECTOR(),
+        sa.Computed(LOCATION_SEARCH_VECTOR, persisted=True), nullable=True,
+    ))
+    op.create_index('ix_locations_search_vector', 'locations', ['search_vector'], unique=False, postgresql_using='gin')
+    
+    # Substring / typo-tolerant title matching (ILIKE uses these)
+    op.execute("CREATE INDEX ix_properties_title_en_trgm ON properties USING gin (title_en gin_trgm_ops)")
+    op.execute("CREATE INDEX ix_properties_title_ar_trgm ON properties USING gin (normalize_ar(title_ar) gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_properties_title_ar_trgm', table_name='properties')
+    op.drop_index('ix_properties_title_en_trgm', table_name='properties')
+    op.drop_index('ix_locations_search_vector', table_name='locations')
+    op.drop_column('locations', 'search_vector')
+    op.drop_index('ix_properties_search_vector', table_name='properties')
+    op.drop_column('properties', 'search_vector')
+    op.execute("DROP FUNCTION IF EXISTS normalize_ar(text)")
@@ -0,0 +1,98 @@
+"""Add neighborhood score columns to properties
+
+Revision ID: e8b1c5a7d324
+Revises: c62e4b9d8f13
+Create Date: 2026-10-17 14:05:27.331960
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8b1c5a7d324'
+down_revision = 'c62e4b9d8f13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('properties', sa.Column('schools_nearest_m', sa.Float(), nullable=True))
+    op.add_column('properties', sa.Column('schools_within_500m', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('properties', sa.Column('schools_within_1km', sa.Integer(), server_default='0', nullable=False))
+    op.create_index(op.f('ix_properties_schools_nearest_m'), 'properties', ['schools_nearest_m'], unique=False)
+    op.add_column('properties', sa.Column('mosques_nearest_m', sa.Float(), nullable=True))
+    op.add_column('properties', sa.Column('mosques_within_500m', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('properties', sa.Column('mosques_within_1km', sa.Integer(), server_default='0', nullable=False))
+    op.create_index(op.f('ix_properties_mosques_nearest_m'), 'properties', ['mosques_nearest_m'], unique=False)
+    op.add_column('properties', sa.Column('hospitals_nearest_m', sa.Float(), nullable=True))
+    op.add_column('properties', sa.Column('hospitals_within_500m', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('properties', sa.Column('hospitals_within_1km', sa.Integer(), server_default='0', nullable=False))
+    op.create_index(op.f('ix_properties_hospitals_nearest_m'), 'properties', ['hospitals_nearest_m'], unique=False)
+    op.add_column('properties', sa.Column('supermarkets_nearest_m', sa.Float(), nullable=True))
+    op.add_column('properties', sa.Column('supermarkets_within_500m', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('properties', sa.Column('supermarkets_within_1km', sa.Integer(), server_default='0', nullable=False))
+    op.create_index(op.f('ix_properties_supermarkets_nearest_m'), 'properties', ['supermarkets_nearest_m'], unique=False)
+    op.add_column('properties', sa.Column('banks_nearest_m', sa.Float(), nullable=True))
+    op.add_column('properties', sa.Column('banks_within_500m', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('properties', sa.Column('banks_within_1km', sa.Integer(), server_default='0', nullable=False))
+    op.create_index(op.f('ix_properties_banks_nearest_m'), 'properties', ['banks_nearest_m'], unique=False)
+    op.add_column('properties', sa.Column('restaurants_nearest_m', sa.Float(), nullable=True))
+    op.add_column('properties', sa.Column('restaurants_within_500m', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('properties', sa.Column('restaurants_within_1km', sa.Integer(), server_default='0', nullable=False))
+    op.create_index(op.f('ix_properties_restaurants_nearest_m'), 'properties', ['restaurants_nearest_m'], unique=False)
+    op.add_column('properties', sa.Column('parks_nearest_m', sa.Float(), nullable=True))
+    op.add_column('properties', sa.Column('parks_within_500m', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('properties', sa.Column('parks_within_1km', sa.Integer(), server_default='0', nullable=False))
+    op.create_index(op.f('ix_properties_parks_nearest_m'), 'properties', ['parks_nearest_m'], unique=False)
+    op.add_column('properties', sa.Column('gas_stations_nearest_m', sa.Float(), nullable=True))
+    op.add_column('properties', sa.Column('gas_stations_within_500m', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('properties', sa.Column('gas_stations_within_1km', sa.Integer(), server_default='0', nullable=False))
+    op.create_index(op.f('ix_properties_gas_stations_nearest_m'), 'properties', ['gas_stations_nearest_m'], unique=False)
+    op.add_column('properties', sa.Column('walkability_score', sa.Integer(), server_default='0', nullable=False))
+    op.create_index(op.f('ix_properties_walkability_score'), 'properties', ['walkability_score'], unique=False)
+    # Keyset pagination of sort_by=walkability, like the other sort keys
+    op.create_index(
+        'ix_properties_published_walkability_id', 'properties', ['walkability_score', 'id'],
+        unique=False, postgresql_where=sa.text('published'),
+    )
+    # Scores are computed with the POI links; recompute everything
+    op.execute("UPDATE properties SET pois_updated_at = NULL")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_properties_published_walkability_id', table_name='properties')
+    op.drop_index(op.f('ix_properties_walkability_score'), table_name='properties')
+    op.drop_column('properties', 'walkability_score')
+    op.drop_index(op.f('ix_properties_gas_stations_nearest_m'), table_name='properties')
+    op.drop_column('properties', 'gas_stations_within_1km')
+    op.drop_column('properties', 'gas_stations_within_500m')
+    op.drop_column('properties', 'gas_stations_nearest_m')
+    op.drop_index(op.f('ix_properties_parks_nearest_m'), table_name='properties')
+    op.drop_column('properties', 'parks_within_1km')
+    op.drop_column('properties', 'parks_within_500m')
+    op.drop_column('properties', 'parks_nearest_m')
+    op.drop_index(op.f('ix_properties_restaurants_nearest_m'), table_name='properties')
+    op.drop_column('properties', 'restaurants_within_1km')
+    op.drop_column('properties', 'restaurants_within_500m')
+    op.drop_column('properties', 'restaurants_nearest_m')
+    op.drop_index(op.f('ix_properties_banks_nearest_m'), table_name='properties')
+    op.drop_column('properties', 'banks_within_1km')
+    op.drop_column('properties', 'banks_within_500m')
+    op.drop_column('properties', 'banks_nearest_m')
+    op.drop_index(op.f('ix_properties_supermarkets_nearest_m'), table_name='properties')
+    op.drop_column('properties', 'supermarkets_within_1km')
+    op.drop_column('properties', 'supermarkets_within_500m')
+    op.drop_column('properties', 'supermarkets_nearest_m')
+    op.drop_index(op.f('ix_properties_hospitals_nearest_m'), table_name='properties')
+    op.drop_column('properties', 'hospitals_within_1km')
+    op.drop_column('properties', 'hospitals_within_500m')
+    op.drop_column('properties', 'hospitals_nearest_m')
+    op.drop_index(op.f('ix_properties_mosques_nearest_m'), table_name='properties')
+    op.drop_column('properties', 'mosques_within_1km')
+    op.drop_column('properties', 'mosques_within_500m')
+    op.drop_column('properties', 'mosques_nearest_m')
+    op.drop_index(op.f('ix_properties_schools_nearest_m'), table_name='properties')
+    op.drop_column('properties', 'schools_within_1km')
+    op.drop_column('properties', 'schools_within_500m')
+    op.drop_column('properties', 'schools_nearest_m')
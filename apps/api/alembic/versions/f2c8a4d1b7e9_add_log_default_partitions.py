@@ -0,0 +1,37 @@
+"""Add DEFAULT partitions to search_analytics and activity_logs
+
+Revision ID: f2c8a4d1b7e9
+Revises: b5e7c2a9d4f1
+Create Date: 2026-10-18 14:37:05.918264
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2c8a4d1b7e9'
+down_revision = 'b5e7c2a9d4f1'
+branch_labels = None
+depends_on = None
+
+TABLES = ('search_analytics', 'activity_logs')
+
+
+def upgrade() -> None:
+    # Catch-all for rows with no month partition yet, so inserts (activity
+    # logs are written inside admin transactions) never fail; the worker
+    # moves them into month partitions
+    for table in TABLES:
+        op.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    for table in TABLES:
+        if bind.execute(sa.text(f'SELECT EXISTS (SELECT 1 FROM {table}_default)')).scalar():
+            raise RuntimeError(
+                f'{table}_default still has rows; run the maintenance.partitions job '
+                f'to move them into month partitions before downgrading'
+            )
+        op.execute(f'DROP TABLE {table}_default')
@@ -0,0 +1,70 @@
+"""
+Admin endpoints for search analytics reports
+"""
+from datetime import datetime, timedelta
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from app.core.deps import get_db, get_current_admin
+from app.crud.crud_search_analytics import crud_search_analytics
+
+router = APIRouter()
+
+
+def _since(days: int, hours: Optional[int]) -> datetime:
+    """Start of the report window; whole days for the daily rollup."""
+    now = datetime.utcnow()
+    if hours:
+        return (now - timedelta(hours=hours - 1)).replace(minute=0, second=0, microsecond=0)
+    return (now - timedelta(days=days - 1)).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _report(rows: list, key: str, days: int, hours: Optional[int]) -> dict:
+    return {
+        "since": _since(days, hours).isoformat(),
+        "items": [{key: row.pop("value"), **row} for row in rows],
+    }
+
+
+@router.get("/searches/top-queries")
+def get_top_queries(
+    days: int = Query(7, ge=1, le=365),
+    hours: Optional[int] = Query(None, ge=1, le=168),  # Overrides days, from the hourly rollup
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_admin),
+):
+    """
+    Most searched queries (normalized across Arabic/English spelling
+    variants), with their zero-result rate.
+    
+    Read from the rollups, which lag live traffic by a few minutes.
+    """
+    rows = crud_search_analytics.top_queries(db, since=_since(days, hours), hourly=bool(hours), limit=limit)
+    return _report(rows, "query", days, hours)
+
+
+@router.get("/searches/zero-result-queries")
+def get_zero_result_queries(
+    days: int = Query(7, ge=1, le=365),
+    hours: Optional[int] = Query(None, ge=1, le=168),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_admin),
+):
+    """Queries that most often returned no results."""
+    rows = crud_search_analytics.top_zero_result_queries(db, since=_since(days, hours), hourly=bool(hours), limit=limit)
+    return _report(rows, "query", days, hours)
+
+
+@router.get("/searches/filter-combos")
+def get_filter_combos(
+    days: int = Query(7, ge=1, le=365),
+    hours: Optional[int] = Query(None, ge=1, le=168),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_admin),
+):
+    """Most used filter combinations (e.g. "bedrooms+location_slug+purpose")."""
+    rows = crud_search_analytics.top_filter_combos(db, since=_since(days, hours), hourly=bool(hours), limit=limit)
+    return _report(rows, "filters", days, hours)
@@ -0,0 +1,33 @@
+"""
+Admin endpoints for the background job queue
+"""
+from fastapi import APIRouter, Depends, HTTPException
+from app.core.deps import get_current_admin
+from app.core.jobs import job_queue
+
+router = APIRouter()
+
+
+@router.get("/")
+def get_job_stats(
+    current_user = Depends(get_current_admin),
+):
+    """
+    Queue depths plus per-job counters and timings.
+    
+    Per job name: runs, succeeded, retried, failed, avg/max run seconds and
+    average seconds spent waiting in the queue.
+    """
+    return job_queue.stats()
+
+
+@router.get("/{job_id}")
+def get_job(
+    job_id: str,
+    current_user = Depends(get_current_admin),
+):
+    """State, attempts, timings and result of a single job."""
+    job = job_queue.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -5,6 +5,7 @@ from app.core.deps import get_db, get_current_admin
 from app.crud.crud_location import crud_location
 from app.schemas.location import Location, LocationCreate, LocationUpdate
 from app.api.utils import serialize_model_list, serialize_model
+from app.core.cache import response_cache, location_cache_tags
 
 router = APIRouter()
 
@@ -56,7 +57,12 @@ def update_location(
     if not location:
         raise HTTPException(status_code=404, detail="Location not found")
     
-    return crud_location.update(db, db_obj=location, obj_in=location_in)
+    # Listing pages filter by slug and show the location name
+    cache_tags = location_cache_tags(location)
+    location = crud_location.update(db, db_obj=location, obj_in=location_in)
+    response_cache.invalidate(cache_tags + location_cache_tags(location))
+    
+    return location
 
 
 @router.delete("/{location_id}")
@@ -70,6 +76,8 @@ def delete_location(
     if not location:
         raise HTTPException(status_code=404, detail="Location not found")
     
+    cache_tags = location_cache_tags(location)
     crud_location.remove(db, id=location_id)
+    response_cache.invalidate(cache_tags)
     return {"message": "Location deleted"}
 
@@ -0,0 +1,42 @@
+"""
+Admin endpoints for the cached nearby POIs
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from app.core.config import settings
+from app.core.deps import get_current_admin
+from app.core.jobs import job_queue
+from app.services.tasks import POI_REFRESH_JOB
+
+router = APIRouter()
+
+
+@router.post("/refresh", status_code=202)
+def start_poi_refresh(
+    max_age_days: int = Query(settings.POI_REFRESH_MAX_AGE_DAYS, ge=0),
+    source: str = Query(settings.POI_REFRESH_SOURCE, regex="^(overpass|local)$"),
+    concurrency: int = Query(settings.POI_REFRESH_CONCURRENCY, ge=1, le=8),
+    current_user = Depends(get_current_admin),
+):
+    """
+    Recompute nearby POIs for properties not refreshed in `max_age_days`.
+    
+    Runs as a background job, one query per map tile. Poll GET /refresh for
+    progress; per-tile timings are in the job result when it finishes.
+    """
+    if job_queue.is_pending(POI_REFRESH_JOB):
+        raise HTTPException(status_code=409, detail="A POI refresh is already running")
+    
+    job_id = job_queue.enqueue(
+        POI_REFRESH_JOB,
+        {"max_age_days": max_age_days, "source": source, "concurrency": concurrency},
+        dedup_key=POI_REFRESH_JOB,
+    )
+    return {"message": "POI refresh queued", "job_id": job_id}
+
+
+@router.get("/refresh")
+def get_poi_refresh_status(
+    current_user = Depends(get_current_admin),
+):
+    """Progress of the current (or last) POI refresh job."""
+    return job_queue.get_latest(POI_REFRESH_JOB) or {"state": "idle"}
@@ -1,81 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.core.deps import get_db, get_current_admin
 from app.crud.crud_property import crud_property
-from app.crud.crud_property_poi import crud_property_poi
 from app.schemas.property import Property, PropertyCreate, PropertyUpdate
 from app.api.utils import serialize_model_list, serialize_model
-from app.services.osm_service import osm_service
-from app.services.meilisearch_service import meilisearch_service
+from app.services.tasks import enqueue_property_pois
+from app.core.cache import response_cache, property_cache_tags
 from slugify import slugify
-import asyncio
 import csv
 import io
 from pydantic import BaseModel
-from uuid import UUID
 
 router = APIRouter()
 
 
-def fetch_and_cache_pois(property_id: str, lat: float, lng: float):
-    """Background task to fetch and cache POIs for a property."""
-    import asyncio
-    from app.db.session import SessionLocal
-    
-    async def _fetch():
-        db = SessionLocal()
-        try:
-            # Fetch POIs from OSM
-            pois_data = await osm_service.get_nearby_pois(
-                lat=lat,
-                lng=lng,
-                radius=1000,  # 1km radius
-                categories=None,  # All categories
-                limit_per_category=10,
-            )
-            
-            # Delete existing POIs for this property
-            crud_property_poi.delete_by_property(db, property_id=property_id)
-            
-            # Prepare POIs for bulk insert
-            pois_to_create = []
-            for category, pois_list in pois_data.items():
-                for idx, poi in enumerate(pois_list):
-                    pois_to_create.append({
-                        "property_id": property_id,
-                        "category": category,
-                        "name": poi.get("name", ""),
-                        "name_en": poi.get("name_en"),
-                        "name_ar": poi.get("name_ar"),
-                        "lat": poi.get("lat"),
-                        "lng": poi.get("lng"),
-                        "distance": poi.get("distance", 0),
-                        "poi_type": poi.get("type"),
-                        "address": poi.get("address"),
-                        "sort_order": idx,
-                    })
-            
-            # Bulk create POIs
-            if pois_to_create:
-                crud_property_poi.create_bulk(db, pois=pois_to_create)
-        except Exception as e:
-            print(f"Error fetching POIs for property {property_id}: {e}")
-        finally:
-            db.close()
-    
-    # Run async function
-    try:
-        loop = asyncio.get_event_loop()
-        if loop.is_running():
-            # If loop is running, create a task
-            asyncio.create_task(_fetch())
-        else:
-            loop.run_until_complete(_fetch())
-    except RuntimeError:
-        # No event loop, create a new one
-        asyncio.run(_fetch())
+def invalidate_listing_cache(tags: List[str]):
+    """Drop cached public listing pages that depend on the given tags."""
+    response_cache.invalidate(tags)
 
 
 @router.get("/")
@@ -93,7 +36,6 @@ def list_properties(
 @router.post("/", response_model=Property)
 def create_property(
     property_in: PropertyCreate,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_admin),
 ):
@@ -106,48 +48,11 @@ def create_property(
     
     prop = crud_property.create(db, obj_in=property_in)
     
-    # Index in Meilisearch
-    if meilisearch_service.is_available():
-        prop_dict = {
-            "id": str(prop.id),
-            "title_en": prop.title_en,
-            "title_ar": prop.title_ar,
-            "slug_en": prop.slug_en,
-            "slug_ar": prop.slug_ar,
-            "description_en": prop.description_en,
-            "description_ar": prop.description_ar,
-            "purpose": prop.purpose.value,
-            "type": prop.type.value,
-            "status": prop.status.value,
-            "price_amount": float(prop.price_amount),
-            "price_currency": prop.price_currency.value,
-            "area_m2": float(prop.area_m2) if prop.area_m2 else None,
-            "bedrooms": prop.bedrooms,
-            "bathrooms": prop.bathrooms,
-            "furnished": prop.furnished,
-            "parking": prop.parking,
-            "floor": prop.floor,
-            "year_built": prop.year_built,
-            "featured": prop.featured,
-            "published": prop.published,
-            "location_id": str(prop.location_id),
-            "location_name_en": prop.location.name_en if prop.location else "",
-            "location_name_ar": prop.location.name_ar if prop.location else "",
-            "location_slug_en": prop.location.slug_en if prop.location else "",
-            "location_slug_ar": prop.location.slug_ar if prop.location else "",
-            "agent_id": str(prop.agent_id) if prop.agent_id else None,
-            "created_at": prop.created_at.isoformat(),
-        }
-        meilisearch_service.index_property(prop_dict)
+    invalidate_listing_cache(property_cache_tags(prop))
     
     # Fetch and cache POIs in background if coordinates are present
     if prop.lat and prop.lng:
-        background_tasks.add_task(
-            fetch_and_cache_pois,
-            property_id=str(prop.id),
-            lat=float(prop.lat),
-            lng=float(prop.lng)
-        )
+        enqueue_property_pois(prop.id)
     
     return prop
 
@@ -169,7 +74,6 @@ def get_property(
 def update_property(
     property_id: str,
     property_in: PropertyUpdate,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_admin),
 ):
@@ -186,50 +90,16 @@ def update_property(
     new_lng = update_data.get("lng", old_lng)
     coordinates_changed = (old_lat != new_lat) or (old_lng != new_lng)
     
+    # Tags for the old location too, in case the property moves
+    cache_tags = property_cache_tags(prop)
+    
     prop = crud_property.update(db, db_obj=prop, obj_in=property_in)
     
-    # Update in Meilisearch
-    if meilisearch_service.is_available():
-        prop_dict = {
-            "id": str(prop.id),
-            "title_en": prop.title_en,
-            "title_ar": prop.title_ar,
-            "slug_en": prop.slug_en,
-            "slug_ar": prop.slug_ar,
-            "description_en": prop.description_en,
-            "description_ar": prop.description_ar,
-            "purpose": prop.purpose.value,
-            "type": prop.type.value,
-            "status": prop.status.value,
-            "price_amount": float(prop.price_amount),
-            "price_currency": prop.price_currency.value,
-            "area_m2": float(prop.area_m2) if prop.area_m2 else None,
-            "bedrooms": prop.bedrooms,
-            "bathrooms": prop.bathrooms,
-            "furnished": prop.furnished,
-            "parking": prop.parking,
-            "floor": prop.floor,
-            "year_built": prop.year_built,
-            "featured": prop.featured,
-            "published": prop.published,
-            "location_id": str(prop.location_id),
-            "location_name_en": prop.location.name_en if prop.location else "",
-            "location_name_ar": prop.location.name_ar if prop.location else "",
-            "location_slug_en": prop.location.slug_en if prop.location else "",
-            "location_slug_ar": prop.location.slug_ar if prop.location else "",
-            "agent_id": str(prop.agent_id) if prop.agent_id else None,
-            "created_at": prop.created_at.isoformat(),
-        }
-        meilisearch_service.update_property(prop_dict)
+    invalidate_listing_cache(cache_tags + property_cache_tags(prop))
     
     # Fetch and cache POIs in background if coordinates changed or were newly set
     if coordinates_changed and prop.lat and prop.lng:
-        background_tasks.add_task(
-            fetch_and_cache_pois,
-            property_id=str(prop.id),
-            lat=float(prop.lat),
-            lng=float(prop.lng)
-        )
+        enqueue_property_pois(prop.id)
     
     return prop
 
@@ -245,11 +115,9 @@ def delete_property(
     if not prop:
         raise HTTPException(status_code=404, detail="Property not found")
     
-    # Delete from Meilisearch
-    if meilisearch_service.is_available():
-        meilisearch_service.delete_property(property_id)
-    
+    cache_tags = property_cache_tags(prop)
     crud_property.remove(db, id=property_id)
+    invalidate_listing_cache(cache_tags)
     return {"message": "Property deleted"}
 
 
@@ -265,6 +133,7 @@ def publish_property(
         raise HTTPException(status_code=404, detail="Property not found")
     
     crud_property.update(db, db_obj=prop, obj_in={"published": True})
+    invalidate_listing_cache(property_cache_tags(prop))
     return {"message": "Property published"}
 
 
@@ -280,6 +149,7 @@ def unpublish_property(
         raise HTTPException(status_code=404, detail="Property not found")
     
     crud_property.update(db, db_obj=prop, obj_in={"published": False})
+    invalidate_listing_cache(property_cache_tags(prop))
     return {"message": "Property unpublished"}
 
 
@@ -314,6 +184,11 @@ def bulk_operations(
     if not properties:
         raise HTTPException(status_code=404, detail="No valid properties found")
     
+    # Collected up front: deleted properties can't be inspected afterwards
+    cache_tags = []
+    for prop in properties:
+        cache_tags.extend(property_cache_tags(prop))
+    
     updated_count = 0
     
     if request.operation == "publish":
@@ -349,6 +224,8 @@ def bulk_operations(
     else:
         raise HTTPException(status_code=400, detail=f"Unknown operation: {request.operation}")
     
+    invalidate_listing_cache(cache_tags)
+    
     return {
         "message": f"Bulk operation '{request.operation}' completed",
         "updated_count": updated_count,
@@ -359,7 +236,6 @@ def bulk_operations(
 @router.post("/{property_id}/duplicate")
 def duplicate_property(
     property_id: str,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_admin),
 ):
@@ -414,12 +290,7 @@ def duplicate_property(
     
     # Fetch POIs if coordinates exist
     if new_prop.lat and new_prop.lng:
-        background_tasks.add_task(
-            fetch_and_cache_pois,
-            property_id=str(new_prop.id),
-            lat=float(new_prop.lat),
-            lng=float(new_prop.lng)
-        )
+        enqueue_property_pois(new_prop.id)
     
     return serialize_model(new_prop)
 
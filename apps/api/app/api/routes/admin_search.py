@@ -0,0 +1,43 @@
+"""
+Admin endpoints for managing the search index
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from app.core.deps import get_current_admin
+from app.core.jobs import job_queue
+from app.services.meilisearch_service import meilisearch_service
+from app.services.tasks import SEARCH_REINDEX_JOB
+
+router = APIRouter()
+
+
+@router.post("/reindex", status_code=202)
+def start_reindex(
+    batch_size: int = Query(1000, ge=100, le=10000),
+    concurrency: int = Query(4, ge=1, le=16),
+    current_user = Depends(get_current_admin),
+):
+    """
+    Rebuild the search index from the database.
+    
+    Runs as a background job into a temporary index that replaces the live
+    one only when complete. Poll GET /reindex for progress.
+    """
+    if not meilisearch_service.is_available():
+        raise HTTPException(status_code=503, detail="Search is not configured")
+    if job_queue.is_pending(SEARCH_REINDEX_JOB):
+        raise HTTPException(status_code=409, detail="A reindex is already running")
+    
+    job_id = job_queue.enqueue(
+        SEARCH_REINDEX_JOB,
+        {"batch_size": batch_size, "concurrency": concurrency},
+        dedup_key=SEARCH_REINDEX_JOB,
+    )
+    return {"message": "Reindex queued", "job_id": job_id}
+
+
+@router.get("/reindex")
+def get_reindex_status(
+    current_user = Depends(get_current_admin),
+):
+    """Progress of the current (or last) reindex job."""
+    return job_queue.get_latest(SEARCH_REINDEX_JOB) or {"state": "idle"}
@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+import math
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Union
 from app.core.deps import get_db
-from app.crud.crud_property import crud_property
+from app.crud.crud_property import crud_property, RELEVANCE_SORT, DISTANCE_SORT
 from app.crud.crud_location import crud_location
 from app.crud.crud_settings import crud_settings
 from app.crud.crud_lead import crud_lead
@@ -11,8 +13,21 @@ from app.schemas.location import Location
 from app.schemas.settings import Settings
 from app.schemas.lead import LeadCreate, Lead
 from app.api.utils import serialize_model, serialize_model_list
+from app.core.cache import response_cache, property_tag, location_tag, ALL_LOCATIONS_TAG
+from app.core.facets import price_bucket_range
+from app.core.geo import MAX_SEARCH_RADIUS_M, haversine_m, parse_bbox
+from app.core.polygon import encode_polygon, parse_polygon
+from app.core.scores import parse_near, nearest_field
+from app.services.map_index_service import map_index_service, MAX_ZOOM
 from app.services.osm_service import osm_service, POI_CATEGORIES
-from app.services.meilisearch_service import meilisearch_service
+from app.services.meilisearch_service import (
+    meilisearch_service,
+    search_fallback_counter,
+    SearchUnavailableError,
+    CARD_ATTRIBUTES,
+    DOCUMENT_VERSION,
+    geo_sort,
+)
 
 router = APIRouter()
 
@@ -55,7 +70,14 @@ def get_properties(
     parking: Optional[bool] = None,
     floor: Optional[int] = None,
     featured: Optional[bool] = None,
+    near: Optional[str] = None,  # e.g. "schools:500,mosques:300"
+    min_walkability: Optional[int] = Query(None, ge=0, le=100),
+    near_lat: Optional[float] = Query(None, ge=-90, le=90),
+    near_lng: Optional[float] = Query(None, ge=-180, le=180),
+    radius_m: Optional[int] = Query(None, ge=1, le=MAX_SEARCH_RADIUS_M),
+    polygon: Optional[str] = None,  # GeoJSON or encoded polylines, see app.core.polygon
     sort_by: str = "newest",
+    cursor: Optional[str] = None,  # Opaque keyset cursor from a previous page's next_cursor
 ):
     """
     Get filtered properties with pagination.
@@ -63,7 +85,16 @@ def get_properties(
     If 'q' (search query) is provided, uses Meilisearch for full-text search.
     Otherwise, uses database filtering.
     
-    Sort options: newest, price_asc, price_desc
+    Sort options: newest, price_asc, price_desc, walkability, distance
+    
+    Pagination:
+    - page/page_size: Classic offset pagination
+    - cursor: Keyset pagination; pass the `next_cursor` of the previous
+      response (database path only, ignores `page`). Cost is constant at
+      any depth, so crawlers and infinite scroll should prefer it.
+    
+    `total` is exact unless `total_is_estimate` is true (very broad filters,
+    cursor pages and text search report an estimate).
     
     Advanced filters:
     - bathrooms: Minimum number of bathrooms
@@ -72,50 +103,282 @@ def get_properties(
     - furnished: true/false
     - parking: true/false
     - floor: Specific floor number
+    - near: POIs required nearby, as comma-separated category:meters pairs
+      (up to 1000 m), e.g. schools:500
+    - min_walkability: Minimum walkability score (0-100)
+    - near_lat/near_lng/radius_m: Only listings within radius_m meters of
+      the point. With a point, cards carry `distance_m` and
+      sort_by=distance orders by it (page pagination only)
+    - polygon: Only listings inside a drawn shape, as a GeoJSON Polygon or
+      MultiPolygon ([lng, lat] order) or as encoded polylines (one per ring,
+      ";"-separated). Shapes over 200 vertices are simplified; text
+      search with a polygon runs on the database
+    
+    Neighborhood filters use scores precomputed with the nearby POIs.
+    
+    Responses are cached in Redis per normalized filter combination and
+    invalidated by admin writes (see app.core.cache).
     """
+    params = {
+        "page": page,
+        "page_size": page_size,
+        "q": q,
+        "purpose": purpose,
+        "type": type,
+        "location_slug": location_slug,
+        "min_price": min_price,
+        "max_price": max_price,
+        "bedrooms": bedrooms,
+        "bathrooms": bathrooms,
+        "min_area": min_area,
+        "max_area": max_area,
+        "year_built": year_built,
+        "furnished": furnished,
+        "parking": parking,
+        "floor": floor,
+        "featured": featured,
+        "near": near,
+        "min_walkability": min_walkability,
+        "near_lat": near_lat,
+        "near_lng": near_lng,
+        "radius_m": radius_m,
+        "polygon": _canonical_polygon(polygon),
+        "sort_by": sort_by,
+        "cursor": cursor,
+    }
+    
+    body, cache_hit = response_cache.get_or_compute(
+        "properties",
+        params,
+        compute=lambda: _list_properties(db, **params),
+        tags_for=lambda result: _listing_cache_tags(location_slug, result),
+    )
+    
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"X-Cache": "HIT" if cache_hit else "MISS"},
+    )
+
+
+def _format_property_card(prop) -> dict:
+    """Format a listing card row (see CRUDProperty.card_query) for the API."""
+    card = {
+        "id": str(prop.id),
+        "title_en": prop.title_en,
+        "title_ar": prop.title_ar,
+        "slug_en": prop.slug_en,
+        "slug_ar": prop.slug_ar,
+        "description_en": prop.description_en,
+        "description_ar": prop.description_ar,
+        "purpose": prop.purpose.value if hasattr(prop.purpose, 'value') else prop.purpose,
+        "type": prop.type.value if hasattr(prop.type, 'value') else prop.type,
+        "status": prop.status.value if hasattr(prop.status, 'value') else prop.status,
+        "price_amount": float(prop.price_amount),
+        "price_currency": prop.price_currency.value if hasattr(prop.price_currency, 'value') else prop.price_currency,
+        "area_m2": float(prop.area_m2) if prop.area_m2 else None,
+        "bedrooms": prop.bedrooms,
+        "bathrooms": prop.bathrooms,
+        "furnished": prop.furnished,
+        "parking": prop.parking,
+        "floor": prop.floor,
+        "year_built": prop.year_built,
+        "lat": float(prop.lat) if prop.lat else None,
+        "lng": float(prop.lng) if prop.lng else None,
+        "walkability_score": prop.walkability_score,
+        "featured": prop.featured,
+        "published": prop.published,
+        "location_id": str(prop.location_id),
+        "agent_id": str(prop.agent_id) if prop.agent_id else None,
+        "created_at": prop.created_at.isoformat(),
+        "updated_at": prop.updated_at.isoformat(),
+        "first_image": prop.first_image,
+        "location_name": prop.location_name,
+    }
+    # Only on radius / near-me searches
+    if getattr(prop, "distance_m", None) is not None:
+        card["distance_m"] = round(float(prop.distance_m), 1)
+    return card
+
+
+def _format_search_hit(hit: dict) -> dict:
+    """Format a Meilisearch document as a listing card (same shape as _format_property_card)."""
+    card = {key: hit.get(key) for key in CARD_ATTRIBUTES if key not in ("location_name_en", "doc_version")}
+    card["location_name"] = hit.get("location_name_en")
+    return card
+
+
+def _split_multi(value: Optional[str]):
+    """
+    Parse a comma-separated filter value.
+    
+    Returns a list for multiple values and the single value itself for
+    backward compatibility, or None when empty.
+    """
+    if not value:
+        return None
+    values = [v.strip() for v in value.split(',') if v.strip()]
+    if len(values) == 1:
+        return values[0]
+    return values or None
+
+
+def _parse_near(value: Optional[str]) -> Optional[dict]:
+    """Parse the `near` filter (see app.core.scores.parse_near), as a 400 on bad input."""
+    try:
+        return parse_near(value)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _check_finite(**bounds: Optional[float]):
+    """Reject inf/nan range bounds (FastAPI parses them as floats) as a 400."""
+    for name, value in bounds.items():
+        if value is not None and not math.isfinite(value):
+            raise HTTPException(status_code=400, detail=f"{name} must be a finite number")
+
+
+def _check_near_point(
+    near_lat: Optional[float],
+    near_lng: Optional[float],
+    radius_m: Optional[int],
+    sort_by: Optional[str] = None,
+):
+    """Reject a half-given point, or a radius or distance sort without one, as a 400."""
+    if (near_lat is None) != (near_lng is None):
+        raise HTTPException(status_code=400, detail="near_lat and near_lng must be given together")
+    if near_lat is None and (radius_m is not None or sort_by == DISTANCE_SORT):
+        raise HTTPException(status_code=400, detail="radius_m and sort_by=distance require near_lat and near_lng")
+
+
+def _geo_radius(near_lat: Optional[float], near_lng: Optional[float], radius_m: Optional[int]):
+    """Meilisearch geo_radius for the radius filter, or None."""
+    if radius_m is None or near_lat is None:
+        return None
+    return near_lat, near_lng, radius_m
+
+
+def _parse_polygon(value: Optional[str]):
+    """Parse the `polygon` filter (see app.core.polygon.parse_polygon), as a 400 on bad input."""
+    if not value or not value.strip():
+        return None
+    try:
+        return parse_polygon(value)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _canonical_polygon(value: Optional[str]) -> Optional[str]:
+    """The polygon as simplified encoded polylines, so equivalent shapes share a cache key."""
+    rings = _parse_polygon(value)
+    return encode_polygon(rings) if rings else None
+
+
+def _listing_cache_tags(location_slug: Optional[str], result: dict) -> List[str]:
+    """Cache tags for a listing page: its location scope plus every property on it."""
+    if location_slug:
+        tags = [location_tag(slug.strip()) for slug in location_slug.split(',') if slug.strip()]
+    else:
+        tags = [ALL_LOCATIONS_TAG]
+    
+    for item in result["items"]:
+        tags.append(property_tag(item["id"]))
+        tags.append(location_tag(item["location_id"]))
+    
+    return tags
+
+
+def _list_properties(
+    db: Session,
+    page: int,
+    page_size: int,
+    q: Optional[str] = None,
+    purpose: Optional[str] = None,
+    type: Optional[str] = None,
+    location_slug: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    bedrooms: Optional[int] = None,
+    bathrooms: Optional[int] = None,
+    min_area: Optional[float] = None,
+    max_area: Optional[float] = None,
+    year_built: Optional[int] = None,
+    furnished: Optional[bool] = None,
+    parking: Optional[bool] = None,
+    floor: Optional[int] = None,
+    featured: Optional[bool] = None,
+    near: Optional[str] = None,
+    min_walkability: Optional[int] = None,
+    near_lat: Optional[float] = None,
+    near_lng: Optional[float] = None,
+    radius_m: Optional[int] = None,
+    polygon: Optional[str] = None,
+    sort_by: str = "newest",
+    cursor: Optional[str] = None,
+) -> dict:
+    """Run the listing query (Meilisearch or database) and build the response."""
     skip = (page - 1) * page_size
+    _check_finite(min_price=min_price, max_price=max_price, min_area=min_area, max_area=max_area)
+    _check_near_point(near_lat, near_lng, radius_m, sort_by)
+    
+    after = None
+    if cursor:
+        if q and sort_by == RELEVANCE_SORT:
+            raise HTTPException(status_code=400, detail="Cursor pagination is not supported for relevance sort")
+        if sort_by == DISTANCE_SORT:
+            raise HTTPException(status_code=400, detail="Cursor pagination is not supported for distance sort")
+        try:
+            after = crud_property.decode_cursor(cursor, sort_by)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
     
     # Parse multiple types and locations if provided as comma-separated strings
-    types_list = None
-    if type:
-        types_list = [t.strip() for t in type.split(',') if t.strip()]
-        if len(types_list) == 1:
-            types_list = types_list[0]  # Use single value for backward compatibility
+    types_list = _split_multi(type)
+    locations_list = _split_multi(location_slug)
+    near_filter = _parse_near(near)
+    rings = _parse_polygon(polygon)
     
-    locations_list = None
-    if location_slug:
-        locations_list = [l.strip() for l in location_slug.split(',') if l.strip()]
-        if len(locations_list) == 1:
-            locations_list = locations_list[0]  # Use single value for backward compatibility
-    
-    # Use Meilisearch if search query is provided
-    if q and meilisearch_service.is_available():
-        return _search_properties_meilisearch(
-            db=db,
-            query=q,
-            page=page,
-            page_size=page_size,
-            purpose=purpose,
-            type=types_list or type,
-            location_slug=locations_list or location_slug,
-            min_price=min_price,
-            max_price=max_price,
-            bedrooms=bedrooms,
-            bathrooms=bathrooms,
-            min_area=min_area,
-            max_area=max_area,
-            year_built=year_built,
-            furnished=furnished,
-            parking=parking,
-            floor=floor,
-            featured=featured,
-            sort_by=sort_by,
-        )
+    # Use Meilisearch if search query is provided; fall back to the database
+    # while it is down or its circuit breaker is open. Meilisearch has no
+    # polygon filter, so polygon searches always use the database.
+    if q and rings is None and meilisearch_service.can_search():
+        try:
+            return _search_properties_meilisearch(
+                db=db,
+                query=q,
+                page=page,
+                page_size=page_size,
+                purpose=purpose,
+                type=types_list or type,
+                location_slug=locations_list or location_slug,
+                min_price=min_price,
+                max_price=max_price,
+                bedrooms=bedrooms,
+                bathrooms=bathrooms,
+                min_area=min_area,
+                max_area=max_area,
+                year_built=year_built,
+                furnished=furnished,
+                parking=parking,
+                floor=floor,
+                featured=featured,
+                near=near_filter,
+                min_walkability=min_walkability,
+                near_lat=near_lat,
+                near_lng=near_lng,
+                radius_m=radius_m,
+                sort_by=sort_by,
+            )
+        except SearchUnavailableError:
+            search_fallback_counter.inc(endpoint="properties")
     
-    properties = crud_property.get_filtered(
+    properties, total, total_is_estimate = crud_property.get_cards_with_total(
         db,
         skip=skip,
         limit=page_size,
+        sort_by=sort_by,
+        after=after,
+        q=q,
         purpose=purpose,
         type=types_list or type,
         location_slug=locations_list or location_slug,
@@ -130,15 +393,261 @@ def get_properties(
         parking=parking,
         floor=floor,
         featured=featured,
+        near=near_filter,
+        min_walkability=min_walkability,
+        near_lat=near_lat,
+        near_lng=near_lng,
+        radius_m=radius_m,
+        within_ids=crud_property.get_ids_in_polygon(db, polygon=rings) if rings else None,
         published=True,
-        sort_by=sort_by,
     )
     
-    total = crud_property.count_filtered(
+    formatted_properties = [_format_property_card(row) for row in properties]
+    
+    # A full page means there may be more rows after the last one
+    next_cursor = None
+    offset_only = (q and sort_by == RELEVANCE_SORT) or (sort_by == DISTANCE_SORT and near_lat is not None)
+    if len(properties) == page_size and not offset_only:
+        next_cursor = crud_property.encode_cursor(properties[-1], sort_by)
+    
+    return {
+        "items": formatted_properties,
+        "total": total,
+        "total_is_estimate": total_is_estimate,
+        "page": page,
+        "page_size": page_size,
+        "total_pages": (total + page_size - 1) // page_size,
+        "next_cursor": next_cursor,
+    }
+
+
+@router.get("/properties/facets", response_model=dict)
+def get_property_facets(
+    db: Session = Depends(get_db),
+    q: Optional[str] = None,
+    purpose: Optional[str] = None,
+    type: Optional[str] = None,
+    location_slug: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    bedrooms: Optional[int] = None,
+    bathrooms: Optional[int] = None,
+    min_area: Optional[float] = None,
+    max_area: Optional[float] = None,
+    year_built: Optional[int] = None,
+    furnished: Optional[bool] = None,
+    parking: Optional[bool] = None,
+    floor: Optional[int] = None,
+    featured: Optional[bool] = None,
+    near: Optional[str] = None,
+    min_walkability: Optional[int] = Query(None, ge=0, le=100),
+    near_lat: Optional[float] = Query(None, ge=-90, le=90),
+    near_lng: Optional[float] = Query(None, ge=-180, le=180),
+    radius_m: Optional[int] = Query(None, ge=1, le=MAX_SEARCH_RADIUS_M),
+    polygon: Optional[str] = None,
+):
+    """
+    Get facet counts for the listing filters.
+    
+    Takes the same filters as /properties and returns how many listings
+    match per purpose, type, location, bedrooms bucket, furnished/parking
+    flag and price histogram bucket. Counts come from one GROUPING SETS
+    query, or from Meilisearch's facetDistribution when 'q' is set (and no
+    polygon is).
+    """
+    params = {
+        "q": q,
+        "purpose": purpose,
+        "type": type,
+        "location_slug": location_slug,
+        "min_price": min_price,
+        "max_price": max_price,
+        "bedrooms": bedrooms,
+        "bathrooms": bathrooms,
+        "min_area": min_area,
+        "max_area": max_area,
+        "year_built": year_built,
+        "furnished": furnished,
+        "parking": parking,
+        "floor": floor,
+        "featured": featured,
+        "near": near,
+        "min_walkability": min_walkability,
+        "near_lat": near_lat,
+        "near_lng": near_lng,
+        "radius_m": radius_m,
+        "polygon": _canonical_polygon(polygon),
+    }
+    
+    body, cache_hit = response_cache.get_or_compute(
+        "facets",
+        params,
+        compute=lambda: _compute_facets(db, **params),
+        tags_for=lambda result: _facet_cache_tags(location_slug, result),
+    )
+    
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"X-Cache": "HIT" if cache_hit else "MISS"},
+    )
+
+
+def _facet_cache_tags(location_slug: Optional[str], result: dict) -> List[str]:
+    """Cache tags for facet counts: the location scope plus every location named."""
+    if location_slug:
+        tags = [location_tag(slug.strip()) for slug in location_slug.split(',') if slug.strip()]
+    else:
+        tags = [ALL_LOCATIONS_TAG]
+    
+    for location in result["locations"]:
+        tags.append(location_tag(location["id"]))
+    
+    return tags
+
+
+# Facet name -> Meilisearch document attribute
+MEILISEARCH_FACETS = {
+    "purpose": "purpose",
+    "type": "type",
+    "location": "location_id",
+    "bedrooms": "bedrooms_bucket",
+    "furnished": "furnished",
+    "parking": "parking",
+    "price": "price_bucket",
+}
+
+
+def _compute_facets(db: Session, q: Optional[str] = None, **filters) -> dict:
+    """Facet counts from Meilisearch (text search) or a single SQL pass."""
+    filters["type"] = _split_multi(filters.get("type"))
+    filters["location_slug"] = _split_multi(filters.get("location_slug"))
+    filters["near"] = _parse_near(filters.get("near"))
+    _check_finite(**{key: filters.get(key) for key in ("min_price", "max_price", "min_area", "max_area")})
+    near_point = {key: filters.pop(key) for key in ("near_lat", "near_lng", "radius_m")}
+    _check_near_point(**near_point)
+    rings = _parse_polygon(filters.pop("polygon", None))
+    
+    if q and rings is None and meilisearch_service.can_search():
+        try:
+            results = meilisearch_service.search(
+                query=q,
+                filters=_meilisearch_filters(**filters),
+                limit=0,
+                facets=list(MEILISEARCH_FACETS.values()),
+                geo_radius=_geo_radius(**near_point),
+            )
+        except SearchUnavailableError:
+            search_fallback_counter.inc(endpoint="facets")
+        else:
+            distribution = results["facet_distribution"]
+            counts = {
+                name: distribution.get(attribute, {})
+                for name, attribute in MEILISEARCH_FACETS.items()
+            }
+            return _format_facets(db, counts, results["total"])
+    
+    if rings:
+        filters["within_ids"] = crud_property.get_ids_in_polygon(db, polygon=rings)
+    counts = crud_property.get_facets(db, published=True, q=q, **filters, **near_point)
+    return _format_facets(db, counts, counts.pop("total"))
+
+
+def _format_facets(db: Session, counts: dict, total: int) -> dict:
+    """Shape facet counts from either engine into the API response."""
+    def flag_counts(values: dict) -> dict:
+        return {str(value).lower(): count for value, count in values.items()}
+    
+    location_counts = {str(location_id): count for location_id, count in counts["location"].items()}
+    locations = crud_location.get_by_ids(db, ids=list(location_counts))
+    
+    price = []
+    for bucket, count in sorted((int(b), c) for b, c in counts["price"].items()):
+        low, high = price_bucket_range(bucket)
+        price.append({"bucket": bucket, "min": low, "max": high, "count": count})
+    
+    return {
+        "total": total,
+        "purpose": {str(k): v for k, v in counts["purpose"].items()},
+        "type": {str(k): v for k, v in counts["type"].items()},
+        "bedrooms": {str(k): v for k, v in counts["bedrooms"].items()},
+        "furnished": flag_counts(counts["furnished"]),
+        "parking": flag_counts(counts["parking"]),
+        "locations": sorted(
+            [{
+                "id": str(loc.id),
+                "name_en": loc.name_en,
+                "name_ar": loc.name_ar,
+                "slug_en": loc.slug_en,
+                "slug_ar": loc.slug_ar,
+                "count": location_counts[str(loc.id)],
+            } for loc in locations],
+            key=lambda loc: -loc["count"],
+        ),
+        "price": price,
+    }
+
+
+@router.get("/properties/map", response_model=dict)
+def get_property_map(
+    db: Session = Depends(get_db),
+    bbox: str = Query(..., description="west,south,east,north in degrees"),
+    zoom: int = Query(..., ge=0, le=MAX_ZOOM),
+    q: Optional[str] = None,
+    purpose: Optional[str] = None,
+    type: Optional[str] = None,
+    location_slug: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    bedrooms: Optional[int] = None,
+    bathrooms: Optional[int] = None,
+    min_area: Optional[float] = None,
+    max_area: Optional[float] = None,
+    year_built: Optional[int] = None,
+    furnished: Optional[bool] = None,
+    parking: Optional[bool] = None,
+    floor: Optional[int] = None,
+    featured: Optional[bool] = None,
+    near: Optional[str] = None,
+    min_walkability: Optional[int] = Query(None, ge=0, le=100),
+    near_lat: Optional[float] = Query(None, ge=-90, le=90),
+    near_lng: Optional[float] = Query(None, ge=-180, le=180),
+    radius_m: Optional[int] = Query(None, ge=1, le=MAX_SEARCH_RADIUS_M),
+    polygon: Optional[str] = None,
+):
+    """
+    Get clustered listing markers for a map viewport.
+    
+    Takes the same filters as /properties plus the viewport bounding box and
+    zoom level, and returns one cluster per ~64 px grid cell with its
+    centroid, listing count and price range. Single-listing clusters carry
+    the listing `id`; fetch cards for those on demand.
+    
+    `polygon` is tested against the index's coordinates in memory.
+    
+    Clusters come from an in-memory grid index (see
+    app.services.map_index_service), so the payload grows with the clusters
+    on screen rather than the listings in view.
+    """
+    try:
+        west, south, east, north = parse_bbox(bbox)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    _check_finite(min_price=min_price, max_price=max_price, min_area=min_area, max_area=max_area)
+    _check_near_point(near_lat, near_lng, radius_m)
+    rings = _parse_polygon(polygon)
+    
+    return map_index_service.clusters(
         db,
+        west=west,
+        south=south,
+        east=east,
+        north=north,
+        zoom=zoom,
+        q=q,
         purpose=purpose,
-        type=types_list or type,
-        location_slug=locations_list or location_slug,
+        type=_split_multi(type),
+        location_slug=_split_multi(location_slug),
         min_price=min_price,
         max_price=max_price,
         bedrooms=bedrooms,
@@ -150,52 +659,13 @@ def get_properties(
         parking=parking,
         floor=floor,
         featured=featured,
-        published=True,
+        near=_parse_near(near),
+        min_walkability=min_walkability,
+        near_lat=near_lat,
+        near_lng=near_lng,
+        radius_m=radius_m,
+        polygon=rings,
     )
-    
-    # Format response with first image
-    formatted_properties = []
-    for prop in properties:
-        prop_dict = {
-            "id": str(prop.id),
-            "title_en": prop.title_en,
-            "title_ar": prop.title_ar,
-            "slug_en": prop.slug_en,
-            "slug_ar": prop.slug_ar,
-            "description_en": prop.description_en,
-            "description_ar": prop.description_ar,
-            "purpose": prop.purpose.value if hasattr(prop.purpose, 'value') else prop.purpose,
-            "type": prop.type.value if hasattr(prop.type, 'value') else prop.type,
-            "status": prop.status.value if hasattr(prop.status, 'value') else prop.status,
-            "price_amount": float(prop.price_amount),
-            "price_currency": prop.price_currency.value if hasattr(prop.price_currency, 'value') else prop.price_currency,
-            "area_m2": float(prop.area_m2) if prop.area_m2 else None,
-            "bedrooms": prop.bedrooms,
-            "bathrooms": prop.bathrooms,
-            "furnished": prop.furnished,
-            "parking": prop.parking,
-            "floor": prop.floor,
-            "year_built": prop.year_built,
-            "lat": float(prop.lat) if prop.lat else None,
-            "lng": float(prop.lng) if prop.lng else None,
-            "featured": prop.featured,
-            "published": prop.published,
-            "location_id": str(prop.location_id),
-            "agent_id": str(prop.agent_id) if prop.agent_id else None,
-            "created_at": prop.created_at.isoformat(),
-            "updated_at": prop.updated_at.isoformat(),
-            "first_image": prop.images[0].file_key if prop.images else None,
-            "location_name": prop.location.name_en if prop.location else None,
-        }
-        formatted_properties.append(prop_dict)
-    
-    return {
-        "items": formatted_properties,
-        "total": total,
-        "page": page,
-        "page_size": page_size,
-        "total_pages": (total + page_size - 1) // page_size,
-    }
 
 
 @router.get("/properties/{slug}", response_model=dict)
@@ -298,8 +768,8 @@ def get_property_nearby_pois(
             detail="Property does not have coordinates. Please add lat/lng to the property."
         )
     
-    # Get cached POIs from database
-    pois_list = crud_property_poi.get_by_property(db, property_id=str(prop.id))
+    # Get cached POIs from database (links joined to the shared pois rows)
+    pois_list = crud_property_poi.get_by_property(db, property_id=prop.id)
     
     # Group POIs by category
     pois_by_category = {}
@@ -353,26 +823,34 @@ def _search_properties_meilisearch(
     parking: Optional[bool] = None,
     floor: Optional[int] = None,
     featured: Optional[bool] = None,
+    near: Optional[dict] = None,
+    min_walkability: Optional[int] = None,
+    near_lat: Optional[float] = None,
+    near_lng: Optional[float] = None,
+    radius_m: Optional[int] = None,
     sort_by: str = "newest",
 ) -> dict:
     """Search properties using Meilisearch."""
     skip = (page - 1) * page_size
     
-    # Build filters
-    filters = {}
-    if purpose:
-        filters["purpose"] = purpose
-    if type:
-        filters["type"] = type
-    if featured is not None:
-        filters["featured"] = featured
-    filters["published"] = True  # Always filter published
-    
-    if location_slug:
-        # Get location to find its ID
-        location = crud_location.get_by_slug(db, slug=location_slug)
-        if location:
-            filters["location_id"] = str(location.id)
+    filters = _meilisearch_filters(
+        purpose=purpose,
+        type=type,
+        location_slug=location_slug,
+        min_price=min_price,
+        max_price=max_price,
+        bedrooms=bedrooms,
+        bathrooms=bathrooms,
+        min_area=min_area,
+        max_area=max_area,
+        year_built=year_built,
+        furnished=furnished,
+        parking=parking,
+        floor=floor,
+        featured=featured,
+        near=near,
+        min_walkability=min_walkability,
+    )
     
     # Build sort
     sort = []
@@ -380,7 +858,11 @@ def _search_properties_meilisearch(
         sort.append("price_amount:asc")
     elif sort_by == "price_desc":
         sort.append("price_amount:desc")
-    else:
+    elif sort_by == "walkability":
+        sort.append("walkability_score:desc")
+    elif sort_by == DISTANCE_SORT and near_lat is not None:
+        sort.append(geo_sort(near_lat, near_lng))
+    elif sort_by != RELEVANCE_SORT:
         sort.append("created_at:desc")
     
     # Perform search
@@ -390,59 +872,95 @@ def _search_properties_meilisearch(
         sort=sort,
         limit=page_size,
         offset=skip,
+        geo_radius=_geo_radius(near_lat, near_lng, radius_m),
+        attributes_to_retrieve=CARD_ATTRIBUTES,
     )
     
-    # Get property IDs from search results
-    property_ids = [hit["id"] for hit in results["hits"]]
-    
-    # Fetch full property data from database
-    properties = []
-    if property_ids:
-        # Get properties in order of search results
-        props_dict = {str(p.id): p for p in crud_property.get_multi_by_ids(db, ids=property_ids)}
-        properties = [props_dict[pid] for pid in property_ids if pid in props_dict]
+    # Documents carry everything a card needs; only documents indexed with an
+    # older shape are re-hydrated from the database
+    stale_ids = [hit["id"] for hit in results["hits"] if hit.get("doc_version") != DOCUMENT_VERSION]
+    stale_cards = {}
+    if stale_ids:
+        stale_cards = {
+            str(row.id): _format_property_card(row)
+            for row in crud_property.get_cards_by_ids(db, ids=stale_ids)
+        }
     
-    # Format response
     formatted_properties = []
-    for prop in properties:
-        prop_dict = {
-            "id": str(prop.id),
-            "title_en": prop.title_en,
-            "title_ar": prop.title_ar,
-            "slug_en": prop.slug_en,
-            "slug_ar": prop.slug_ar,
-            "description_en": prop.description_en,
-            "description_ar": prop.description_ar,
-            "purpose": prop.purpose.value if hasattr(prop.purpose, 'value') else prop.purpose,
-            "type": prop.type.value if hasattr(prop.type, 'value') else prop.type,
-            "status": prop.status.value if hasattr(prop.status, 'value') else prop.status,
-            "price_amount": float(prop.price_amount),
-            "price_currency": prop.price_currency.value if hasattr(prop.price_currency, 'value') else prop.price_currency,
-            "area_m2": float(prop.area_m2) if prop.area_m2 else None,
-            "bedrooms": prop.bedrooms,
-            "bathrooms": prop.bathrooms,
-            "furnished": prop.furnished,
-            "parking": prop.parking,
-            "floor": prop.floor,
-            "year_built": prop.year_built,
-            "lat": float(prop.lat) if prop.lat else None,
-            "lng": float(prop.lng) if prop.lng else None,
-            "featured": prop.featured,
-            "published": prop.published,
-            "location_id": str(prop.location_id),
-            "agent_id": str(prop.agent_id) if prop.agent_id else None,
-            "created_at": prop.created_at.isoformat(),
-            "updated_at": prop.updated_at.isoformat(),
-            "first_image": prop.images[0].file_key if prop.images else None,
-            "location_name": prop.location.name_en if prop.location else None,
-        }
-        formatted_properties.append(prop_dict)
+    for hit in results["hits"]:
+        if hit.get("doc_version") == DOCUMENT_VERSION:
+            formatted_properties.append(_format_search_hit(hit))
+        elif hit["id"] in stale_cards:
+            formatted_properties.append(stale_cards[hit["id"]])
+    
+    if near_lat is not None:
+        # Same haversine distance the database path returns
+        located = [card for card in formatted_properties if card["lat"] is not None and card["lng"] is not None]
+        if located:
+            distances = haversine_m(
+                near_lat,
+                near_lng,
+                np.array([card["lat"] for card in located]),
+                np.array([card["lng"] for card in located]),
+            )
+            for card, distance in zip(located, distances):
+                card["distance_m"] = round(float(distance), 1)
     
     return {
         "items": formatted_properties,
         "total": results["total"],
+        "total_is_estimate": True,  # Meilisearch reports estimatedTotalHits
         "page": page,
         "page_size": page_size,
         "total_pages": (results["total"] + page_size - 1) // page_size,
+        "next_cursor": None,
     }
 
+
+def _meilisearch_filters(
+    purpose: Optional[str] = None,
+    type: Optional[Union[str, List[str]]] = None,
+    location_slug: Optional[Union[str, List[str]]] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    bedrooms: Optional[int] = None,
+    bathrooms: Optional[int] = None,
+    min_area: Optional[float] = None,
+    max_area: Optional[float] = None,
+    year_built: Optional[int] = None,
+    furnished: Optional[bool] = None,
+    parking: Optional[bool] = None,
+    floor: Optional[int] = None,
+    featured: Optional[bool] = None,
+    near: Optional[dict] = None,
+    min_walkability: Optional[int] = None,
+) -> dict:
+    """
+    Build the Meilisearch filter dictionary for listing filters.
+    
+    Mirrors CRUDProperty.filter_query so text search and database filtering
+    return the same result sets. Location slugs are indexed on the document,
+    so no database lookup is needed.
+    """
+    def as_list(value):
+        if value is None:
+            return None
+        return value if isinstance(value, list) else [value]
+    
+    return {
+        "published": True,  # Always filter published
+        "purpose": purpose or None,
+        "type": as_list(type),
+        ("location_slug_en", "location_slug_ar"): as_list(location_slug),
+        "price_amount": {"gte": min_price, "lte": max_price},
+        "bedrooms": {"gte": bedrooms},
+        "bathrooms": {"gte": bathrooms},
+        "area_m2": {"gte": min_area, "lte": max_area},
+        "year_built": {"gte": year_built},
+        "furnished": furnished,
+        "parking": parking,
+        "floor": floor,
+        "featured": featured,
+        **{nearest_field(category): {"lte": meters} for category, meters in (near or {}).items()},
+        "walkability_score": {"gte": min_walkability},
+    }
@@ -3,11 +3,12 @@ Search-related endpoints for autocomplete and suggestions
 """
 from fastapi import APIRouter, Depends, Query, HTTPException, Request
 from sqlalchemy.orm import Session
-from typing import List, Optional
 from app.core.deps import get_db
-from app.services.meilisearch_service import meilisearch_service
-from app.crud.crud_property import crud_property
+from app.services.meilisearch_service import meilisearch_service, search_fallback_counter, SearchUnavailableError
+from app.crud.crud_property import crud_property, RELEVANCE_SORT
 from app.crud.crud_location import crud_location
+from app.schemas.search_analytics import SearchTrackEvent
+from app.services import search_analytics_service
 
 router = APIRouter()
 
@@ -28,27 +29,45 @@ def get_search_suggestions(
     suggestions = []
     
     # Use Meilisearch if available for fast autocomplete
-    if meilisearch_service.is_available():
+    hits = None
+    if meilisearch_service.can_search():
         try:
             results = meilisearch_service.search(
                 query=q,
                 filters={"published": True},
                 limit=limit,
                 offset=0,
+                attributes_to_retrieve=["title_en", "title_ar", "slug_en", "slug_ar", "location_name_en"],
             )
-            
-            for hit in results.get("hits", []):
-                suggestions.append({
-                    "type": "property",
-                    "title_en": hit.get("title_en", ""),
-                    "title_ar": hit.get("title_ar", ""),
-                    "slug_en": hit.get("slug_en", ""),
-                    "slug_ar": hit.get("slug_ar", ""),
-                    "location": hit.get("location_name_en", ""),
-                })
-        except Exception as e:
-            # Fallback to database if Meilisearch fails
-            pass
+            hits = results["hits"]
+        except SearchUnavailableError:
+            search_fallback_counter.inc(endpoint="suggestions")
+    
+    if hits is None:
+        # Fallback to database title/description matching
+        properties, _, _ = crud_property.get_cards_with_total(
+            db, limit=limit, sort_by=RELEVANCE_SORT, q=q, published=True
+        )
+        hits = [
+            {
+                "title_en": prop.title_en,
+                "title_ar": prop.title_ar,
+                "slug_en": prop.slug_en,
+                "slug_ar": prop.slug_ar,
+                "location_name_en": prop.location_name,
+            }
+            for prop in properties
+        ]
+    
+    for hit in hits:
+        suggestions.append({
+            "type": "property",
+            "title_en": hit.get("title_en", ""),
+            "title_ar": hit.get("title_ar", ""),
+            "slug_en": hit.get("slug_en", ""),
+            "slug_ar": hit.get("slug_ar", ""),
+            "location": hit.get("location_name_en", ""),
+        })
     
     # Also search locations
     locations = crud_location.get_multi(db, skip=0, limit=limit * 2)
@@ -65,48 +84,29 @@ def get_search_suggestions(
     return {"suggestions": suggestions[:limit]}
 
 
-@router.post("/track")
-def track_search(
-    query: Optional[str] = None,
-    filters: Optional[dict] = None,
-    result_count: Optional[int] = None,
-    request: Request = None,
-    db: Session = Depends(get_db),
+@router.post("/track", status_code=202)
+async def track_search(
+    event: SearchTrackEvent,
+    request: Request,
 ):
     """
     Track search queries for analytics.
-    Stores search activity in the database.
-    """
-    from app.db.models.search_analytics import SearchAnalytics
     
-    # Get IP and user agent if request is available
-    ip_address = None
-    user_agent = None
-    if request:
-        # Get IP from headers
-        forwarded = request.headers.get("X-Forwarded-For")
-        if forwarded:
-            ip_address = forwarded.split(",")[0].strip()
-        else:
-            real_ip = request.headers.get("X-Real-IP")
-            if real_ip:
-                ip_address = real_ip
-            elif request.client:
-                ip_address = request.client.host
-        
-        user_agent = request.headers.get("User-Agent")
+    The event is buffered in Redis and written to the database in batches by
+    the worker, so this returns immediately without touching the database.
+    """
+    # Get IP from headers
+    forwarded = request.headers.get("X-Forwarded-For")
+    if forwarded:
+        ip_address = forwarded.split(",")[0].strip()
+    else:
+        ip_address = request.headers.get("X-Real-IP") or (request.client.host if request.client else None)
     
-    # Create analytics record
-    search_analytics = SearchAnalytics(
-        query=query,
-        filters=filters,
-        result_count=result_count,
+    event_id = await search_analytics_service.track_search(
+        query=event.query,
+        filters=event.filters,
+        result_count=event.result_count,
         ip_address=ip_address,
-        user_agent=user_agent,
+        user_agent=request.headers.get("User-Agent"),
     )
-    
-    db.add(search_analytics)
-    db.commit()
-    
-    return {"status": "tracked", "id": str(search_analytics.id)}
-
+    return {"status": "accepted", "id": event_id}
@@ -5,6 +5,7 @@ from app.services.minio_service import minio_service
 from app.crud.crud_property_image import crud_property_image
 from app.schemas.upload import PresignedUploadResponse
 from app.schemas.property import PropertyImageCreate, PropertyImage
+from app.core.cache import response_cache, property_tag
 
 router = APIRouter()
 
@@ -26,7 +27,12 @@ def create_property_image(
     current_user = Depends(get_current_admin),
 ):
     """Register a property image after upload."""
-    return crud_property_image.create(db, obj_in=image_in)
+    image = crud_property_image.create(db, obj_in=image_in)
+    
+    # Listing cards show the first image
+    response_cache.invalidate([property_tag(image.property_id)])
+    
+    return image
 
 
 @router.delete("/property-images/{image_id}")
@@ -44,7 +50,9 @@ def delete_property_image(
     minio_service.delete_file(image.file_key)
     
     # Delete from database
+    property_id = image.property_id
     crud_property_image.remove(db, id=image_id)
+    response_cache.invalidate([property_tag(property_id)])
     
     return {"message": "Image deleted"}
 
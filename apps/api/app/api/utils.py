@@ -10,6 +10,9 @@ def serialize_model(obj: Any) -> dict:
     """Serialize a SQLAlchemy model to dictionary"""
     result = {}
     for column in obj.__table__.columns:
+        # Generated columns (search vectors) are internal
+        if column.computed is not None:
+            continue
         value = getattr(obj, column.name)
         
         # Handle different types
@@ -0,0 +1,262 @@
+"""
+Redis-backed response cache for hot public endpoints.
+
+Entries are keyed by a normalized hash of the request parameters and tagged
+with the properties and locations they depend on, so admin writes can drop
+exactly the pages they affect instead of flushing everything.
+"""
+import hashlib
+import json
+import logging
+import time
+import uuid
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+import redis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Same Redis instance as the rate limiter, with short timeouts so a slow
+# Redis degrades to "cache miss" instead of stalling requests.
+try:
+    cache_redis_client = redis.from_url(
+        settings.REDIS_URL,
+        decode_responses=True,
+        socket_connect_timeout=0.5,
+        socket_timeout=0.5,
+    )
+except Exception:
+    cache_redis_client = None
+
+# Compare-and-delete so a worker only releases the lock it acquired
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+# Store an entry and its tags only if no invalidation bumped the epoch since
+# the fill started; checked and written atomically so an invalidation can't
+# slip in between.
+#
+# KEYS: epoch key, entry key, tag keys...
+# ARGV: epoch seen before computing ("" if unset), body, ttl
+_STORE_SCRIPT = """
+if (redis.call("get", KEYS[1]) or "") ~= ARGV[1] then
+    return 0
+end
+redis.call("set", KEYS[2], ARGV[2], "EX", ARGV[3])
+for i = 3, #KEYS do
+    redis.call("sadd", KEYS[i], KEYS[2])
+    redis.call("expire", KEYS[i], ARGV[3])
+end
+return 1
+"""
+
+# Tag applied to listing pages that are not restricted to specific locations
+ALL_LOCATIONS_TAG = "location:*"
+
+
+def property_tag(property_id: Any) -> str:
+    return f"property:{property_id}"
+
+
+def location_tag(location_key: Any) -> str:
+    return f"location:{location_key}"
+
+
+def property_cache_tags(prop: Any) -> list:
+    """
+    Tags to invalidate when a property is created, changed or removed.
+
+    Covers pages that already contain the property and every listing page
+    whose location filter could start (or stop) matching it.
+    """
+    tags = [property_tag(prop.id), ALL_LOCATIONS_TAG, location_tag(prop.location_id)]
+    if prop.location:
+        tags.append(location_tag(prop.location.slug_en))
+        tags.append(location_tag(prop.location.slug_ar))
+    return tags
+
+
+def location_cache_tags(location: Any) -> list:
+    """Tags to invalidate when a location is renamed or removed."""
+    return [
+        location_tag(location.id),
+        location_tag(location.slug_en),
+        location_tag(location.slug_ar),
+    ]
+
+
+def normalize_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Normalize query parameters so equivalent requests share a cache key.
+
+    Drops unset values, trims strings and sorts comma-separated lists
+    (they are matched with IN, so order does not matter).
+    """
+    normalized = {}
+    for key, value in params.items():
+        if value is None:
+            continue
+        if isinstance(value, str):
+            value = value.strip()
+            if not value:
+                continue
+            if "," in value:
+                value = ",".join(sorted({v.strip() for v in value.split(",") if v.strip()}))
+        elif isinstance(value, float) and value.is_integer():
+            value = int(value)
+        normalized[key] = value
+    return normalized
+
+
+class ResponseCache:
+    """
+    Tag-invalidated JSON response cache with single-flight fills.
+
+    Layout in Redis:
+        cache:v1:<namespace>:<hash>   serialized response body
+        cache:v1:<...>:lock           fill lock held by the computing worker
+        cache:tag:<tag>               set of entry keys depending on <tag>
+        cache:epoch                   bumped on every invalidation
+    """
+
+    KEY_PREFIX = "cache:v1"
+    TAG_PREFIX = "cache:tag"
+    EPOCH_KEY = "cache:epoch"
+
+    def __init__(
+        self,
+        client: Optional[redis.Redis],
+        ttl: int = 60,
+        lock_timeout: float = 5.0,
+        enabled: bool = True,
+    ):
+        self.client = client
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self.enabled = enabled and client is not None
+        self._release_lock = client.register_script(_RELEASE_LOCK_SCRIPT) if client else None
+        self._store_script = client.register_script(_STORE_SCRIPT) if client else None
+
+    def make_key(self, namespace: str, params: Dict[str, Any]) -> str:
+        payload = json.dumps(normalize_params(params), sort_keys=True, separators=(",", ":"))
+        digest = hashlib.sha1(payload.encode("utf-8")).hexdigest()
+        return f"{self.KEY_PREFIX}:{namespace}:{digest}"
+
+    def get_or_compute(
+        self,
+        namespace: str,
+        params: Dict[str, Any],
+        compute: Callable[[], Dict[str, Any]],
+        tags_for: Callable[[Dict[str, Any]], Iterable[str]],
+    ) -> Tuple[str, bool]:
+        """
+        Return the serialized response for `params`, computing it on a miss.
+
+        Only one worker computes a given key at a time; concurrent misses wait
+        for that fill instead of all hitting the database.
+
+        Returns:
+            Tuple of (JSON body, whether it was served from cache)
+        """
+        if not self.enabled:
+            return self._serialize(compute()), False
+
+        key = self.make_key(namespace, params)
+
+        try:
+            cached = self.client.get(key)
+            if cached is not None:
+                return cached, True
+
+            lock_key = f"{key}:lock"
+            token = uuid.uuid4().hex
+            acquired = self.client.set(lock_key, token, nx=True, px=int(self.lock_timeout * 1000))
+            if not acquired:
+                cached = self._wait_for_fill(key)
+                if cached is not None:
+                    return cached, True
+            epoch = self.client.get(self.EPOCH_KEY)
+        except redis.RedisError as e:
+            logger.warning(f"Response cache unavailable: {e}")
+            return self._serialize(compute()), False
+
+        try:
+            value = compute()
+            body = self._serialize(value)
+            self._store(key, body, tags_for(value), epoch)
+            return body, False
+        finally:
+            if acquired:
+                try:
+                    self._release_lock(keys=[lock_key], args=[token])
+                except redis.RedisError:
+                    pass
+
+    def invalidate(self, tags: Iterable[str]):
+        """Drop every cached entry carrying any of the given tags."""
+        if not self.enabled:
+            return
+
+        tag_keys = [f"{self.TAG_PREFIX}:{tag}" for tag in set(tags)]
+        if not tag_keys:
+            return
+
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for tag_key in tag_keys:
+                pipe.smembers(tag_key)
+            members = pipe.execute()
+
+            entry_keys = set()
+            for keys in members:
+                entry_keys.update(keys)
+
+            pipe = self.client.pipeline(transaction=True)
+            pipe.incr(self.EPOCH_KEY)
+            if entry_keys:
+                pipe.delete(*entry_keys)
+            pipe.delete(*tag_keys)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.error(f"Response cache invalidation failed: {e}")
+
+    def _wait_for_fill(self, key: str) -> Optional[str]:
+        """Poll for a value being computed by another worker."""
+        deadline = time.monotonic() + self.lock_timeout
+        delay = 0.005
+        while time.monotonic() < deadline:
+            time.sleep(delay)
+            cached = self.client.get(key)
+            if cached is not None:
+                return cached
+            delay = min(delay * 2, 0.1)
+        return None
+
+    def _store(self, key: str, body: str, tags: Iterable[str], epoch: Optional[str]):
+        # An invalidation that landed while we were computing means the
+        # result may already be stale: serve it, but don't cache it.
+        tag_keys = [f"{self.TAG_PREFIX}:{tag}" for tag in set(tags)]
+        try:
+            self._store_script(
+                keys=[self.EPOCH_KEY, key] + tag_keys,
+                args=[epoch or "", body, self.ttl],
+            )
+        except redis.RedisError as e:
+            logger.warning(f"Response cache store failed: {e}")
+
+    @staticmethod
+    def _serialize(value: Dict[str, Any]) -> str:
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+response_cache = ResponseCache(
+    cache_redis_client,
+    ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+    enabled=settings.RESPONSE_CACHE_ENABLED,
+)
@@ -0,0 +1,156 @@
+"""
+Circuit breaker for calls to external services.
+
+States:
+    closed     calls go through; consecutive failures (errors or calls slower
+               than the latency limit) are counted
+    open       calls are rejected immediately; a background probe checks the
+               service's health
+    half_open  a single trial call is let through; success closes the
+               breaker, failure opens it again
+"""
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Numeric encoding of the state for the gauge
+STATE_VALUES = {CLOSED: 0, OPEN: 1, HALF_OPEN: 2}
+
+breaker_state_gauge = metrics.gauge(
+    "circuit_breaker_state",
+    "Circuit breaker state (0=closed, 1=open, 2=half_open)",
+)
+breaker_transitions_counter = metrics.counter(
+    "circuit_breaker_transitions_total",
+    "Circuit breaker state transitions",
+)
+breaker_rejected_counter = metrics.counter(
+    "circuit_breaker_rejected_total",
+    "Calls rejected because the circuit breaker was open",
+)
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker with latency-based tripping.
+    
+    Args:
+        name: Label used in logs and metrics
+        failure_threshold: Consecutive failures that open the breaker
+        slow_call_seconds: Calls slower than this count as failures
+        reset_timeout: Seconds to stay open before allowing a trial call
+        probe: Optional health check; while open it runs every
+            `probe_interval` seconds and moves the breaker to half-open as
+            soon as it succeeds
+        probe_interval: Seconds between health probes
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        slow_call_seconds: float = 1.0,
+        reset_timeout: float = 30.0,
+        probe: Optional[Callable[[], bool]] = None,
+        probe_interval: float = 5.0,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.reset_timeout = reset_timeout
+        self.probe = probe
+        self.probe_interval = probe_interval
+        
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._probe_thread: Optional[threading.Thread] = None
+        breaker_state_gauge.set(STATE_VALUES[CLOSED], breaker=name)
+    
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._transition(HALF_OPEN)
+            return self._state
+    
+    def allow_request(self) -> bool:
+        """Whether a call may be attempted now (reserves the half-open trial)."""
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._transition(HALF_OPEN)
+            
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+        
+        breaker_rejected_counter.inc(breaker=self.name)
+        return False
+    
+    def record_success(self, duration: float):
+        """Record a completed call; slow calls are treated as failures."""
+        if duration > self.slow_call_seconds:
+            logger.warning(f"{self.name}: slow call ({duration:.2f}s)")
+            self.record_failure()
+            return
+        
+        with self._lock:
+            self._failures = 0
+            self._trial_in_flight = False
+            if self._state != CLOSED:
+                self._transition(CLOSED)
+    
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._state == HALF_OPEN or (
+                self._state == CLOSED and self._failures >= self.failure_threshold
+            ):
+                self._open()
+    
+    def _open(self):
+        self._opened_at = time.monotonic()
+        self._transition(OPEN)
+        if self.probe and not (self._probe_thread and self._probe_thread.is_alive()):
+            self._probe_thread = threading.Thread(
+                target=self._run_probe, name=f"{self.name}-probe", daemon=True
+            )
+            self._probe_thread.start()
+    
+    def _transition(self, state: str):
+        # Caller holds self._lock
+        logger.warning(f"{self.name}: circuit {self._state} -> {state}")
+        self._state = state
+        breaker_state_gauge.set(STATE_VALUES[state], breaker=self.name)
+        breaker_transitions_counter.inc(breaker=self.name, state=state)
+    
+    def _run_probe(self):
+        """Probe health while open; a healthy probe allows the half-open trial early."""
+        while True:
+            time.sleep(self.probe_interval)
+            with self._lock:
+                if self._state != OPEN:
+                    return
+            try:
+                healthy = self.probe()
+            except Exception:
+                healthy = False
+            if healthy:
+                with self._lock:
+                    if self._state == OPEN:
+                        self._transition(HALF_OPEN)
+                return
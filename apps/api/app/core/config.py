@@ -9,6 +9,20 @@ class Settings(BaseSettings):
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
     
+    # Rate limiting: max tokens a worker reserves per Redis call and serves
+    # locally (capped per limiter; 1 = check Redis on every request)
+    RATE_LIMIT_LOCAL_LEASE: int = 10
+    
+    # Response cache (public listing pages)
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_TTL_SECONDS: int = 60
+    
+    # Listing totals above this many rows use the planner estimate (0 = always exact)
+    LISTING_COUNT_ESTIMATE_THRESHOLD: int = 10000
+    
+    # In-memory map cluster index: how often each API worker polls for changed listings
+    MAP_INDEX_REFRESH_SECONDS: float = 10.0
+    
     # JWT
     JWT_SECRET: str
     JWT_ALGORITHM: str = "HS256"
@@ -26,6 +40,51 @@ class Settings(BaseSettings):
     # Meilisearch (optional)
     MEILI_URL: Optional[str] = None
     MEILI_MASTER_KEY: Optional[str] = None
+    MEILI_SETTINGS_CHECK_INTERVAL_SECONDS: int = 300
+    MEILI_TIMEOUT_SECONDS: int = 2
+    # Indexing calls (bulk add_documents, reindex, outbox relay) use their own client
+    MEILI_WRITE_TIMEOUT_SECONDS: int = 60
+    
+    # Meilisearch circuit breaker: trips after this many consecutive failed
+    # (or slower than MEILI_BREAKER_SLOW_CALL_SECONDS) searches
+    MEILI_BREAKER_FAILURE_THRESHOLD: int = 5
+    MEILI_BREAKER_SLOW_CALL_SECONDS: float = 1.0
+    MEILI_BREAKER_RESET_SECONDS: float = 30.0
+    MEILI_BREAKER_PROBE_SECONDS: float = 5.0
+    
+    # Search outbox relay (DB -> Meilisearch), run by the worker
+    SEARCH_SYNC_ENABLED: bool = True
+    SEARCH_SYNC_DEBOUNCE_SECONDS: float = 2.0
+    SEARCH_SYNC_BATCH_SIZE: int = 500
+    SEARCH_SYNC_POLL_SECONDS: float = 1.0
+    
+    # Search tracking buffer (Redis stream -> search_analytics, flushed by the worker)
+    SEARCH_ANALYTICS_FLUSH_BATCH_SIZE: int = 1000
+    SEARCH_ANALYTICS_FLUSH_SECONDS: float = 2.0
+    SEARCH_ANALYTICS_STREAM_MAXLEN: int = 1_000_000  # Oldest events are dropped beyond this
+    
+    # Search analytics rollups (hourly/daily), refreshed by the worker. They
+    # advance on inserted_at; rows inserted within the lag are left for the
+    # next run, so slow insert transactions commit before they are passed.
+    SEARCH_ROLLUP_INTERVAL_MINUTES: int = 5
+    SEARCH_ROLLUP_LAG_MINUTES: int = 10
+    
+    # Monthly partitions of search_analytics and activity_logs (app.db.partitions),
+    # created ahead and dropped past retention by the worker (0 = keep forever)
+    PARTITION_MONTHS_AHEAD: int = 3
+    SEARCH_ANALYTICS_RETENTION_MONTHS: int = 13
+    ACTIVITY_LOG_RETENTION_MONTHS: int = 24
+    
+    # Batched nearby-POI refresh (app.services.poi_refresh_service)
+    POI_REFRESH_MAX_AGE_DAYS: int = 30
+    POI_REFRESH_SOURCE: str = "overpass"  # "overpass" or "local" (imported pois table)
+    POI_REFRESH_CONCURRENCY: int = 2
+    POI_REFRESH_INTERVAL_HOURS: int = 24  # Run by the worker (0 = only on demand)
+    
+    # Background job worker (python -m app.worker)
+    WORKER_QUEUES: str = "pois,search,default"  # Comma-separated, highest priority first
+    WORKER_CONCURRENCY: int = 2  # Jobs run at once per worker process
+    WORKER_POLL_SECONDS: float = 1.0
     
     # CORS
     PUBLIC_WEB_ORIGIN: str = "http://localhost:3000"
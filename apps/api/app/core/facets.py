@@ -0,0 +1,39 @@
+"""
+Facet bucket definitions shared by the SQL and Meilisearch facet paths.
+
+Both engines must agree on bucket numbering, so documents are indexed with
+the same bucket values the GROUPING SETS query computes.
+"""
+from bisect import bisect_right
+from typing import Any, Optional, Tuple
+
+# Lower bounds of the price histogram buckets (in price_amount units).
+# Bucket N covers [PRICE_BUCKETS[N-1], PRICE_BUCKETS[N]), matching
+# Postgres width_bucket(price, thresholds).
+PRICE_BUCKETS = [0, 50_000, 100_000, 200_000, 300_000, 500_000, 750_000, 1_000_000, 2_000_000]
+
+# Bedroom counts at or above this are reported together as "N+"
+BEDROOMS_MAX_BUCKET = 5
+
+
+def price_bucket(price: Any) -> Optional[int]:
+    """Histogram bucket number for a price, or None when unset."""
+    if price is None:
+        return None
+    return bisect_right(PRICE_BUCKETS, float(price))
+
+
+def price_bucket_range(bucket: int) -> Tuple[Optional[float], Optional[float]]:
+    """(min, max) bounds of a bucket; max is None for the open-ended last one."""
+    low = PRICE_BUCKETS[bucket - 1] if bucket > 0 else None
+    high = PRICE_BUCKETS[bucket] if bucket < len(PRICE_BUCKETS) else None
+    return low, high
+
+
+def bedrooms_bucket(bedrooms: Optional[int]) -> Optional[str]:
+    """Bedrooms facet value: the count itself, or "N+" for large units."""
+    if bedrooms is None:
+        return None
+    if bedrooms >= BEDROOMS_MAX_BUCKET:
+        return f"{BEDROOMS_MAX_BUCKET}+"
+    return str(bedrooms)
@@ -0,0 +1,144 @@
+"""
+Vectorized geographic helpers shared by the POI, map and radius features.
+
+All distances are great-circle (haversine) distances in meters, computed with
+NumPy over whole coordinate arrays instead of point by point.
+"""
+import math
+from typing import List, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_M = 6371000.0
+
+# Length of one degree of latitude (and of longitude at the equator)
+METERS_PER_DEGREE = math.pi * EARTH_RADIUS_M / 180
+
+# Largest radius accepted by radius searches
+MAX_SEARCH_RADIUS_M = 50_000
+
+# Geohashes interleave longitude and latitude bits, 5 bits per character.
+# Properties store GEOHASH_PRECISION characters (cells of about 5 x 5 m), and
+# a cell's points share its geohash as a prefix.
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 9
+
+
+def haversine_m(lat: float, lng: float, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """Distances in meters from one point to each of `lats`/`lngs`."""
+    lat1 = math.radians(lat)
+    lat2 = np.radians(lats)
+    dlat = lat2 - lat1
+    dlng = np.radians(lngs) - math.radians(lng)
+    a = np.sin(dlat / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def haversine_matrix(
+    lats1: np.ndarray,
+    lngs1: np.ndarray,
+    lats2: np.ndarray,
+    lngs2: np.ndarray,
+) -> np.ndarray:
+    """Pairwise distances in meters, shape (len(lats1), len(lats2))."""
+    lat1 = np.radians(lats1)[:, None]
+    lat2 = np.radians(lats2)[None, :]
+    dlat = lat2 - lat1
+    dlng = np.radians(lngs2)[None, :] - np.radians(lngs1)[:, None]
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def degree_span(lat: float, meters: float) -> Tuple[float, float]:
+    """(latitude, longitude) degrees covering `meters` around latitude `lat`."""
+    dlat = meters / METERS_PER_DEGREE
+    dlng = meters / (METERS_PER_DEGREE * max(math.cos(math.radians(lat)), 0.01))
+    return dlat, dlng
+
+
+def parse_bbox(value: str) -> Tuple[float, float, float, float]:
+    """
+    Parse a "west,south,east,north" bounding box in degrees.
+    
+    Raises:
+        ValueError: If the box is malformed or out of range
+    """
+    try:
+        west, south, east, north = (float(part) for part in value.split(","))
+    except ValueError:
+        raise ValueError("bbox must be west,south,east,north")
+    if not (-180 <= west < east <= 180 and -90 <= south < north <= 90):
+        raise ValueError("bbox is out of range or empty")
+    return west, south, east, north
+
+
+def geohash_encode(lat: float, lng: float, precision: int = GEOHASH_PRECISION) -> str:
+    """
+    Geohash of a point.
+    
+    Same bisection as the geohash_encode() SQL function behind
+    Property.geohash, so both produce identical strings.
+    """
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    code = 0
+    even = True
+    while len(chars) < precision:
+        value, bounds = (lng, lng_range) if even else (lat, lat_range)
+        mid = (bounds[0] + bounds[1]) / 2
+        if value >= mid:
+            code = code * 2 + 1
+            bounds[0] = mid
+        else:
+            code = code * 2
+            bounds[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(GEOHASH_ALPHABET[code])
+            bits = 0
+            code = 0
+    return "".join(chars)
+
+
+def geohash_cell_size(precision: int) -> Tuple[float, float]:
+    """(latitude, longitude) degrees spanned by a geohash cell."""
+    lng_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lng_bits)
+
+
+def geohash_cover_bbox(west: float, south: float, east: float, north: float) -> List[str]:
+    """
+    Geohash prefixes whose cells together cover a bounding box.
+    
+    Uses the finest precision whose cells are at least half the box on each
+    side, so the box touches at most 3 x 3 cells; each prefix becomes one
+    B-tree range scan.
+    """
+    precision = 1
+    for candidate in range(GEOHASH_PRECISION, 0, -1):
+        cell_lat, cell_lng = geohash_cell_size(candidate)
+        if cell_lat >= (north - south) / 2 and cell_lng >= (east - west) / 2:
+            precision = candidate
+            break
+    
+    cell_lat, cell_lng = geohash_cell_size(precision)
+    south, north = max(south, -90.0), min(north, 90.0)
+    west, east = max(west, -180.0), min(east, 180.0)
+    
+    prefixes = set()
+    for row in range(math.floor((south + 90) / cell_lat), math.floor((north + 90) / cell_lat) + 1):
+        for column in range(math.floor((west + 180) / cell_lng), math.floor((east + 180) / cell_lng) + 1):
+            center_lat = min(-90 + (row + 0.5) * cell_lat, 90.0)
+            center_lng = min(-180 + (column + 0.5) * cell_lng, 180.0)
+            prefixes.add(geohash_encode(center_lat, center_lng, precision))
+    return sorted(prefixes)
+
+
+def geohash_cover(lat: float, lng: float, radius_m: float) -> List[str]:
+    """Geohash prefixes whose cells together cover a circle (see geohash_cover_bbox)."""
+    dlat, dlng = degree_span(lat, radius_m)
+    return geohash_cover_bbox(lng - dlng, lat - dlat, lng + dlng, lat + dlat)
@@ -0,0 +1,462 @@
+"""
+Durable background jobs on Redis.
+
+Jobs are small JSON payloads addressed to a registered handler by name. They
+live in Redis until they finish, so they survive API and worker restarts:
+
+- jobs:queue:<queue>   list of ready job ids, consumed in FIFO order
+- jobs:scheduled       sorted set of delayed jobs and retries (score = run at)
+- jobs:running         sorted set of claimed jobs (score = lease deadline);
+                       jobs whose worker died are retried once the lease expires
+- jobs:job:<id>        hash with the job's name, payload, state and timings
+
+Handlers are registered with @job_queue.job(...) and executed by the worker
+process (python -m app.worker); the API only enqueues.
+
+Delivery is at least once: a job that outlives its lease is retried while
+the first run may still be going, so handlers must be idempotent. Only the
+run that still holds the lease records an outcome; a late finisher's result
+is logged and discarded.
+"""
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import redis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    jobs_redis_client = redis.from_url(
+        settings.REDIS_URL,
+        decode_responses=True,
+        socket_connect_timeout=2,
+        socket_timeout=5,
+    )
+except Exception:
+    jobs_redis_client = None
+
+KEY_PREFIX = "jobs:"
+SCHEDULED_KEY = KEY_PREFIX + "scheduled"
+RUNNING_KEY = KEY_PREFIX + "running"
+DEAD_KEY = KEY_PREFIX + "dead"
+STATS_KEY = KEY_PREFIX + "stats"
+
+# Job states
+QUEUED = "queued"
+SCHEDULED = "scheduled"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+# Finished jobs are kept this long for status lookups
+RESULT_TTL_SECONDS = 7 * 24 * 3600
+
+# Dedup keys expire on their own in case the enqueueing process died midway
+DEDUP_TTL_SECONDS = 24 * 3600
+
+# Failed job ids kept for inspection
+DEAD_LETTER_MAX = 1000
+
+# Retry delay: RETRY_BASE_SECONDS * 2^(attempt - 1), capped, with jitter
+RETRY_BASE_SECONDS = 10
+RETRY_MAX_SECONDS = 3600
+
+
+def _queue_key(queue: str) -> str:
+    return f"{KEY_PREFIX}queue:{queue}"
+
+
+def _job_key(job_id: str) -> str:
+    return f"{KEY_PREFIX}job:{job_id}"
+
+
+def _dedup_key(key: str) -> str:
+    return f"{KEY_PREFIX}dedup:{key}"
+
+
+def _latest_key(name: str) -> str:
+    return f"{KEY_PREFIX}latest:{name}"
+
+
+def _periodic_key(name: str) -> str:
+    return f"{KEY_PREFIX}periodic:{name}"
+
+
+# Pop the first ready job from the given queues (in priority order) and lease it.
+#
+# KEYS: running set, then one list per queue
+# ARGV: now, job key prefix, dedup key prefix
+#
+# Releases the job's dedup key, so a change made while the job runs queues a
+# fresh one. Returns the job id, or false when every queue is empty.
+_CLAIM_SCRIPT = """
+local now = tonumber(ARGV[1])
+for i = 2, #KEYS do
+    local id = redis.call("LPOP", KEYS[i])
+    while id do
+        local key = ARGV[2] .. id
+        local timeout = redis.call("HGET", key, "timeout")
+        if timeout then
+            redis.call("ZADD", KEYS[1], now + tonumber(timeout), id)
+            redis.call("HSET", key, "state", "running", "started_at", ARGV[1])
+            redis.call("HINCRBY", key, "attempts", 1)
+            local dedup = redis.call("HGET", key, "dedup_key")
+            if dedup and redis.call("GET", ARGV[3] .. dedup) == id then
+                redis.call("DEL", ARGV[3] .. dedup)
+            end
+            return id
+        end
+        -- Job hash is gone (expired or removed); skip the orphaned id
+        id = redis.call("LPOP", KEYS[i])
+    end
+end
+return false
+"""
+
+# Move due scheduled jobs onto their queues.
+#
+# KEYS: scheduled set
+# ARGV: now, job key prefix, queue key prefix, max jobs to move
+_PROMOTE_SCRIPT = """
+local ids = redis.call("ZRANGEBYSCORE", KEYS[1], "-inf", ARGV[1], "LIMIT", 0, tonumber(ARGV[4]))
+for _, id in ipairs(ids) do
+    redis.call("ZREM", KEYS[1], id)
+    local queue = redis.call("HGET", ARGV[2] .. id, "queue")
+    if queue then
+        redis.call("HSET", ARGV[2] .. id, "state", "queued")
+        redis.call("RPUSH", ARGV[3] .. queue, id)
+    end
+end
+return #ids
+"""
+
+
+# Give up a job's lease, if the caller's attempt still holds it.
+#
+# KEYS: running set, job key
+# ARGV: job id, attempt number the caller claimed
+#
+# Returns 1 if the lease was released, 0 if it had already expired or been
+# taken over by a retry (which bumps the attempt number).
+_RELEASE_SCRIPT = """
+if redis.call("HGET", KEYS[2], "attempts") ~= ARGV[2] then
+    return 0
+end
+return redis.call("ZREM", KEYS[1], ARGV[1])
+"""
+
+
+@dataclass
+class JobSpec:
+    name: str
+    func: Callable[..., Any]
+    queue: str = "default"
+    max_attempts: int = 5
+    timeout: int = 600  # Lease in seconds; a job running longer is assumed lost
+    every: Optional[int] = None  # Run periodically, every this many seconds
+
+
+class JobQueue:
+    """Registry of job handlers plus the Redis operations on jobs."""
+    
+    def __init__(self, client: Optional[redis.Redis]):
+        self.client = client
+        self.specs: Dict[str, JobSpec] = {}
+        self._claim = client.register_script(_CLAIM_SCRIPT) if client else None
+        self._promote = client.register_script(_PROMOTE_SCRIPT) if client else None
+        self._release = client.register_script(_RELEASE_SCRIPT) if client else None
+        self._local = threading.local()
+    
+    def job(
+        self,
+        name: str,
+        queue: str = "default",
+        max_attempts: int = 5,
+        timeout: int = 600,
+        every: Optional[int] = None,
+    ):
+        """
+        Register the decorated function as the handler of job `name`.
+        
+        The handler is called with the job payload as keyword arguments; its
+        return value (JSON-serializable) is stored as the job result. Handlers
+        must be idempotent: a run that outlives `timeout` is retried while it
+        may still be going.
+        """
+        def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+            self.specs[name] = JobSpec(
+                name=name,
+                func=func,
+                queue=queue,
+                max_attempts=max_attempts,
+                timeout=timeout,
+                every=every,
+            )
+            return func
+        return decorator
+    
+    def enqueue(
+        self,
+        name: str,
+        payload: Optional[Dict[str, Any]] = None,
+        delay: float = 0,
+        dedup_key: Optional[str] = None,
+    ) -> str:
+        """
+        Queue a job.
+        
+        Args:
+            name: Registered job name
+            payload: Keyword arguments for the handler
+            delay: Seconds to wait before the job becomes runnable
+            dedup_key: At most one queued job per key; while one is waiting,
+                enqueueing again returns its id instead of adding another
+        
+        Returns:
+            The job id
+        """
+        spec = self.specs[name]
+        job_id = uuid.uuid4().hex
+        
+        if dedup_key:
+            if not self.client.set(_dedup_key(dedup_key), job_id, nx=True, ex=DEDUP_TTL_SECONDS):
+                existing = self.client.get(_dedup_key(dedup_key))
+                if existing:
+                    return existing
+                self.client.set(_dedup_key(dedup_key), job_id, ex=DEDUP_TTL_SECONDS)
+        
+        now = time.time()
+        run_at = now + delay
+        pipe = self.client.pipeline(transaction=True)
+        pipe.hset(_job_key(job_id), mapping={
+            "id": job_id,
+            "name": name,
+            "queue": spec.queue,
+            "payload": json.dumps(payload or {}),
+            "state": SCHEDULED if delay > 0 else QUEUED,
+            "attempts": 0,
+            "max_attempts": spec.max_attempts,
+            "timeout": spec.timeout,
+            "dedup_key": dedup_key or "",
+            "enqueued_at": now,
+            "run_at": run_at,
+        })
+        if delay > 0:
+            pipe.zadd(SCHEDULED_KEY, {job_id: run_at})
+        else:
+            pipe.rpush(_queue_key(spec.queue), job_id)
+        pipe.set(_latest_key(name), job_id)
+        pipe.execute()
+        return job_id
+    
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Job record with its payload, result and progress decoded, or None."""
+        data = self.client.hgetall(_job_key(job_id))
+        if not data:
+            return None
+        
+        job: Dict[str, Any] = {
+            "id": data["id"],
+            "name": data["name"],
+            "queue": data["queue"],
+            "state": data["state"],
+            "attempts": int(data.get("attempts", 0)),
+            "max_attempts": int(data.get("max_attempts", 0)),
+            "payload": json.loads(data.get("payload") or "{}"),
+            "error": data.get("error"),
+            "result": json.loads(data["result"]) if data.get("result") else None,
+            "progress": json.loads(data["progress"]) if data.get("progress") else None,
+        }
+        for field in ("enqueued_at", "run_at", "started_at", "finished_at"):
+            if data.get(field):
+                job[field] = datetime.utcfromtimestamp(float(data[field])).isoformat()
+        return job
+    
+    def get_latest(self, name: str) -> Optional[Dict[str, Any]]:
+        """Most recently enqueued job of this name, or None."""
+        job_id = self.client.get(_latest_key(name))
+        return self.get_job(job_id) if job_id else None
+    
+    def is_pending(self, name: str) -> bool:
+        """Whether the latest job of this name is still waiting or running."""
+        job = self.get_latest(name)
+        return job is not None and job["state"] in (QUEUED, SCHEDULED, RUNNING)
+    
+    def report_progress(self, progress: Dict[str, Any]):
+        """Store progress on the job the calling worker thread is running (no-op elsewhere)."""
+        job_id = getattr(self._local, "job_id", None)
+        if job_id:
+            self.client.hset(_job_key(job_id), "progress", json.dumps(progress, default=str))
+    
+    def claim(self, queues: List[str]) -> Optional[str]:
+        """Lease the next ready job from `queues` (first queue first)."""
+        return self._claim(
+            keys=[RUNNING_KEY] + [_queue_key(queue) for queue in queues],
+            args=[time.time(), _job_key(""), _dedup_key("")],
+        )
+    
+    def promote_due(self, limit: int = 100) -> int:
+        """Move scheduled jobs whose time has come onto their queues."""
+        return self._promote(
+            keys=[SCHEDULED_KEY],
+            args=[time.time(), _job_key(""), _queue_key(""), limit],
+        )
+    
+    def requeue_expired(self) -> int:
+        """Treat running jobs past their lease as failed attempts (the worker died)."""
+        expired = self.client.zrangebyscore(RUNNING_KEY, "-inf", time.time())
+        count = 0
+        for job_id in expired:
+            # ZREM decides which scheduler handles the job
+            if self.client.zrem(RUNNING_KEY, job_id):
+                self._fail(job_id, "Lease expired (worker stopped or job timed out)")
+                count += 1
+        return count
+    
+    def enqueue_periodic(self) -> List[str]:
+        """Queue each periodic job whose interval has elapsed (once across all workers)."""
+        queued = []
+        for spec in self.specs.values():
+            if not spec.every:
+                continue
+            if self.client.set(_periodic_key(spec.name), time.time(), nx=True, ex=spec.every):
+                queued.append(self.enqueue(spec.name, dedup_key=spec.name))
+        return queued
+    
+    def _owns_lease(self, job_id: str, attempt: str) -> bool:
+        """Release the lease of `attempt`; False if it expired or a retry took the job over."""
+        return bool(self._release(keys=[RUNNING_KEY, _job_key(job_id)], args=[job_id, attempt]))
+    
+    def execute(self, job_id: str) -> bool:
+        """
+        Run a claimed job and record the outcome.
+        
+        The outcome is only recorded if this run still holds the lease; after
+        it expired, requeue_expired has already scheduled a retry, whose
+        state must not be overwritten.
+        
+        Returns:
+            True if the handler succeeded and its result was recorded
+        """
+        data = self.client.hgetall(_job_key(job_id))
+        attempt = data.get("attempts", "")
+        spec = self.specs.get(data.get("name"))
+        if spec is None:
+            if self._owns_lease(job_id, attempt):
+                self._fail(job_id, f"Unknown job: {data.get('name')}", retry=False)
+            return False
+        
+        started = time.perf_counter()
+        wait = max(0.0, float(data["started_at"]) - float(data["run_at"]))
+        self.client.hincrbyfloat(STATS_KEY, f"{spec.name}:wait_seconds", wait)
+        
+        self._local.job_id = job_id
+        try:
+            result = spec.func(**json.loads(data["payload"]))
+        except Exception as e:
+            seconds = time.perf_counter() - started
+            logger.error(f"Job {spec.name} ({job_id}) failed after {seconds:.2f}s: {e}")
+            self._record_timing(spec.name, seconds)
+            if self._owns_lease(job_id, attempt):
+                self._fail(job_id, str(e))
+            else:
+                logger.warning(f"Job {spec.name} ({job_id}) failed after its lease expired; already retried, error discarded")
+            return False
+        finally:
+            self._local.job_id = None
+        
+        seconds = time.perf_counter() - started
+        self._record_timing(spec.name, seconds)
+        if not self._owns_lease(job_id, attempt):
+            logger.warning(
+                f"Job {spec.name} ({job_id}) finished in {seconds:.2f}s, after its lease expired; "
+                f"already retried, result discarded: {json.dumps(result, default=str)[:500]}"
+            )
+            return False
+        logger.info(f"Job {spec.name} ({job_id}) succeeded in {seconds:.2f}s")
+        
+        pipe = self.client.pipeline(transaction=True)
+        pipe.hset(_job_key(job_id), mapping={
+            "state": SUCCEEDED,
+            "finished_at": time.time(),
+            "result": json.dumps(result, default=str),
+        })
+        pipe.hdel(_job_key(job_id), "error")
+        pipe.expire(_job_key(job_id), RESULT_TTL_SECONDS)
+        pipe.hincrby(STATS_KEY, f"{spec.name}:succeeded", 1)
+        pipe.execute()
+        return True
+    
+    def _record_timing(self, name: str, seconds: float):
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hincrby(STATS_KEY, f"{name}:runs", 1)
+        pipe.hincrbyfloat(STATS_KEY, f"{name}:seconds", seconds)
+        pipe.execute()
+        # Not atomic with the read, but only ever raised
+        if seconds > float(self.client.hget(STATS_KEY, f"{name}:max_seconds") or 0):
+            self.client.hset(STATS_KEY, f"{name}:max_seconds", round(seconds, 3))
+    
+    def _fail(self, job_id: str, error: str, retry: bool = True):
+        """Schedule a retry with backoff, or move the job to the dead letter list."""
+        data = self.client.hgetall(_job_key(job_id))
+        if not data:
+            return
+        name = data["name"]
+        attempts = int(data.get("attempts", 0))
+        
+        pipe = self.client.pipeline(transaction=True)
+        if retry and attempts < int(data.get("max_attempts", 1)):
+            delay = min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS)
+            run_at = time.time() + delay * random.uniform(0.8, 1.2)
+            pipe.hset(_job_key(job_id), mapping={"state": SCHEDULED, "error": error, "run_at": run_at})
+            pipe.zadd(SCHEDULED_KEY, {job_id: run_at})
+            pipe.hincrby(STATS_KEY, f"{name}:retried", 1)
+        else:
+            pipe.hset(_job_key(job_id), mapping={"state": FAILED, "error": error, "finished_at": time.time()})
+            pipe.expire(_job_key(job_id), RESULT_TTL_SECONDS)
+            pipe.lpush(DEAD_KEY, job_id)
+            pipe.ltrim(DEAD_KEY, 0, DEAD_LETTER_MAX - 1)
+            pipe.hincrby(STATS_KEY, f"{name}:failed", 1)
+        pipe.execute()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Queue depths and per-job counters and timings for the admin UI."""
+        queues = sorted({spec.queue for spec in self.specs.values()})
+        pipe = self.client.pipeline(transaction=False)
+        for queue in queues:
+            pipe.llen(_queue_key(queue))
+        pipe.zcard(SCHEDULED_KEY)
+        pipe.zcard(RUNNING_KEY)
+        pipe.llen(DEAD_KEY)
+        pipe.hgetall(STATS_KEY)
+        *depths, scheduled, running, dead, raw = pipe.execute()
+        
+        jobs: Dict[str, Dict[str, float]] = {}
+        for field, value in raw.items():
+            name, _, counter = field.rpartition(":")
+            jobs.setdefault(name, {})[counter] = float(value)
+        for name, counters in jobs.items():
+            runs = counters.get("runs", 0)
+            counters["avg_seconds"] = round(counters.get("seconds", 0) / runs, 3) if runs else None
+            counters["avg_wait_seconds"] = round(counters.get("wait_seconds", 0) / runs, 3) if runs else None
+        
+        return {
+            "queues": dict(zip(queues, depths)),
+            "scheduled": scheduled,
+            "running": running,
+            "dead": dead,
+            "jobs": jobs,
+        }
+
+
+# Singleton instance
+job_queue = JobQueue(jobs_redis_client)
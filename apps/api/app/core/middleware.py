@@ -0,0 +1,142 @@
+"""
+Pure ASGI middleware.
+
+These wrap the ASGI callable directly instead of going through
+BaseHTTPMiddleware, so they add no extra task or response stream per
+request and leave streaming responses (CSV exports) untouched.
+"""
+import re
+import time
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import metrics
+from app.core.rate_limit import (
+    RateLimiter,
+    admin_rate_limiter,
+    lead_submission_rate_limiter,
+    public_rate_limiter,
+)
+
+
+class PrefixTable:
+    """
+    Path-prefix lookup compiled once into a single regex.
+    
+    Entries are tried longest prefix first, so "/api/public/leads" wins over
+    "/api/public". Exact paths in `exempt` never match.
+    """
+    
+    def __init__(self, routes: Sequence[Tuple[str, Any]], exempt: Iterable[str] = ()):
+        ordered = sorted(routes, key=lambda route: len(route[0]), reverse=True)
+        self._values = [value for _, value in ordered]
+        self._pattern = re.compile(
+            "|".join(f"({re.escape(prefix)})" for prefix, _ in ordered) or "(?!)"
+        )
+        self._exempt = frozenset(exempt)
+    
+    def match(self, path: str) -> Optional[Any]:
+        if path in self._exempt:
+            return None
+        found = self._pattern.match(path)
+        if found is None:
+            return None
+        return self._values[found.lastindex - 1]
+
+
+# Which limiter applies to which part of the API
+RATE_LIMIT_ROUTES = PrefixTable(
+    [
+        ("/api/public/leads", lead_submission_rate_limiter),  # Stricter for form submissions
+        ("/api/admin", admin_rate_limiter),
+        ("/api/public", public_rate_limiter),
+    ],
+    exempt=["/health", "/", "/docs", "/openapi.json", "/redoc"],
+)
+
+
+class RateLimitMiddleware:
+    """Apply the limiter matching the request path and add RateLimit-* headers."""
+    
+    def __init__(self, app: ASGIApp, routes: PrefixTable = RATE_LIMIT_ROUTES):
+        self.app = app
+        self.routes = routes
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        limiter: Optional[RateLimiter] = self.routes.match(scope["path"])
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+        
+        result = await limiter.check_rate_limit(HTTPConnection(scope))
+        if result is None:
+            # Redis unavailable: allow
+            await self.app(scope, receive, send)
+            return
+        
+        if not result.allowed:
+            response = JSONResponse(
+                status_code=429,
+                content={
+                    "detail": "Rate limit exceeded. Please try again later.",
+                    "retry_after": result.reset,
+                },
+                headers={"Retry-After": str(result.reset), **result.headers()},
+            )
+            await response(scope, receive, send)
+            return
+        
+        rate_limit_headers = result.headers()
+        
+        async def send_with_headers(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).update(rate_limit_headers)
+            await send(message)
+        
+        await self.app(scope, receive, send_with_headers)
+
+
+request_count = metrics.counter(
+    "http_requests_total",
+    "HTTP requests by method and status class",
+)
+request_duration = metrics.counter(
+    "http_request_duration_seconds_total",
+    "Total time spent handling HTTP requests (until the response starts)",
+)
+
+
+class TimingMiddleware:
+    """Report time to first response byte as a Server-Timing header and metrics."""
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        started = time.perf_counter()
+        
+        async def send_with_timing(message: Message):
+            if message["type"] == "http.response.start":
+                elapsed = time.perf_counter() - started
+                MutableHeaders(scope=message).append("Server-Timing", f"app;dur={elapsed * 1000:.1f}")
+                labels: Dict[str, str] = {
+                    "method": scope["method"],
+                    "status": f"{message['status'] // 100}xx",
+                }
+                request_count.inc(**labels)
+                request_duration.inc(elapsed, **labels)
+            await send(message)
+        
+        await self.app(scope, receive, send_with_timing)
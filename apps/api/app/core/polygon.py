@@ -0,0 +1,208 @@
+"""
+Polygon filter for draw-on-map searches.
+
+A polygon arrives as GeoJSON (Polygon, MultiPolygon, a Feature wrapping
+either, or a bare [[lng, lat], ...] ring) or as Google encoded polylines,
+one per ring, separated by ";". Rings are held as (n, 2) arrays of
+(lat, lng) and evaluated with the even-odd rule, so holes and
+self-intersections need no special handling.
+
+Shapes are capped at MAX_POLYGON_INPUT_VERTICES and simplified to at most
+MAX_POLYGON_VERTICES, so one test costs at most that many edges per
+candidate point.
+"""
+import json
+import math
+from typing import Any, List, Tuple
+
+import numpy as np
+
+# Larger inputs are rejected outright
+MAX_POLYGON_INPUT_VERTICES = 2000
+
+# Inputs above this are simplified (Douglas-Peucker) down to it
+MAX_POLYGON_VERTICES = 200
+
+# Starting simplification tolerance in degrees (about 1 m), doubled until
+# the polygon fits
+SIMPLIFY_TOLERANCE = 1e-5
+
+# Points tested per NumPy pass (bounds the (points x edges) temporaries)
+_CHUNK_SIZE = 8192
+
+Ring = np.ndarray
+
+
+def _geojson_rings(data: Any) -> List[list]:
+    if isinstance(data, list):
+        return [data]
+    if not isinstance(data, dict):
+        raise ValueError("polygon must be a GeoJSON Polygon or MultiPolygon")
+    if data.get("type") == "Feature":
+        return _geojson_rings(data.get("geometry"))
+    if data.get("type") == "Polygon":
+        return list(data.get("coordinates") or [])
+    if data.get("type") == "MultiPolygon":
+        return [ring for polygon in data.get("coordinates") or [] for ring in polygon]
+    raise ValueError("polygon must be a GeoJSON Polygon or MultiPolygon")
+
+
+def decode_polyline(value: str) -> Ring:
+    """(lat, lng) vertices of a Google encoded polyline (precision 5)."""
+    numbers = []
+    current = shift = 0
+    for char in value:
+        byte = ord(char) - 63
+        if not 0 <= byte < 64:
+            raise ValueError("polygon is not a valid encoded polyline")
+        current |= (byte & 0x1F) << shift
+        shift += 5
+        if byte < 0x20:
+            numbers.append(~(current >> 1) if current & 1 else current >> 1)
+            current = shift = 0
+    if shift or len(numbers) % 2:
+        raise ValueError("polygon is not a valid encoded polyline")
+    return np.cumsum(np.array(numbers, dtype=np.int64).reshape(-1, 2), axis=0) / 1e5
+
+
+def encode_polyline(ring: Ring) -> str:
+    """Google encoded polyline (precision 5) of (lat, lng) vertices."""
+    scaled = np.round(np.asarray(ring) * 1e5).astype(np.int64)
+    deltas = np.diff(scaled, axis=0, prepend=np.zeros((1, 2), dtype=np.int64)).ravel()
+    chars = []
+    for delta in deltas.tolist():
+        value = ~(delta << 1) if delta < 0 else delta << 1
+        while value >= 0x20:
+            chars.append(chr((0x20 | (value & 0x1F)) + 63))
+            value >>= 5
+        chars.append(chr(value + 63))
+    return "".join(chars)
+
+
+def encode_polygon(rings: List[Ring]) -> str:
+    """Canonical ";"-separated polyline form of a parsed polygon (also a cache key)."""
+    return ";".join(encode_polyline(ring) for ring in rings)
+
+
+def _simplify_ring(ring: Ring, tolerance: float) -> Ring:
+    """Douglas-Peucker over the closed ring, in degrees."""
+    closed = np.vstack([ring, ring[:1]])
+    keep = np.zeros(len(closed), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(closed) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end <= start + 1:
+            continue
+        inner = closed[start + 1:end]
+        origin = closed[start]
+        direction = closed[end] - origin
+        length = math.hypot(direction[0], direction[1])
+        if length == 0:
+            distances = np.hypot(*(inner - origin).T)
+        else:
+            distances = np.abs(direction[0] * (inner[:, 1] - origin[1]) - direction[1] * (inner[:, 0] - origin[0])) / length
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            split = start + 1 + farthest
+            keep[split] = True
+            stack.extend([(start, split), (split, end)])
+    return closed[keep][:-1]
+
+
+def simplify_polygon(rings: List[Ring], max_vertices: int = MAX_POLYGON_VERTICES) -> List[Ring]:
+    """
+    Simplify the rings with a growing tolerance until they have at most `max_vertices` in total.
+    
+    Rings that collapse below 3 vertices are dropped.
+    
+    Raises:
+        ValueError: If no ring survives
+    """
+    tolerance = SIMPLIFY_TOLERANCE
+    while sum(len(ring) for ring in rings) > max_vertices:
+        rings = [simplified for simplified in (_simplify_ring(ring, tolerance) for ring in rings) if len(simplified) >= 3]
+        tolerance *= 2
+    if not rings:
+        # Every ring collapsed; an empty polygon must not turn into no filter
+        raise ValueError("polygon is too small or fragmented to simplify")
+    return rings
+
+
+def parse_polygon(value: str) -> List[Ring]:
+    """
+    Parse and normalize the `polygon` filter.
+    
+    Returns:
+        Rings of (lat, lng) vertices, at most MAX_POLYGON_VERTICES in total
+    
+    Raises:
+        ValueError: If the polygon is malformed, out of range or too complex
+    """
+    value = value.strip()
+    if value[:1] in ("{", "["):
+        try:
+            data = json.loads(value)
+        except ValueError:
+            raise ValueError("polygon is not valid JSON")
+        rings = []
+        for coordinates in _geojson_rings(data):
+            try:
+                ring = np.array(coordinates, dtype=np.float64)
+            except (TypeError, ValueError):
+                raise ValueError("polygon coordinates must be [lng, lat] pairs")
+            if ring.ndim != 2 or ring.shape[1] < 2:
+                raise ValueError("polygon coordinates must be [lng, lat] pairs")
+            rings.append(ring[:, 1::-1])  # GeoJSON is (lng, lat)
+    else:
+        rings = [decode_polyline(part) for part in value.split(";") if part]
+    
+    cleaned = []
+    for ring in rings:
+        if len(ring) > 1 and np.array_equal(ring[0], ring[-1]):
+            ring = ring[:-1]  # Closing vertex
+        if len(ring) >= 3:
+            cleaned.append(ring)
+    if not cleaned:
+        raise ValueError("polygon needs at least 3 vertices")
+    
+    vertices = np.vstack(cleaned)
+    if sum(len(ring) for ring in cleaned) > MAX_POLYGON_INPUT_VERTICES:
+        raise ValueError(f"polygon has more than {MAX_POLYGON_INPUT_VERTICES} vertices")
+    if not np.isfinite(vertices).all() or (np.abs(vertices[:, 0]) > 90).any() or (np.abs(vertices[:, 1]) > 180).any():
+        raise ValueError("polygon coordinates are out of range")
+    
+    return simplify_polygon(cleaned)
+
+
+def polygon_bbox(rings: List[Ring]) -> Tuple[float, float, float, float]:
+    """(west, south, east, north) of the rings."""
+    vertices = np.vstack(rings)
+    south, west = vertices.min(axis=0)
+    north, east = vertices.max(axis=0)
+    return float(west), float(south), float(east), float(north)
+
+
+def points_in_polygon(lats: np.ndarray, lngs: np.ndarray, rings: List[Ring]) -> np.ndarray:
+    """
+    Even-odd point-in-polygon test of every point against all ring edges at once.
+    
+    Returns:
+        Boolean mask over the points
+    """
+    starts = np.vstack(rings)
+    ends = np.vstack([np.roll(ring, -1, axis=0) for ring in rings])
+    lat1, lng1 = starts[:, 0], starts[:, 1]
+    lat2, lng2 = ends[:, 0], ends[:, 1]
+    
+    inside = np.zeros(len(lats), dtype=bool)
+    for start in range(0, len(lats), _CHUNK_SIZE):
+        lat = np.asarray(lats[start:start + _CHUNK_SIZE], dtype=np.float64)[:, None]
+        lng = np.asarray(lngs[start:start + _CHUNK_SIZE], dtype=np.float64)[:, None]
+        # Edges straddling the point's latitude, crossed east of the point
+        straddles = (lat1 > lat) != (lat2 > lat)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            crossing_lng = lng1 + (lat - lat1) * (lng2 - lng1) / (lat2 - lat1)
+        crossings = np.count_nonzero(straddles & (lng < crossing_lng), axis=1)
+        inside[start:start + _CHUNK_SIZE] = crossings % 2 == 1
+    return inside
@@ -1,21 +1,101 @@
-from fastapi import Request, HTTPException, status
-from fastapi.responses import JSONResponse
-from typing import Callable
-import redis
+from starlette.requests import HTTPConnection
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+import redis.asyncio as aioredis
 from app.core.config import settings
+import logging
+import threading
 import time
 
-# Initialize Redis client
+logger = logging.getLogger(__name__)
+
+# Initialize async Redis client (the middleware runs on the event loop)
 try:
-    redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+    redis_client = aioredis.from_url(
+        settings.REDIS_URL,
+        decode_responses=True,
+        socket_connect_timeout=0.5,
+        socket_timeout=0.5,
+    )
 except Exception:
     redis_client = None
 
+# Fixed-window counters for all windows in one atomic round trip.
+#
+# KEYS: one counter key per window
+# ARGV: requested tokens, then (limit, window seconds) per key
+#
+# Grants as many of the requested tokens (at most ARGV[1]) as every window
+# still allows, charges them to all windows and returns
+# {granted, count after charging for each window...}. Denied requests
+# (granted = 0) are not counted.
+_RATE_LIMIT_SCRIPT = """
+local requested = tonumber(ARGV[1])
+local counts = {}
+local grant = requested
+for i, key in ipairs(KEYS) do
+    local limit = tonumber(ARGV[i * 2])
+    local current = tonumber(redis.call("GET", key) or "0")
+    counts[i] = current
+    grant = math.min(grant, limit - current)
+end
+if grant <= 0 then
+    return {0, unpack(counts)}
+end
+for i, key in ipairs(KEYS) do
+    local value = redis.call("INCRBY", key, grant)
+    if value == grant then
+        redis.call("EXPIRE", key, tonumber(ARGV[i * 2 + 1]))
+    end
+    counts[i] = value
+end
+return {grant, unpack(counts)}
+"""
+
+# Window name -> length in seconds
+WINDOWS = (("minute", 60), ("hour", 3600), ("day", 86400))
+
+# Upper bound on IPs holding an in-process lease (least recently used are dropped)
+MAX_LEASES = 10000
+
+
+@dataclass
+class RateLimitResult:
+    """Outcome of a rate limit check for the binding (most exhausted) window."""
+    allowed: bool
+    limit: int
+    remaining: int
+    reset: int  # seconds until the window resets
+    policy: str
+    
+    def headers(self) -> Dict[str, str]:
+        """Standard RateLimit-* response headers."""
+        return {
+            "RateLimit-Limit": str(self.limit),
+            "RateLimit-Remaining": str(max(self.remaining, 0)),
+            "RateLimit-Reset": str(self.reset),
+            "RateLimit-Policy": self.policy,
+        }
+
+
+@dataclass
+class _Lease:
+    """Tokens already charged in Redis that this process may hand out locally."""
+    tokens: int
+    buckets: Tuple[int, ...]
+    remaining: List[int]  # per window, excluding the leased tokens
+
 
 class RateLimiter:
     """
     Rate limiter using Redis.
-    Limits requests per IP address.
+    Limits requests per IP address over minute, hour and day windows.
+    
+    Each check is a single Lua script call. With `lease_size` > 1 the process
+    reserves several tokens per call and serves the following requests from
+    that lease without touching Redis. Leased tokens are charged up front, so
+    the limits are never exceeded; unused ones expire with the window.
     """
     
     def __init__(
@@ -23,12 +103,21 @@ class RateLimiter:
         requests_per_minute: int = 60,
         requests_per_hour: int = 1000,
         requests_per_day: int = 10000,
+        lease_size: int = 1,
     ):
         self.requests_per_minute = requests_per_minute
         self.requests_per_hour = requests_per_hour
         self.requests_per_day = requests_per_day
+        self.limits = (requests_per_minute, requests_per_hour, requests_per_day)
+        self.lease_size = max(1, lease_size)
+        self.policy = ", ".join(
+            f"{limit};w={seconds}" for limit, (_, seconds) in zip(self.limits, WINDOWS)
+        )
+        self._leases: "OrderedDict[str, _Lease]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._script = redis_client.register_script(_RATE_LIMIT_SCRIPT) if redis_client else None
     
-    def get_client_ip(self, request: Request) -> str:
+    def get_client_ip(self, request: HTTPConnection) -> str:
         """Extract client IP from request."""
         # Check for forwarded IP (behind proxy)
         forwarded = request.headers.get("X-Forwarded-For")
@@ -46,69 +135,83 @@ class RateLimiter:
         
         return "unknown"
     
-    def is_rate_limited(self, key: str, limit: int, window: int) -> bool:
+    def _result(self, allowed: bool, remaining: List[int], now: float) -> RateLimitResult:
+        # Report the window closest to its limit
+        index = min(range(len(WINDOWS)), key=lambda i: remaining[i])
+        seconds = WINDOWS[index][1]
+        return RateLimitResult(
+            allowed=allowed,
+            limit=self.limits[index],
+            remaining=remaining[index],
+            reset=seconds - int(now) % seconds,
+            policy=self.policy,
+        )
+    
+    def _take_from_lease(self, ip: str, buckets: Tuple[int, ...], now: float) -> Optional[RateLimitResult]:
+        with self._lock:
+            lease = self._leases.get(ip)
+            if lease is None or lease.buckets != buckets or lease.tokens <= 0:
+                return None
+            lease.tokens -= 1
+            self._leases.move_to_end(ip)
+            remaining = [r + lease.tokens for r in lease.remaining]
+        return self._result(True, remaining, now)
+    
+    def _store_lease(self, ip: str, lease: _Lease):
+        with self._lock:
+            self._leases[ip] = lease
+            self._leases.move_to_end(ip)
+            while len(self._leases) > MAX_LEASES:
+                self._leases.popitem(last=False)
+    
+    async def check_rate_limit(self, request: HTTPConnection) -> Optional[RateLimitResult]:
         """
-        Check if rate limit is exceeded.
-        
-        Args:
-            key: Redis key (e.g., "rate_limit:ip:127.0.0.1:minute")
-            limit: Maximum requests allowed
-            window: Time window in seconds
+        Check (and count) a request against all windows.
         
         Returns:
-            True if rate limited, False otherwise
+            The result for the binding window, or None if Redis is unavailable
+            (requests are then allowed)
         """
-        if not redis_client:
+        now = time.time()
+        ip = self.get_client_ip(request)
+        buckets = tuple(int(now // seconds) for _, seconds in WINDOWS)
+        
+        result = self._take_from_lease(ip, buckets, now)
+        if result is not None:
+            return result
+        
+        if not self._script:
             # If Redis is not available, allow all requests
-            return False
+            return None
+        
+        keys = [
+            f"rate_limit:{ip}:{name}:{bucket}"
+            for (name, _), bucket in zip(WINDOWS, buckets)
+        ]
+        args = [self.lease_size]
+        for limit, (_, seconds) in zip(self.limits, WINDOWS):
+            args.extend([limit, seconds])
         
         try:
-            current = redis_client.get(key)
-            
-            if current is None:
-                # First request in this window
-                redis_client.setex(key, window, "1")
-                return False
-            
-            current_count = int(current)
-            
-            if current_count >= limit:
-                return True
-            
-            # Increment counter
-            redis_client.incr(key)
-            return False
-            
+            granted, *counts = await self._script(keys=keys, args=args)
         except Exception as e:
             # If Redis fails, log but don't block requests
-            print(f"Rate limit check failed: {e}")
-            return False
-    
-    def check_rate_limit(self, request: Request) -> bool:
-        """
-        Check if request should be rate limited.
-        
-        Returns:
-            True if rate limited, False otherwise
-        """
-        ip = self.get_client_ip(request)
-        
-        # Check minute limit
-        minute_key = f"rate_limit:{ip}:minute:{int(time.time() / 60)}"
-        if self.is_rate_limited(minute_key, self.requests_per_minute, 60):
-            return True
-        
-        # Check hour limit
-        hour_key = f"rate_limit:{ip}:hour:{int(time.time() / 3600)}"
-        if self.is_rate_limited(hour_key, self.requests_per_hour, 3600):
-            return True
+            logger.warning(f"Rate limit check failed: {e}")
+            return None
         
-        # Check day limit
-        day_key = f"rate_limit:{ip}:day:{int(time.time() / 86400)}"
-        if self.is_rate_limited(day_key, self.requests_per_day, 86400):
-            return True
+        remaining = [limit - count for limit, count in zip(self.limits, counts)]
+        if granted <= 0:
+            return self._result(False, remaining, now)
         
-        return False
+        # One token is used by this request, the rest are served locally
+        if granted > 1:
+            self._store_lease(ip, _Lease(tokens=granted - 1, buckets=buckets, remaining=remaining))
+        return self._result(True, [r + granted - 1 for r in remaining], now)
+
+
+def _lease_size(requests_per_minute: int) -> int:
+    # Small enough that idle leases across workers don't eat a client's budget
+    return max(1, min(settings.RATE_LIMIT_LOCAL_LEASE, requests_per_minute // 20))
 
 
 # Default rate limiter instances
@@ -116,56 +219,20 @@ public_rate_limiter = RateLimiter(
     requests_per_minute=60,
     requests_per_hour=1000,
     requests_per_day=10000,
+    lease_size=_lease_size(60),
 )
 
 admin_rate_limiter = RateLimiter(
     requests_per_minute=120,
     requests_per_hour=5000,
     requests_per_day=50000,
+    lease_size=_lease_size(120),
 )
 
 lead_submission_rate_limiter = RateLimiter(
     requests_per_minute=5,  # Stricter for form submissions
     requests_per_hour=50,
     requests_per_day=200,
+    lease_size=1,
 )
 
-
-async def rate_limit_middleware(request: Request, call_next: Callable):
-    """
-    Rate limiting middleware.
-    Applies different limits based on route path.
-    """
-    # Skip rate limiting for health checks
-    if request.url.path in ["/health", "/", "/docs", "/openapi.json", "/redoc"]:
-        return await call_next(request)
-    
-    # Determine which rate limiter to use
-    path = request.url.path
-    
-    if path.startswith("/api/public/leads"):
-        # Stricter limit for lead submissions
-        limiter = lead_submission_rate_limiter
-    elif path.startswith("/api/admin"):
-        # Admin endpoints
-        limiter = admin_rate_limiter
-    elif path.startswith("/api/public"):
-        # Public endpoints
-        limiter = public_rate_limiter
-    else:
-        # Default: no rate limiting
-        return await call_next(request)
-    
-    # Check rate limit
-    if limiter.check_rate_limit(request):
-        return JSONResponse(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            content={
-                "detail": "Rate limit exceeded. Please try again later.",
-                "retry_after": 60,
-            },
-            headers={"Retry-After": "60"},
-        )
-    
-    return await call_next(request)
-
@@ -0,0 +1,151 @@
+"""
+Neighborhood score definitions shared by the POI jobs, the listing filters
+and the search documents.
+
+For every POI category a property stores the distance to the nearest POI
+within SCORE_RADIUS_M and how many lie within 500 m and 1 km, plus a
+0-100 walkability score built from them. Both engines filter on the same
+column names, so the SQL and Meilisearch paths cannot drift apart.
+"""
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# Same keys as app.services.osm_service.POI_CATEGORIES
+SCORE_CATEGORIES = (
+    "schools",
+    "mosques",
+    "hospitals",
+    "supermarkets",
+    "banks",
+    "restaurants",
+    "parks",
+    "gas_stations",
+)
+
+# Nearest distances are only known up to this radius (NULL beyond it)
+SCORE_RADIUS_M = 1000
+
+# Count column suffix -> radius in meters
+COUNT_RADII = {"500m": 500, "1km": 1000}
+
+# Share of the walkability score per category (sums to 100)
+WALKABILITY_WEIGHTS = {
+    "supermarkets": 20,
+    "schools": 15,
+    "hospitals": 15,
+    "restaurants": 15,
+    "mosques": 10,
+    "parks": 10,
+    "banks": 10,
+    "gas_stations": 5,
+}
+
+# A category earns full proximity credit at or below this distance,
+# falling linearly to none at SCORE_RADIUS_M
+FULL_CREDIT_M = 250
+
+# Places within 500 m that earn the full density credit
+DENSITY_TARGET = 3
+
+
+def nearest_field(category: str) -> str:
+    return f"{category}_nearest_m"
+
+
+def count_field(category: str, suffix: str) -> str:
+    return f"{category}_within_{suffix}"
+
+
+WALKABILITY_FIELD = "walkability_score"
+
+# Every score column, in model order
+SCORE_FIELDS = [
+    field
+    for category in SCORE_CATEGORIES
+    for field in (nearest_field(category), *(count_field(category, suffix) for suffix in COUNT_RADII))
+] + [WALKABILITY_FIELD]
+
+
+def empty_scores() -> Dict[str, Any]:
+    """Scores of a property with no POIs around it."""
+    scores: Dict[str, Any] = {}
+    for category in SCORE_CATEGORIES:
+        scores[nearest_field(category)] = None
+        for suffix in COUNT_RADII:
+            scores[count_field(category, suffix)] = 0
+    scores[WALKABILITY_FIELD] = 0
+    return scores
+
+
+def category_scores(category: str, distances: np.ndarray) -> List[Dict[str, Any]]:
+    """
+    Score columns of one category for many properties.
+    
+    Args:
+        distances: Matrix of distances in meters, one row per property and
+            one column per POI of the category
+    
+    Returns:
+        One {column: value} dict per row
+    """
+    if distances.shape[1] == 0:
+        nearest = np.full(distances.shape[0], np.inf)
+    else:
+        nearest = distances.min(axis=1)
+    counts = {
+        suffix: (distances <= radius).sum(axis=1)
+        for suffix, radius in COUNT_RADII.items()
+    }
+    
+    rows = []
+    for i in range(distances.shape[0]):
+        row = {
+            nearest_field(category): round(float(nearest[i]), 1) if nearest[i] <= SCORE_RADIUS_M else None,
+        }
+        for suffix in COUNT_RADII:
+            row[count_field(category, suffix)] = int(counts[suffix][i])
+        rows.append(row)
+    return rows
+
+
+def walkability_score(scores: Dict[str, Any]) -> int:
+    """0-100: weighted mix of proximity (75%) and density within 500 m (25%) per category."""
+    total = 0.0
+    for category, weight in WALKABILITY_WEIGHTS.items():
+        nearest = scores.get(nearest_field(category))
+        if nearest is None:
+            continue
+        proximity = min(1.0, max(0.0, (SCORE_RADIUS_M - nearest) / (SCORE_RADIUS_M - FULL_CREDIT_M)))
+        density = min(scores.get(count_field(category, "500m"), 0), DENSITY_TARGET) / DENSITY_TARGET
+        total += weight * (0.75 * proximity + 0.25 * density)
+    return int(round(total))
+
+
+def parse_near(value: Optional[str]) -> Optional[Dict[str, int]]:
+    """
+    Parse a `near` filter: comma-separated "category:meters" pairs, e.g.
+    "schools:500,mosques:300" (a POI of each category within that distance).
+    
+    Raises:
+        ValueError: On an unknown category or a distance outside 1..SCORE_RADIUS_M
+    """
+    if not value:
+        return None
+    near: Dict[str, int] = {}
+    for part in value.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        category, _, meters = part.partition(":")
+        category = category.strip()
+        if category not in SCORE_CATEGORIES:
+            raise ValueError(f"Unknown POI category in near filter: {category}")
+        try:
+            distance = int(meters)
+        except ValueError:
+            raise ValueError(f"Invalid distance in near filter: {part}")
+        if not 1 <= distance <= SCORE_RADIUS_M:
+            raise ValueError(f"near distances must be between 1 and {SCORE_RADIUS_M} meters")
+        near[category] = distance
+    return near or None
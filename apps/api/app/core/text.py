@@ -0,0 +1,44 @@
+"""
+Arabic text normalization shared by both search engines.
+
+The same folding is applied to search documents (Meilisearch), to the
+Postgres normalize_ar() SQL function behind the tsvector columns, and to
+incoming queries, so "أحمد", "احمد" and "أَحْمَد" all match each other.
+"""
+import re
+from typing import List, Optional
+
+# Letter variants folded to one form: alef with hamza/madda/wasla -> alef,
+# alef maksura -> yaa, taa marbuta -> haa, hamza on waw/yaa -> waw/yaa
+ARABIC_FOLD_FROM = "أإآٱىةؤئ"
+ARABIC_FOLD_TO = "اااايهوي"
+
+# Removed entirely: harakat (fathatan .. sukun), superscript alef, tatweel
+ARABIC_STRIP = "".join(chr(c) for c in range(0x064B, 0x0653)) + "ٰـ"
+
+_ARABIC_TABLE = str.maketrans(ARABIC_FOLD_FROM, ARABIC_FOLD_TO, ARABIC_STRIP)
+
+# Letters and digits; underscores would be read as separators by to_tsquery
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+
+def normalize_arabic(value: Optional[str]) -> Optional[str]:
+    """Fold Arabic letter variants and strip diacritics; other text is unchanged."""
+    if value is None:
+        return None
+    return value.translate(_ARABIC_TABLE)
+
+
+def search_tokens(value: Optional[str]) -> List[str]:
+    """Normalized word tokens of a search query."""
+    if not value:
+        return []
+    return _TOKEN_RE.findall(normalize_arabic(value))
+
+
+def normalize_query(value: Optional[str]) -> Optional[str]:
+    """Canonical form of a search query for analytics: folded, lowercased tokens."""
+    tokens = search_tokens(value)
+    if not tokens:
+        return None
+    return " ".join(tokens).lower()[:500]
@@ -1,4 +1,6 @@
-from typing import Optional
+from typing import List, Optional
+from uuid import UUID
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
 from app.crud.base import CRUDBase
 from app.db.models.location import Location
@@ -10,6 +12,26 @@ class CRUDLocation(CRUDBase[Location, LocationCreate, LocationUpdate]):
         if locale == "ar":
             return db.query(Location).filter(Location.slug_ar == slug).first()
         return db.query(Location).filter(Location.slug_en == slug).first()
+    
+    def get_by_ids(self, db: Session, *, ids: List[str]) -> List[Location]:
+        uuid_ids = []
+        for id_str in ids:
+            try:
+                uuid_ids.append(UUID(id_str))
+            except ValueError:
+                continue
+        
+        if not uuid_ids:
+            return []
+        
+        return db.query(Location).filter(Location.id.in_(uuid_ids)).all()
+    
+    def get_ids_by_slugs(self, db: Session, *, slugs: List[str]) -> List[UUID]:
+        """IDs of the locations matching any of the slugs, in either language."""
+        rows = db.query(Location.id).filter(
+            or_(Location.slug_en.in_(slugs), Location.slug_ar.in_(slugs))
+        ).all()
+        return [row.id for row in rows]
 
 
 crud_location = CRUDLocation(Location)
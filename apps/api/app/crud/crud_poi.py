@@ -0,0 +1,68 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.crud.base import CRUDBase
+from app.db.models.poi import POI
+
+# Columns refreshed when an already imported OSM element is seen again
+_UPSERT_COLUMNS = ("category", "name", "name_en", "name_ar", "lat", "lng", "poi_type", "address", "updated_at")
+
+
+class CRUDPOI(CRUDBase[POI, dict, dict]):
+    def upsert_bulk(self, db: Session, *, pois: List[dict], chunk_size: int = 1000) -> int:
+        """Insert or update POIs by OSM id (ids must be unique), one statement per chunk."""
+        if not pois:
+            return 0
+        now = datetime.utcnow()
+        for start in range(0, len(pois), chunk_size):
+            rows = [{**poi, "updated_at": now} for poi in pois[start:start + chunk_size]]
+            stmt = insert(POI).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[POI.id],
+                set_={column: stmt.excluded[column] for column in _UPSERT_COLUMNS},
+            )
+            db.execute(stmt)
+        db.commit()
+        return len(pois)
+    
+    def delete_not_updated_since(self, db: Session, *, since: datetime) -> int:
+        """Delete POIs that a full import did not touch (removed from OSM)."""
+        deleted = db.query(POI).filter(POI.updated_at < since).delete(synchronize_session=False)
+        db.commit()
+        return deleted
+    
+    def get_version(self, db: Session) -> Tuple[int, Optional[datetime]]:
+        """(row count, last update) - changes whenever the table is re-imported."""
+        count, updated_at = db.query(func.count(POI.id), func.max(POI.updated_at)).one()
+        return count, updated_at
+    
+    def get_in_bbox(self, db: Session, *, bbox: Tuple[float, float, float, float]) -> List[dict]:
+        """POIs inside (south, west, north, east), as dicts like the Overpass import rows."""
+        south, west, north, east = bbox
+        rows = self._row_query(db).filter(
+            POI.lat.between(south, north),
+            POI.lng.between(west, east),
+        ).all()
+        return [row._asdict() for row in rows]
+    
+    def get_all_rows(self, db: Session) -> list:
+        """All POIs as lightweight rows, for building the in-memory index."""
+        return self._row_query(db).all()
+    
+    def _row_query(self, db: Session):
+        return db.query(
+            POI.id,
+            POI.category,
+            POI.name,
+            POI.name_en,
+            POI.name_ar,
+            POI.lat,
+            POI.lng,
+            POI.poi_type,
+            POI.address,
+        )
+
+
+crud_poi = CRUDPOI(POI)
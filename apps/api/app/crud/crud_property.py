@@ -1,13 +1,144 @@
-from typing import Optional, List, Union
+from typing import Any, Dict, Optional, List, Tuple, Union
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, tuple_, func, text, select, case, cast, any_, bindparam, String, Numeric, Float
+from sqlalchemy.dialects import postgresql
+from app.core.config import settings
+from app.core.facets import PRICE_BUCKETS, BEDROOMS_MAX_BUCKET
+from app.core.geo import EARTH_RADIUS_M, geohash_cover, geohash_cover_bbox
+from app.core.polygon import Ring, points_in_polygon, polygon_bbox
+from app.core.scores import SCORE_CATEGORIES, SCORE_FIELDS, WALKABILITY_FIELD, nearest_field
+from app.core.text import search_tokens
 from app.crud.base import CRUDBase
 from app.db.models.property import Property
 from app.db.models.location import Location
+from app.db.models.property_image import PropertyImage
 from app.schemas.property import PropertyCreate, PropertyUpdate
+from datetime import datetime
+from decimal import Decimal
+from uuid import UUID
+import base64
+import json
+import time
+import numpy as np
+
+# Listing sort orders: sort_by -> (sort column, descending).
+# Ties are broken on id so keyset cursors are stable.
+SORT_ORDERS = {
+    "newest": (Property.created_at, True),
+    "price_asc": (Property.price_amount, False),
+    "price_desc": (Property.price_amount, True),
+    "walkability": (Property.walkability_score, True),
+}
+
+# Orders text matches by ts_rank_cd (offset pagination only); without a
+# search query it behaves like "newest"
+RELEVANCE_SORT = "relevance"
+
+# Orders by distance from near_lat/near_lng (offset pagination only);
+# without a point it behaves like "newest"
+DISTANCE_SORT = "distance"
+
+# Facet name -> grouping column, in GROUPING SETS order
+FACETS = ("purpose", "type", "location", "bedrooms", "furnished", "parking", "price")
+
+# Columns rendered by listing cards; everything else stays in the database
+CARD_COLUMNS = (
+    Property.id,
+    Property.title_en,
+    Property.title_ar,
+    Property.slug_en,
+    Property.slug_ar,
+    Property.description_en,
+    Property.description_ar,
+    Property.purpose,
+    Property.type,
+    Property.status,
+    Property.price_amount,
+    Property.price_currency,
+    Property.area_m2,
+    Property.bedrooms,
+    Property.bathrooms,
+    Property.furnished,
+    Property.parking,
+    Property.floor,
+    Property.year_built,
+    Property.lat,
+    Property.lng,
+    Property.walkability_score,
+    Property.featured,
+    Property.published,
+    Property.location_id,
+    Property.agent_id,
+    Property.created_at,
+    Property.updated_at,
+)
+
+# Columns held by the map cluster index (app.services.map_index_service):
+# the coordinates plus everything the listing filters look at
+MAP_COLUMNS = (
+    Property.id,
+    Property.published,
+    Property.lat,
+    Property.lng,
+    Property.price_amount,
+    Property.purpose,
+    Property.type,
+    Property.location_id,
+    Property.bedrooms,
+    Property.bathrooms,
+    Property.area_m2,
+    Property.year_built,
+    Property.furnished,
+    Property.parking,
+    Property.floor,
+    Property.featured,
+    Property.walkability_score,
+    *(getattr(Property, nearest_field(category)) for category in SCORE_CATEGORIES),
+)
 
 
 class CRUDProperty(CRUDBase[Property, PropertyCreate, PropertyUpdate]):
+    _table_rows_cache: Optional[Tuple[float, float]] = None
+
+    def _sort_order(self, sort_by: str):
+        return SORT_ORDERS.get(sort_by, SORT_ORDERS["newest"])
+
+    def encode_cursor(self, prop: Property, sort_by: str) -> str:
+        """Build an opaque cursor pointing just after `prop` in the given sort order."""
+        column, _ = self._sort_order(sort_by)
+        value = getattr(prop, column.key)
+        payload = {
+            "s": sort_by,
+            "v": value.isoformat() if isinstance(value, datetime) else str(value),
+            "id": str(prop.id),
+        }
+        raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    def decode_cursor(self, cursor: str, sort_by: str) -> Tuple[Any, UUID]:
+        """
+        Decode a cursor produced by encode_cursor.
+        
+        Raises:
+            ValueError: If the cursor is malformed or was issued for another sort order
+        """
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            payload = json.loads(raw)
+            column, _ = self._sort_order(payload["s"])
+            if column is Property.created_at:
+                value = datetime.fromisoformat(payload["v"])
+            else:
+                value = Decimal(payload["v"])
+            last_id = UUID(payload["id"])
+        except Exception:
+            raise ValueError("Invalid cursor")
+        
+        if payload["s"] != sort_by:
+            raise ValueError("Cursor was issued for a different sort order")
+        
+        return value, last_id
+
     def get_by_slug(self, db: Session, *, slug: str, locale: str = "en") -> Optional[Property]:
         if locale == "ar":
             return db.query(Property).filter(
@@ -17,15 +148,13 @@ class CRUDProperty(CRUDBase[Property, PropertyCreate, PropertyUpdate]):
             and_(Property.slug_en == slug, Property.published == True)
         ).first()
 
-    def get_filtered(
+    def filter_query(
         self,
-        db: Session,
+        query,
         *,
-        skip: int = 0,
-        limit: int = 20,
         purpose: Optional[str] = None,
-        type: Optional[str] = None,
-        location_slug: Optional[str] = None,
+        type: Optional[Union[str, List[str]]] = None,
+        location_slug: Optional[Union[str, List[str]]] = None,
         min_price: Optional[float] = None,
         max_price: Optional[float] = None,
         bedrooms: Optional[int] = None,
@@ -37,14 +166,44 @@ class CRUDProperty(CRUDBase[Property, PropertyCreate, PropertyUpdate]):
         parking: Optional[bool] = None,
         floor: Optional[int] = None,
         featured: Optional[bool] = None,
+        near: Optional[Dict[str, int]] = None,
+        min_walkability: Optional[int] = None,
+        near_lat: Optional[float] = None,
+        near_lng: Optional[float] = None,
+        radius_m: Optional[float] = None,
+        within_ids: Optional[List[Any]] = None,
         published: bool = True,
-        sort_by: str = "newest",
-    ) -> List[Property]:
-        query = db.query(Property)
-
+        q: Optional[str] = None,
+    ):
+        """
+        Apply the public listing filters to a query over Property.
+        
+        Single source of truth for listing filters: the page, count, estimate
+        and facet queries all go through here so they can't drift apart.
+        `q` is the Postgres full-text search (see _text_search), used when
+        the search engine is unavailable. `near` maps POI categories to a
+        maximum distance in meters (see app.core.scores.parse_near).
+        `radius_m` keeps properties within that many meters of
+        near_lat/near_lng (see _within_radius). `within_ids` restricts the
+        results to a precomputed ID set, such as get_ids_in_polygon's.
+        """
         # Always filter by published status
         query = query.filter(Property.published == published)
 
+        text_search = self._text_search(q)
+        if text_search is not None:
+            tsquery, pattern = text_search
+            matching_locations = select(Location.id).where(Location.search_vector.op("@@")(tsquery))
+            query = query.filter(
+                or_(
+                    Property.search_vector.op("@@")(tsquery),
+                    Property.location_id.in_(matching_locations),
+                    # Substrings inside words, served by the trigram indexes
+                    Property.title_en.ilike(pattern),
+                    func.normalize_ar(Property.title_ar).ilike(pattern),
+                )
+            )
+
         if purpose:
             query = query.filter(Property.purpose == purpose)
 
@@ -56,14 +215,14 @@ class CRUDProperty(CRUDBase[Property, PropertyCreate, PropertyUpdate]):
 
         if location_slug:
             if isinstance(location_slug, list):
-                query = query.join(Location).filter(
+                query = query.join(Location, Property.location_id == Location.id).filter(
                     or_(
                         Location.slug_en.in_(location_slug),
                         Location.slug_ar.in_(location_slug)
                     )
                 )
             else:
-                query = query.join(Location).filter(
+                query = query.join(Location, Property.location_id == Location.id).filter(
                     or_(Location.slug_en == location_slug, Location.slug_ar == location_slug)
                 )
 
@@ -100,96 +259,484 @@ class CRUDProperty(CRUDBase[Property, PropertyCreate, PropertyUpdate]):
         if featured is not None:
             query = query.filter(Property.featured == featured)
 
-        # Sorting
-        if sort_by == "price_asc":
-            query = query.order_by(Property.price_amount.asc())
-        elif sort_by == "price_desc":
-            query = query.order_by(Property.price_amount.desc())
-        else:  # newest
-            query = query.order_by(Property.created_at.desc())
-
-        return query.offset(skip).limit(limit).all()
-
-    def count_filtered(
-        self,
-        db: Session,
-        *,
-        purpose: Optional[str] = None,
-        type: Optional[Union[str, List[str]]] = None,
-        location_slug: Optional[Union[str, List[str]]] = None,
-        min_price: Optional[float] = None,
-        max_price: Optional[float] = None,
-        bedrooms: Optional[int] = None,
-        bathrooms: Optional[int] = None,
-        min_area: Optional[float] = None,
-        max_area: Optional[float] = None,
-        year_built: Optional[int] = None,
-        furnished: Optional[bool] = None,
-        parking: Optional[bool] = None,
-        floor: Optional[int] = None,
-        featured: Optional[bool] = None,
-        published: bool = True,
-    ) -> int:
-        query = db.query(Property)
-
-        query = query.filter(Property.published == published)
+        # Precomputed neighborhood scores: no spatial work per request
+        for category, meters in (near or {}).items():
+            query = query.filter(getattr(Property, nearest_field(category)) <= meters)
 
-        if purpose:
-            query = query.filter(Property.purpose == purpose)
+        if min_walkability is not None:
+            query = query.filter(Property.walkability_score >= min_walkability)
 
-        if type:
-            if isinstance(type, list):
-                query = query.filter(Property.type.in_(type))
-            else:
-                query = query.filter(Property.type == type)
+        if radius_m is not None and near_lat is not None and near_lng is not None:
+            query = query.filter(self._within_radius(near_lat, near_lng, radius_m))
 
-        if location_slug:
-            if isinstance(location_slug, list):
-                query = query.join(Location).filter(
-                    or_(
-                        Location.slug_en.in_(location_slug),
-                        Location.slug_ar.in_(location_slug)
-                    )
-                )
-            else:
-                query = query.join(Location).filter(
-                    or_(Location.slug_en == location_slug, Location.slug_ar == location_slug)
-                )
+        if within_ids is not None:
+            # One array parameter, however many IDs
+            ids = bindparam("within_ids", value=list(within_ids), type_=postgresql.ARRAY(Property.id.type), unique=True)
+            query = query.filter(Property.id == any_(ids))
 
-        if min_price is not None:
-            query = query.filter(Property.price_amount >= min_price)
-
-        if max_price is not None:
-            query = query.filter(Property.price_amount <= max_price)
+        return query
 
-        if bedrooms is not None:
-            query = query.filter(Property.bedrooms >= bedrooms)
-
-        if bathrooms is not None:
-            query = query.filter(Property.bathrooms >= bathrooms)
+    def _distance(self, lat: float, lng: float):
+        """Haversine distance in meters from a point to the property (NULL without coordinates)."""
+        lat1 = func.radians(lat)
+        lat2 = func.radians(cast(Property.lat, Float))
+        dlat = lat2 - lat1
+        dlng = func.radians(cast(Property.lng, Float)) - func.radians(lng)
+        a = func.power(func.sin(dlat / 2.0), 2) + func.cos(lat1) * func.cos(lat2) * func.power(func.sin(dlng / 2.0), 2)
+        return 2 * EARTH_RADIUS_M * func.asin(func.sqrt(func.least(a, 1.0)))
 
-        if min_area is not None:
-            query = query.filter(Property.area_m2 >= min_area)
+    def _within_radius(self, lat: float, lng: float, radius_m: float):
+        """
+        Condition for properties within `radius_m` meters of a point.
+        
+        The geohash prefixes covering the circle become B-tree range scans on
+        ix_properties_geohash; the exact distance is only computed for the
+        rows in those cells.
+        """
+        return and_(self._in_geohash_cells(geohash_cover(lat, lng, radius_m)), self._distance(lat, lng) <= radius_m)
+
+    def _in_geohash_cells(self, prefixes: List[str]):
+        """Condition for properties in any of the geohash cells, as range scans on ix_properties_geohash."""
+        return or_(*[
+            and_(Property.geohash >= prefix, Property.geohash < prefix + "~")  # "~" sorts after every geohash character
+            for prefix in prefixes
+        ])
+
+    def _distance_from(self, filters: Dict[str, Any]):
+        """Distance expression when the filters name a point, else None."""
+        if filters.get("near_lat") is None or filters.get("near_lng") is None:
+            return None
+        return self._distance(filters["near_lat"], filters["near_lng"])
+
+    def _text_search(self, q: Optional[str]):
+        """
+        Full-text query for a search string, or None when it has no words.
+        
+        Each normalized word is prefix-matched in both the English (stemmed)
+        and simple (Arabic) configurations of the search vectors.
+        
+        Returns:
+            Tuple of (tsquery expression, ILIKE pattern)
+        """
+        tokens = search_tokens(q)
+        if not tokens:
+            return None
+        query_text = " & ".join(f"{token}:*" for token in tokens)
+        tsquery = func.to_tsquery("english", query_text).op("||")(func.to_tsquery("simple", query_text))
+        pattern = "%" + " ".join(tokens) + "%"
+        return tsquery, pattern
+
+    def _relevance(self, sort_by: str, q: Optional[str]):
+        """Rank expression when sorting by relevance with a search query."""
+        if sort_by != RELEVANCE_SORT:
+            return None
+        text_search = self._text_search(q)
+        if text_search is None:
+            return None
+        return func.ts_rank_cd(Property.search_vector, text_search[0])
+
+    def _paginate(
+        self,
+        query,
+        *,
+        skip: int,
+        limit: int,
+        sort_by: str,
+        after: Optional[Tuple[Any, UUID]],
+        rank=None,
+        distance=None,
+    ):
+        if rank is not None:
+            query = query.order_by(rank.desc(), Property.created_at.desc(), Property.id.desc())
+            return query.offset(skip).limit(limit)
+        
+        if sort_by == DISTANCE_SORT and distance is not None:
+            query = query.order_by(distance.asc(), Property.id.asc())
+            return query.offset(skip).limit(limit)
+        
+        # Sorting (id tiebreak keeps offset and keyset pages consistent)
+        sort_column, descending = self._sort_order(sort_by)
+        
+        if after is not None:
+            sort_key = tuple_(sort_column, Property.id)
+            position = tuple_(*after)
+            query = query.filter(sort_key < position if descending else sort_key > position)
+        
+        if descending:
+            query = query.order_by(sort_column.desc(), Property.id.desc())
+        else:
+            query = query.order_by(sort_column.asc(), Property.id.asc())
 
-        if max_area is not None:
-            query = query.filter(Property.area_m2 <= max_area)
+        if after is None:
+            query = query.offset(skip)
 
-        if year_built is not None:
-            query = query.filter(Property.year_built >= year_built)
+        return query.limit(limit)
 
-        if furnished is not None:
-            query = query.filter(Property.furnished == furnished)
+    def get_filtered(
+        self,
+        db: Session,
+        *,
+        skip: int = 0,
+        limit: int = 20,
+        sort_by: str = "newest",
+        after: Optional[Tuple[Any, UUID]] = None,
+        **filters,
+    ) -> List[Property]:
+        """
+        Filtered, sorted page of properties.
+        
+        Pages either by offset (`skip`) or, when `after` is given, by keyset:
+        rows strictly after the decoded cursor position, so deep pages cost
+        the same as the first one. Accepts the filters of filter_query.
+        With near_lat/near_lng each property gets a `distance_m` attribute
+        (meters from the point).
+        """
+        distance = self._distance_from(filters)
+        query = self.filter_query(db.query(Property), **filters)
+        rank = self._relevance(sort_by, filters.get("q"))
+        if distance is None:
+            return self._paginate(query, skip=skip, limit=limit, sort_by=sort_by, after=after, rank=rank).all()
+        
+        query = query.add_columns(distance.label("distance_m"))
+        rows = self._paginate(
+            query, skip=skip, limit=limit, sort_by=sort_by, after=after, rank=rank, distance=distance
+        ).all()
+        properties = []
+        for prop, distance_m in rows:
+            prop.distance_m = distance_m
+            properties.append(prop)
+        return properties
+
+    def _first_image_subquery(self):
+        """Correlated subquery for a property's cover image (lowest sort_order)."""
+        return (
+            select(PropertyImage.file_key)
+            .where(PropertyImage.property_id == Property.id)
+            .order_by(PropertyImage.sort_order)
+            .limit(1)
+            .correlate(Property)
+            .scalar_subquery()
+        )
+
+    def card_query(self, db: Session):
+        """
+        Lean query for listing cards: one row per property.
+        
+        Selects only CARD_COLUMNS plus the first image (by sort_order) and the
+        location name as correlated scalar subqueries, instead of the model's
+        joined eager loads that multiply each property by its image count.
+        Rows expose the same attribute names as Property, plus `first_image`
+        and `location_name`.
+        """
+        first_image = self._first_image_subquery()
+        location_name = (
+            select(Location.name_en)
+            .where(Location.id == Property.location_id)
+            .correlate(Property)
+            .scalar_subquery()
+        )
+        return db.query(*CARD_COLUMNS, first_image.label("first_image"), location_name.label("location_name"))
+
+    def iter_index_rows(self, db: Session, *, chunk_size: int = 1000, ids: Optional[List[Any]] = None):
+        """
+        Stream one flat row per property with everything the search document needs.
+        
+        Uses a server-side cursor (yield_per) so memory stays bounded by
+        `chunk_size` regardless of table size. Rows carry CARD_COLUMNS plus
+        `first_image`, the location's `location_name_*` / `location_slug_*`
+        and the neighborhood score columns.
+        Pass `ids` to restrict the rows to specific properties.
+        """
+        query = (
+            db.query(
+                *CARD_COLUMNS,
+                self._first_image_subquery().label("first_image"),
+                Location.name_en.label("location_name_en"),
+                Location.name_ar.label("location_name_ar"),
+                Location.slug_en.label("location_slug_en"),
+                Location.slug_ar.label("location_slug_ar"),
+                *(getattr(Property, field) for field in SCORE_FIELDS if field != WALKABILITY_FIELD),  # Already in CARD_COLUMNS
+            )
+            .outerjoin(Location, Location.id == Property.location_id)
+            .order_by(Property.id)
+        )
+        if ids is not None:
+            query = query.filter(Property.id.in_(ids))
+        return query.yield_per(chunk_size)
+
+    def get_map_rows(self, db: Session, *, changed_since: Optional[datetime] = None) -> List[Any]:
+        """
+        MAP_COLUMNS rows for the map cluster index.
+        
+        Without `changed_since`: every published property with coordinates.
+        With it: every property edited or re-scored since then, published or
+        not, so the index can also drop listings that were unpublished.
+        """
+        query = db.query(*MAP_COLUMNS)
+        if changed_since is None:
+            return query.filter(
+                Property.published == True,
+                Property.lat.isnot(None),
+                Property.lng.isnot(None),
+            ).all()
+        return query.filter(
+            or_(Property.updated_at > changed_since, Property.pois_updated_at > changed_since)
+        ).all()
+    
+    def map_rows_fingerprint(self, db: Session) -> Tuple[int, int]:
+        """
+        (count, sum of id keys) of the published properties with coordinates.
+        
+        An id's key is the integer of the first 15 hex digits of its UUID
+        (see map_index_service.id_key), so a listing deleted and another
+        added between two polls still change the fingerprint.
+        """
+        id_key = text("('x' || left(replace(CAST(properties.id AS text), '-', ''), 15))::bit(60)::bigint")
+        count, id_sum = db.query(func.count(Property.id), func.sum(id_key)).filter(
+            Property.published == True,
+            Property.lat.isnot(None),
+            Property.lng.isnot(None),
+        ).one()
+        return count, int(id_sum or 0)
+    
+    def get_filtered_ids(self, db: Session, **filters) -> List[Any]:
+        """IDs of all properties matching the filters of filter_query."""
+        rows = self.filter_query(db.query(Property.id), **filters).all()
+        return [row.id for row in rows]
+    
+    def get_ids_in_polygon(self, db: Session, *, polygon: List[Ring], published: bool = True) -> List[Any]:
+        """
+        IDs of the properties inside a polygon (see app.core.polygon).
+        
+        The geohash cells covering the polygon's bounding box narrow the
+        candidates on ix_properties_geohash; the exact point-in-polygon test
+        then runs in NumPy over their coordinates.
+        """
+        west, south, east, north = polygon_bbox(polygon)
+        rows = (
+            db.query(Property.id, Property.lat, Property.lng)
+            .filter(
+                Property.published == published,
+                self._in_geohash_cells(geohash_cover_bbox(west, south, east, north)),
+                Property.lat.between(south, north),
+                Property.lng.between(west, east),
+            )
+            .all()
+        )
+        if not rows:
+            return []
+        
+        lats = np.array([float(row.lat) for row in rows], dtype=np.float64)
+        lngs = np.array([float(row.lng) for row in rows], dtype=np.float64)
+        inside = points_in_polygon(lats, lngs, polygon)
+        return [row.id for row, hit in zip(rows, inside) if hit]
+    
+    def get_stale_poi_coordinates(self, db: Session, *, before: datetime) -> List[Any]:
+        """(id, lat, lng) of properties whose nearby POIs were last computed before `before` (or never)."""
+        return (
+            db.query(Property.id, Property.lat, Property.lng)
+            .filter(
+                Property.lat.isnot(None),
+                Property.lng.isnot(None),
+                or_(Property.pois_updated_at.is_(None), Property.pois_updated_at < before),
+            )
+            .all()
+        )
+
+    def get_all_ids(self, db: Session) -> List[Any]:
+        """IDs of all properties, published or not."""
+        return [row.id for row in db.query(Property.id).all()]
+    
+    def get_ids_changed_since(self, db: Session, *, since: datetime) -> List[Any]:
+        """
+        IDs of properties whose search document may have changed since `since`.
+        
+        Covers edits to the property, its POI scores, its images and its
+        location. Deleted rows leave nothing behind; compare against
+        get_all_ids for those.
+        """
+        changed_images = select(PropertyImage.property_id).where(
+            or_(PropertyImage.created_at >= since, PropertyImage.updated_at >= since)
+        )
+        changed_locations = select(Location.id).where(Location.updated_at >= since)
+        rows = db.query(Property.id).filter(
+            or_(
+                Property.updated_at >= since,
+                Property.pois_updated_at >= since,
+                Property.id.in_(changed_images),
+                Property.location_id.in_(changed_locations),
+            )
+        ).all()
+        return [row.id for row in rows]
+    
+    def get_ids_by_location(self, db: Session, *, location_ids: List[Any]) -> List[Any]:
+        """IDs of all properties in the given locations."""
+        rows = db.query(Property.id).filter(Property.location_id.in_(location_ids)).all()
+        return [row.id for row in rows]
 
-        if parking is not None:
-            query = query.filter(Property.parking == parking)
+    def get_cards_by_ids(self, db: Session, *, ids: List[str]) -> List[Any]:
+        """Listing card rows for the given property IDs (unordered)."""
+        uuid_ids = []
+        for id_str in ids:
+            try:
+                uuid_ids.append(UUID(id_str))
+            except ValueError:
+                continue
+        
+        if not uuid_ids:
+            return []
+        
+        return self.card_query(db).filter(Property.id.in_(uuid_ids)).all()
 
-        if floor is not None:
-            query = query.filter(Property.floor == floor)
+    def get_cards_with_total(
+        self,
+        db: Session,
+        *,
+        skip: int = 0,
+        limit: int = 20,
+        sort_by: str = "newest",
+        after: Optional[Tuple[Any, UUID]] = None,
+        **filters,
+    ) -> Tuple[List[Any], int, bool]:
+        """
+        Page of listing cards (see card_query) plus the total number of
+        matches, in one statement.
+        
+        The total comes from a `count(*) OVER ()` window over the filtered
+        rows. When the planner expects more matches than
+        LISTING_COUNT_ESTIMATE_THRESHOLD (or in keyset mode, where the window
+        would only see rows after the cursor) the planner estimate is used
+        instead of counting. With near_lat/near_lng the rows also carry
+        `distance_m`.
+        
+        Returns:
+            Tuple of (card rows, total, whether total is an estimate)
+        """
+        query = self.filter_query(self.card_query(db), **filters)
+        rank = self._relevance(sort_by, filters.get("q"))
+        distance = self._distance_from(filters)
+        if distance is not None:
+            query = query.add_columns(distance.label("distance_m"))
+        page = dict(skip=skip, limit=limit, sort_by=sort_by, after=after, rank=rank, distance=distance)
+        
+        estimate = self.estimate_filtered(db, force=after is not None, **filters)
+        if estimate is not None:
+            rows = self._paginate(query, **page).all()
+            return rows, estimate, True
+        
+        query = query.add_columns(func.count().over().label("total_count"))
+        rows = self._paginate(query, **page).all()
+        
+        if rows:
+            return rows, rows[0].total_count, False
+        if skip == 0:
+            return [], 0, False
+        # Past the last page the window has no row to ride on
+        return [], self.count_filtered(db, **filters), False
+
+    def get_facets(self, db: Session, **filters) -> dict:
+        """
+        Facet counts for the listing filters in a single GROUPING SETS query.
+        
+        Returns:
+            Dict mapping each name in FACETS to {value: count}, plus "total".
+            Bedrooms use facets.bedrooms_bucket values and prices use
+            facets.price_bucket numbers.
+        """
+        bedrooms_bucket = case(
+            (Property.bedrooms >= BEDROOMS_MAX_BUCKET, f"{BEDROOMS_MAX_BUCKET}+"),
+            else_=cast(Property.bedrooms, String),
+        )
+        price_bucket = func.width_bucket(
+            Property.price_amount, postgresql.array(PRICE_BUCKETS, type_=Numeric)
+        )
+        
+        # Bucket expressions are computed in a subquery so the outer GROUP BY
+        # only references plain columns
+        filtered = self.filter_query(
+            db.query(
+                Property.purpose.label("purpose"),
+                Property.type.label("type"),
+                Property.location_id.label("location"),
+                bedrooms_bucket.label("bedrooms"),
+                Property.furnished.label("furnished"),
+                Property.parking.label("parking"),
+                price_bucket.label("price"),
+            ),
+            **filters,
+        ).subquery()
+        
+        columns = [filtered.c[name] for name in FACETS]
+        rows = db.query(
+            *columns,
+            func.grouping(*columns).label("grouping_id"),
+            func.count().label("count"),
+        ).group_by(
+            func.grouping_sets(*[tuple_(column) for column in columns], tuple_())
+        ).all()
+        
+        # GROUPING() sets a bit for every column rolled up in a row; the one
+        # facet a row belongs to is the only cleared bit
+        all_rolled_up = (1 << len(FACETS)) - 1
+        facets = {name: {} for name in FACETS}
+        total = 0
+        for row in rows:
+            if row.grouping_id == all_rolled_up:
+                total = row.count
+                continue
+            for index, name in enumerate(FACETS):
+                bit = 1 << (len(FACETS) - 1 - index)
+                if not row.grouping_id & bit:
+                    value = getattr(row, name)
+                    if value is not None:
+                        facets[name][value.value if hasattr(value, 'value') else value] = row.count
+                    break
+        
+        facets["total"] = total
+        return facets
 
-        if featured is not None:
-            query = query.filter(Property.featured == featured)
+    def count_filtered(self, db: Session, **filters) -> int:
+        """Exact number of properties matching the filters of filter_query."""
+        query = self.filter_query(db.query(Property), **filters)
+        return query.with_entities(func.count(Property.id)).scalar()
 
-        return query.count()
+    def estimate_filtered(self, db: Session, *, force: bool = False, **filters) -> Optional[int]:
+        """
+        Planner row estimate for the filters, or None when an exact count is cheap.
+        
+        Small tables (by pg_class.reltuples) never get estimated. Otherwise the
+        filtered query is EXPLAINed - planning only, no rows are read - and the
+        estimate is returned when it exceeds the configured threshold, or
+        unconditionally when `force` is set.
+        """
+        threshold = settings.LISTING_COUNT_ESTIMATE_THRESHOLD
+        if not force and (threshold <= 0 or self._table_rows(db) < threshold):
+            return None
+        
+        query = self.filter_query(db.query(Property.id), **filters)
+        compiled = query.statement.compile(
+            dialect=db.get_bind().dialect, compile_kwargs={"render_postcompile": True}
+        )
+        plan = db.connection().exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {compiled.string}", compiled.params
+        ).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = int(plan[0]["Plan"]["Plan Rows"])
+        
+        if force or estimate >= threshold:
+            return estimate
+        return None
+
+    def _table_rows(self, db: Session) -> float:
+        """Approximate row count of the properties table, cached for a minute."""
+        now = time.monotonic()
+        if self._table_rows_cache is None or self._table_rows_cache[1] < now:
+            reltuples = db.execute(
+                text("SELECT reltuples FROM pg_class WHERE oid = 'properties'::regclass")
+            ).scalar()
+            self._table_rows_cache = (reltuples or 0, now + 60)
+        return self._table_rows_cache[0]
     
     def get_multi_by_ids(self, db: Session, *, ids: List[str]) -> List[Property]:
         """Get multiple properties by their IDs."""
@@ -1,6 +1,8 @@
-from typing import List
+from datetime import datetime
+from typing import Any, List
 from sqlalchemy.orm import Session
 from app.crud.base import CRUDBase
+from app.db.models.property import Property
 from app.db.models.property_image import PropertyImage
 from app.schemas.property import PropertyImageCreate, PropertyImageBase
 
@@ -10,6 +12,16 @@ class CRUDPropertyImage(CRUDBase[PropertyImage, PropertyImageCreate, PropertyIma
         return db.query(PropertyImage).filter(
             PropertyImage.property_id == property_id
         ).order_by(PropertyImage.sort_order).all()
+    
+    def remove(self, db: Session, *, id: Any) -> PropertyImage:
+        """Delete an image and touch its property, so the change shows in updated_at."""
+        image = db.query(PropertyImage).get(id)
+        db.query(Property).filter(Property.id == image.property_id).update(
+            {Property.updated_at: datetime.utcnow()}, synchronize_session=False
+        )
+        db.delete(image)
+        db.commit()
+        return image
 
 
 crud_property_image = CRUDPropertyImage(PropertyImage)
@@ -1,33 +1,108 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import Any, Dict, List
+from sqlalchemy import and_, bindparam, tuple_
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
+from app.core.scores import SCORE_FIELDS
 from app.crud.base import CRUDBase
-from app.db.models.property_poi import PropertyPOI
+from app.db.models.poi import POI
+from app.db.models.property import Property
+from app.db.models.property_poi import PropertyPOILink
+from app.db.outbox import PROPERTY_ENTITY, queue_search_changes
 
+# Properties per statement; keeps the pair lists well under the bind parameter limit
+_CHUNK_SIZE = 200
 
-class CRUDPropertyPOI(CRUDBase[PropertyPOI, dict, dict]):
-    def get_by_property(self, db: Session, *, property_id: str) -> List[PropertyPOI]:
-        """Get all POIs for a property, grouped by category."""
-        return db.query(PropertyPOI).filter(
-            PropertyPOI.property_id == property_id
-        ).order_by(PropertyPOI.category, PropertyPOI.sort_order).all()
-    
-    def delete_by_property(self, db: Session, *, property_id: str) -> int:
-        """Delete all POIs for a property."""
-        deleted = db.query(PropertyPOI).filter(
-            PropertyPOI.property_id == property_id
-        ).delete()
-        db.commit()
-        return deleted
+
+class CRUDPropertyPOI(CRUDBase[PropertyPOILink, dict, dict]):
+    def get_by_property(self, db: Session, *, property_id: str) -> List[Any]:
+        """Nearby POIs of a property (link plus POI columns), grouped by category."""
+        return db.query(
+            POI.id,
+            POI.category,
+            POI.name,
+            POI.name_en,
+            POI.name_ar,
+            POI.lat,
+            POI.lng,
+            POI.poi_type,
+            POI.address,
+            PropertyPOILink.distance,
+            PropertyPOILink.rank,
+        ).join(
+            POI, POI.id == PropertyPOILink.poi_id
+        ).filter(
+            PropertyPOILink.property_id == property_id
+        ).order_by(POI.category, PropertyPOILink.rank).all()
     
-    def create_bulk(self, db: Session, *, pois: List[dict]) -> List[PropertyPOI]:
-        """Create multiple POIs at once."""
-        db_pois = [PropertyPOI(**poi) for poi in pois]
-        db.add_all(db_pois)
+    def replace_for_properties(
+        self,
+        db: Session,
+        *,
+        property_ids: List[Any],
+        links: List[dict],
+        scores: Dict[Any, Dict[str, Any]],
+    ) -> int:
+        """
+        Set the nearby POI links and neighborhood scores of several properties
+        in one transaction.
+        
+        Links are upserted with INSERT ... ON CONFLICT (unchanged pairs are
+        not rewritten) and links no longer in `links` are deleted. `scores`
+        maps property id to its score columns (see app.core.scores); they are
+        written together with pois_updated_at, and the properties are queued
+        for reindexing since the scores are part of the search document.
+        
+        Returns:
+            Number of links written
+        """
+        by_property = {property_id: [] for property_id in property_ids}
+        for link in links:
+            by_property[link["property_id"]].append(link)
+        
+        property_ids = list(by_property)
+        for start in range(0, len(property_ids), _CHUNK_SIZE):
+            chunk_ids = property_ids[start:start + _CHUNK_SIZE]
+            chunk_links = [link for property_id in chunk_ids for link in by_property[property_id]]
+            
+            stale = PropertyPOILink.property_id.in_(chunk_ids)
+            if chunk_links:
+                stmt = insert(PropertyPOILink).values(chunk_links)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[PropertyPOILink.property_id, PropertyPOILink.poi_id],
+                    set_={"distance": stmt.excluded.distance, "rank": stmt.excluded.rank},
+                    where=tuple_(PropertyPOILink.distance, PropertyPOILink.rank).is_distinct_from(
+                        tuple_(stmt.excluded.distance, stmt.excluded.rank)
+                    ),
+                )
+                db.execute(stmt)
+                pairs = [(link["property_id"], link["poi_id"]) for link in chunk_links]
+                stale = and_(stale, tuple_(PropertyPOILink.property_id, PropertyPOILink.poi_id).notin_(pairs))
+            db.query(PropertyPOILink).filter(stale).delete(synchronize_session=False)
+        
+        table = Property.__table__
+        update_scores = (
+            table.update()
+            .where(table.c.id == bindparam("b_id"))
+            .values(
+                pois_updated_at=bindparam("b_pois_updated_at"),
+                # Keep updated_at: refreshed POIs are not an edit of the listing
+                updated_at=table.c.updated_at,
+                **{field: bindparam(f"b_{field}") for field in SCORE_FIELDS},
+            )
+        )
+        now = datetime.utcnow()
+        db.execute(update_scores, [
+            {
+                "b_id": property_id,
+                "b_pois_updated_at": now,
+                **{f"b_{field}": scores[property_id][field] for field in SCORE_FIELDS},
+            }
+            for property_id in property_ids
+        ])
+        queue_search_changes(db, PROPERTY_ENTITY, property_ids)
         db.commit()
-        for poi in db_pois:
-            db.refresh(poi)
-        return db_pois
-
+        return len(links)
 
-crud_property_poi = CRUDPropertyPOI(PropertyPOI)
 
+crud_property_poi = CRUDPropertyPOI(PropertyPOILink)
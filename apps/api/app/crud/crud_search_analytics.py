@@ -0,0 +1,155 @@
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple, Type
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.crud.base import CRUDBase
+from app.db.models.search_analytics import SearchAnalytics
+from app.db.models.search_rollup import SearchRollupHourly, SearchRollupDaily, RollupWatermark
+
+SEARCH_ROLLUP = "search_rollups"
+
+# Rollup table -> date_trunc unit of its buckets
+_ROLLUPS = ((SearchRollupHourly, "hour"), (SearchRollupDaily, "day"))
+
+
+class CRUDSearchAnalytics(CRUDBase[SearchAnalytics, dict, dict]):
+    def insert_bulk(self, db: Session, *, rows: List[dict], chunk_size: int = 1000) -> int:
+        """
+        Insert tracked searches, one multi-row INSERT per chunk.
+        
+        Rows carry their own id, so replaying a batch after a failed
+        acknowledgement skips the rows already stored.
+        
+        Returns:
+            Number of rows actually inserted (skipped duplicates excluded)
+        """
+        if not rows:
+            return 0
+        inserted = 0
+        for start in range(0, len(rows), chunk_size):
+            result = db.execute(
+                insert(SearchAnalytics)
+                .values(rows[start:start + chunk_size])
+                .on_conflict_do_nothing()
+                .returning(SearchAnalytics.id)
+            )
+            inserted += len(result.all())
+        db.commit()
+        return inserted
+    
+    def rollup(self, db: Session, *, upto: datetime, max_span: timedelta) -> Tuple[Optional[datetime], bool]:
+        """
+        Fold searches inserted after the watermark (and at most `max_span`
+        past it, up to `upto`) into the hourly and daily rollups.
+        
+        The watermark is on inserted_at rather than created_at: events can
+        wait in the Redis buffer for a long time, and would land behind a
+        created_at watermark uncounted. They are still bucketed by created_at.
+        The upserts and the watermark move commit together, and the
+        watermark row is locked meanwhile, so each search is counted once
+        even with concurrent runs.
+        
+        Returns:
+            (new watermark, whether the rollups have caught up with `upto`)
+        """
+        db.execute(insert(RollupWatermark).values(name=SEARCH_ROLLUP).on_conflict_do_nothing())
+        mark = db.query(RollupWatermark).filter(RollupWatermark.name == SEARCH_ROLLUP).with_for_update().one()
+        
+        start = mark.watermark
+        if start is None:
+            first = db.query(func.min(SearchAnalytics.inserted_at)).scalar()
+            if first is None:
+                db.rollback()
+                return None, True
+            start = first - timedelta(microseconds=1)
+        end = min(upto, start + max_span)
+        if end <= start:
+            db.rollback()
+            return start, True
+        
+        in_slice = (SearchAnalytics.inserted_at > start, SearchAnalytics.inserted_at <= end)
+        for table, unit in _ROLLUPS:
+            keys = (
+                func.date_trunc(unit, SearchAnalytics.created_at),
+                func.coalesce(SearchAnalytics.query_normalized, ""),
+                func.coalesce(SearchAnalytics.filters_key, ""),
+            )
+            rows = (
+                select(*keys, func.count(), func.count().filter(SearchAnalytics.result_count == 0))
+                .where(*in_slice)
+                .group_by(*keys)
+            )
+            stmt = insert(table).from_select(
+                ["bucket_start", "query_normalized", "filters_key", "searches", "zero_results"], rows
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["bucket_start", "query_normalized", "filters_key"],
+                set_={
+                    "searches": table.searches + stmt.excluded.searches,
+                    "zero_results": table.zero_results + stmt.excluded.zero_results,
+                },
+            )
+            db.execute(stmt)
+        
+        mark.watermark = end
+        db.commit()
+        return end, end >= upto
+    
+    def oldest_unrolled(self, db: Session) -> Optional[datetime]:
+        """created_at of the oldest search the rollups have not counted yet, if any."""
+        watermark = db.query(RollupWatermark.watermark).filter(RollupWatermark.name == SEARCH_ROLLUP).scalar()
+        query = db.query(func.min(SearchAnalytics.created_at))
+        if watermark is not None:
+            query = query.filter(SearchAnalytics.inserted_at > watermark)
+        return query.scalar()
+    
+    def _report(
+        self,
+        db: Session,
+        *,
+        column,
+        since: datetime,
+        hourly: bool,
+        limit: int,
+        zero_results_only: bool = False,
+    ) -> List[dict]:
+        table: Type = SearchRollupHourly if hourly else SearchRollupDaily
+        searches = func.sum(table.searches)
+        zero_results = func.sum(table.zero_results)
+        query = (
+            db.query(getattr(table, column), searches, zero_results)
+            .filter(table.bucket_start >= since, getattr(table, column) != "")
+            .group_by(getattr(table, column))
+        )
+        if zero_results_only:
+            query = query.having(zero_results > 0).order_by(zero_results.desc(), searches.desc())
+        else:
+            query = query.order_by(searches.desc())
+        
+        return [
+            {
+                "value": value,
+                "searches": int(total),
+                "zero_results": int(zero),
+                "zero_result_rate": round(zero / total, 4) if total else 0.0,
+            }
+            for value, total, zero in query.limit(limit).all()
+        ]
+    
+    def top_queries(self, db: Session, *, since: datetime, hourly: bool = False, limit: int = 20) -> List[dict]:
+        """Most searched normalized queries since `since`, from the rollups."""
+        return self._report(db, column="query_normalized", since=since, hourly=hourly, limit=limit)
+    
+    def top_zero_result_queries(self, db: Session, *, since: datetime, hourly: bool = False, limit: int = 20) -> List[dict]:
+        """Queries that most often found nothing since `since`, from the rollups."""
+        return self._report(
+            db, column="query_normalized", since=since, hourly=hourly, limit=limit, zero_results_only=True
+        )
+    
+    def top_filter_combos(self, db: Session, *, since: datetime, hourly: bool = False, limit: int = 20) -> List[dict]:
+        """Most used filter combinations since `since`, from the rollups."""
+        return self._report(db, column="filters_key", since=since, hourly=hourly, limit=limit)
+
+
+crud_search_analytics = CRUDSearchAnalytics(SearchAnalytics)
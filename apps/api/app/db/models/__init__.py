@@ -5,12 +5,15 @@ from app.db.models.location import Location
 from app.db.models.settings import Settings
 from app.db.models.property import Property, PropertyPurpose, PropertyType, PropertyStatus, PropertyCurrency
 from app.db.models.property_image import PropertyImage
-from app.db.models.property_poi import PropertyPOI
+from app.db.models.property_poi import PropertyPOILink
 from app.db.models.lead import Lead, LeadStatus
 from app.db.models.search_analytics import SearchAnalytics
+from app.db.models.search_rollup import SearchRollupHourly, SearchRollupDaily, RollupWatermark
 from app.db.models.activity_log import ActivityLog, ActivityType
 from app.db.models.email_alert import EmailAlert
 from app.db.models.user_account import UserAccount
+from app.db.models.search_outbox import SearchOutbox
+from app.db.models.poi import POI
 
 __all__ = [
     "User",
@@ -24,13 +27,18 @@ __all__ = [
     "PropertyStatus",
     "PropertyCurrency",
     "PropertyImage",
-    "PropertyPOI",
+    "PropertyPOILink",
     "Lead",
     "LeadStatus",
     "SearchAnalytics",
+    "SearchRollupHourly",
+    "SearchRollupDaily",
+    "RollupWatermark",
     "ActivityLog",
     "ActivityType",
     "EmailAlert",
     "UserAccount",
+    "SearchOutbox",
+    "POI",
 ]
 
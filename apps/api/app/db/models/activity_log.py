@@ -30,6 +30,8 @@ class ActivityType(str, enum.Enum):
 class ActivityLog(Base):
     """Audit trail for all admin actions."""
     __tablename__ = "activity_logs"
+    # Monthly partitions, see app.db.partitions
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     activity_type = Column(Enum(ActivityType), nullable=False, index=True)
@@ -41,7 +43,7 @@ class ActivityLog(Base):
     changes = Column(JSONB, nullable=True)  # Store before/after changes
     ip_address = Column(String(45), nullable=True)
     user_agent = Column(String(500), nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow, primary_key=True, index=True)  # Partition key, so part of the primary key
 
     # Relationships
     user = relationship("User", lazy="select")
@@ -1,13 +1,16 @@
 import uuid
-from sqlalchemy import Column, String, DateTime, Float, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, DateTime, Float, ForeignKey, Index, Computed
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime
 from app.db.base import Base
 
 
 class Location(Base):
     __tablename__ = "locations"
+    __table_args__ = (
+        Index("ix_locations_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name_en = Column(String(255), nullable=False)
@@ -19,6 +22,13 @@ class Location(Base):
     lng = Column(Float, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
+    # Location names for full-text search; Arabic is folded with normalize_ar()
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "to_tsvector('english', coalesce(name_en, '')) || "
+        "to_tsvector('simple', normalize_ar(coalesce(name_ar, '')))",
+        persisted=True,
+    )))
 
     # Relationships
     parent = relationship("Location", remote_side=[id], backref="children")
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, String, DateTime, Float, Index
+from datetime import datetime
+from app.db.base import Base
+
+
+class POI(Base):
+    """
+    Point of interest imported from an OpenStreetMap extract.
+    
+    Loaded by app.scripts.import_pois and queried locally (see
+    app.services.poi_service) instead of calling Overpass per property.
+    """
+    __tablename__ = "pois"
+    __table_args__ = (
+        Index("ix_pois_lat_lng", "lat", "lng"),  # Bounding-box reads for the refresh job
+    )
+
+    id = Column(String(32), primary_key=True)  # OSM element, e.g. "node/123"
+    category = Column(String(50), nullable=False, index=True)  # Key of POI_CATEGORIES
+    name = Column(String(500), nullable=False)
+    name_en = Column(String(500), nullable=True)
+    name_ar = Column(String(500), nullable=True)
+    lat = Column(Float, nullable=False)
+    lng = Column(Float, nullable=False)
+    poi_type = Column(String(100), nullable=True)  # OSM amenity/shop/leisure value
+    address = Column(String(500), nullable=True)
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
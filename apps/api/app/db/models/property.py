@@ -1,8 +1,9 @@
 import uuid
-from sqlalchemy import Column, String, DateTime, Numeric, Integer, Boolean, Enum, ForeignKey, Text
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, DateTime, Numeric, Integer, Float, Boolean, Enum, ForeignKey, Text, Index, Computed, text
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime
+from app.core.geo import GEOHASH_PRECISION
 from app.db.base import Base
 import enum
 
@@ -37,6 +38,14 @@ class PropertyCurrency(str, enum.Enum):
 
 class Property(Base):
     __tablename__ = "properties"
+    __table_args__ = (
+        # Keyset pagination for public listings: (sort key, id) over published rows
+        Index("ix_properties_published_created_at_id", "created_at", "id", postgresql_where=text("published")),
+        Index("ix_properties_published_price_id", "price_amount", "id", postgresql_where=text("published")),
+        Index("ix_properties_published_walkability_id", "walkability_score", "id", postgresql_where=text("published")),
+        # Full-text search; trigram indexes on the titles are created in the migration
+        Index("ix_properties_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     title_en = Column(String(500), nullable=False)
@@ -65,6 +74,42 @@ class Property(Base):
     lat = Column(Numeric(10, 8), nullable=True)
     lng = Column(Numeric(11, 8), nullable=True)
     show_exact_location = Column(Boolean, default=False, nullable=False)
+    pois_updated_at = Column(DateTime, nullable=True, index=True)  # Last nearby-POI computation
+    # Geohash of lat/lng (app.core.geo); radius searches scan its prefix ranges
+    geohash = Column(
+        String(12, collation="C"),
+        Computed(f"geohash_encode(lat, lng, {GEOHASH_PRECISION})", persisted=True),
+        nullable=True,
+        index=True,
+    )
+    
+    # Neighborhood scores from nearby POIs (see app.core.scores); nearest is
+    # NULL when there is none within 1 km
+    schools_nearest_m = Column(Float, nullable=True, index=True)
+    schools_within_500m = Column(Integer, default=0, server_default="0", nullable=False)
+    schools_within_1km = Column(Integer, default=0, server_default="0", nullable=False)
+    mosques_nearest_m = Column(Float, nullable=True, index=True)
+    mosques_within_500m = Column(Integer, default=0, server_default="0", nullable=False)
+    mosques_within_1km = Column(Integer, default=0, server_default="0", nullable=False)
+    hospitals_nearest_m = Column(Float, nullable=True, index=True)
+    hospitals_within_500m = Column(Integer, default=0, server_default="0", nullable=False)
+    hospitals_within_1km = Column(Integer, default=0, server_default="0", nullable=False)
+    supermarkets_nearest_m = Column(Float, nullable=True, index=True)
+    supermarkets_within_500m = Column(Integer, default=0, server_default="0", nullable=False)
+    supermarkets_within_1km = Column(Integer, default=0, server_default="0", nullable=False)
+    banks_nearest_m = Column(Float, nullable=True, index=True)
+    banks_within_500m = Column(Integer, default=0, server_default="0", nullable=False)
+    banks_within_1km = Column(Integer, default=0, server_default="0", nullable=False)
+    restaurants_nearest_m = Column(Float, nullable=True, index=True)
+    restaurants_within_500m = Column(Integer, default=0, server_default="0", nullable=False)
+    restaurants_within_1km = Column(Integer, default=0, server_default="0", nullable=False)
+    parks_nearest_m = Column(Float, nullable=True, index=True)
+    parks_within_500m = Column(Integer, default=0, server_default="0", nullable=False)
+    parks_within_1km = Column(Integer, default=0, server_default="0", nullable=False)
+    gas_stations_nearest_m = Column(Float, nullable=True, index=True)
+    gas_stations_within_500m = Column(Integer, default=0, server_default="0", nullable=False)
+    gas_stations_within_1km = Column(Integer, default=0, server_default="0", nullable=False)
+    walkability_score = Column(Integer, default=0, server_default="0", nullable=False, index=True)
     
     featured = Column(Boolean, default=False, nullable=False, index=True)
     published = Column(Boolean, default=False, nullable=False, index=True)
@@ -73,12 +118,21 @@ class Property(Base):
     agent_id = Column(UUID(as_uuid=True), ForeignKey("agents.id"), nullable=True, index=True)
     
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, index=True)
+    
+    # Weighted search document (titles A, descriptions C); Arabic is folded with normalize_ar()
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('english', coalesce(title_en, '')), 'A') || "
+        "setweight(to_tsvector('simple', normalize_ar(coalesce(title_ar, ''))), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description_en, '')), 'C') || "
+        "setweight(to_tsvector('simple', normalize_ar(coalesce(description_ar, ''))), 'C')",
+        persisted=True,
+    )))
 
     # Relationships
     location = relationship("Location", back_populates="properties", lazy="joined")
     agent = relationship("Agent", back_populates="properties", lazy="joined")
     images = relationship("PropertyImage", back_populates="property", cascade="all, delete-orphan", lazy="joined", order_by="PropertyImage.sort_order")
     leads = relationship("Lead", back_populates="property", lazy="select")
-    pois = relationship("PropertyPOI", back_populates="property", cascade="all, delete-orphan", lazy="select", order_by="PropertyPOI.category, PropertyPOI.sort_order")
+    poi_links = relationship("PropertyPOILink", back_populates="property", cascade="all, delete-orphan", lazy="select", order_by="PropertyPOILink.rank")
 
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, DateTime, Integer, ForeignKey
+from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -8,6 +8,10 @@ from app.db.base import Base
 
 class PropertyImage(Base):
     __tablename__ = "property_images"
+    __table_args__ = (
+        # Covers the "first image by sort_order" lookup used by listing cards
+        Index("ix_property_images_property_id_sort_order", "property_id", "sort_order", postgresql_include=["file_key"]),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     property_id = Column(UUID(as_uuid=True), ForeignKey("properties.id"), nullable=False, index=True)
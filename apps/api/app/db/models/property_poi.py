@@ -1,34 +1,23 @@
-import uuid
-from sqlalchemy import Column, String, DateTime, Numeric, ForeignKey, Integer
+from sqlalchemy import Column, String, ForeignKey, Integer, Float
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
-from datetime import datetime
 from app.db.base import Base
 
 
-class PropertyPOI(Base):
-    __tablename__ = "property_pois"
-
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    property_id = Column(UUID(as_uuid=True), ForeignKey("properties.id", ondelete="CASCADE"), nullable=False, index=True)
-    
-    # POI details
-    category = Column(String(50), nullable=False, index=True)  # schools, mosques, hospitals, etc.
-    name = Column(String(500), nullable=False)
-    name_en = Column(String(500), nullable=True)
-    name_ar = Column(String(500), nullable=True)
-    lat = Column(Numeric(10, 8), nullable=False)
-    lng = Column(Numeric(11, 8), nullable=False)
-    distance = Column(Numeric(10, 1), nullable=False)  # Distance in meters
-    poi_type = Column(String(100), nullable=True)  # OSM type (amenity, shop, etc.)
-    address = Column(String(500), nullable=True)
-    
-    # Sort order within category (closest first)
-    sort_order = Column(Integer, nullable=False, default=0)
+class PropertyPOILink(Base):
+    """
+    Nearby POI of a property.
     
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    Only the pair plus distance and rank are stored per property; names,
+    coordinates and categories live once per POI in the pois table.
+    """
+    __tablename__ = "property_poi_links"
 
-    # Relationships
-    property = relationship("Property", back_populates="pois")
+    property_id = Column(UUID(as_uuid=True), ForeignKey("properties.id", ondelete="CASCADE"), primary_key=True)
+    poi_id = Column(String(32), ForeignKey("pois.id", ondelete="CASCADE"), primary_key=True, index=True)
+    distance = Column(Float, nullable=False)  # Distance in meters
+    rank = Column(Integer, nullable=False)  # Position within the POI's category (closest first)
 
+    # Relationships
+    property = relationship("Property", back_populates="poi_links")
+    poi = relationship("POI", lazy="joined")
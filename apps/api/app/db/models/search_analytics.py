@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, DateTime, Text, Integer
+from sqlalchemy import Column, String, DateTime, Text, Integer, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from datetime import datetime
 from app.db.base import Base
@@ -8,12 +8,18 @@ from app.db.base import Base
 class SearchAnalytics(Base):
     """Track search queries and filters for analytics."""
     __tablename__ = "search_analytics"
+    # Monthly partitions, see app.db.partitions
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     query = Column(String(500), nullable=True, index=True)
+    query_normalized = Column(String(500), nullable=True)  # app.core.text.normalize_query
     filters = Column(JSONB, nullable=True)  # Store filter combinations as JSON
+    filters_key = Column(String(255), nullable=True)  # Sorted names of the filters used, e.g. "bedrooms+purpose"
     result_count = Column(Integer, nullable=True)
     ip_address = Column(String(45), nullable=True)
     user_agent = Column(String(500), nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow, primary_key=True, index=True)  # Partition key, so part of the primary key
+    # When the row reached the table (events wait in the Redis buffer first); the rollup watermark
+    inserted_at = Column(DateTime, server_default=text("(now() AT TIME ZONE 'utc')"), nullable=False, index=True)
 
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, String, DateTime, BigInteger
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+from app.db.base import Base
+
+
+class SearchOutbox(Base):
+    """
+    Pending search index changes.
+    
+    Rows are written in the same transaction as the data change (see
+    app.db.outbox) and consumed by the search sync relay, which reads the
+    current state of each entity and pushes it to Meilisearch.
+    """
+    __tablename__ = "search_outbox"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    entity_type = Column(String(20), nullable=False)  # "property" or "location"
+    entity_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
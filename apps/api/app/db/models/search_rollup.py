@@ -0,0 +1,30 @@
+from sqlalchemy import Column, String, DateTime, Integer
+from datetime import datetime
+from app.db.base import Base
+
+
+class _SearchRollupColumns:
+    bucket_start = Column(DateTime, primary_key=True)
+    query_normalized = Column(String(500), primary_key=True)  # "" = no text query
+    filters_key = Column(String(255), primary_key=True)  # "" = no filters
+    searches = Column(Integer, default=0, nullable=False)
+    zero_results = Column(Integer, default=0, nullable=False)
+
+
+class SearchRollupHourly(_SearchRollupColumns, Base):
+    """search_analytics counts per hour, query and filter combination."""
+    __tablename__ = "search_rollups_hourly"
+
+
+class SearchRollupDaily(_SearchRollupColumns, Base):
+    """search_analytics counts per day, query and filter combination."""
+    __tablename__ = "search_rollups_daily"
+
+
+class RollupWatermark(Base):
+    """How far a rollup has consumed its source table (rows inserted up to `watermark`)."""
+    __tablename__ = "rollup_watermarks"
+
+    name = Column(String(100), primary_key=True)
+    watermark = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
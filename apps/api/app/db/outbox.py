@@ -0,0 +1,59 @@
+"""
+Session hook that records search index changes in the outbox table.
+
+Every flush that inserts, changes or deletes a property, property image or
+location writes matching search_outbox rows on the same connection, so the
+outbox commits (or rolls back) together with the change itself.
+"""
+from typing import Any, Iterable, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.db.models.location import Location
+from app.db.models.property import Property
+from app.db.models.property_image import PropertyImage
+from app.db.models.search_outbox import SearchOutbox
+
+PROPERTY_ENTITY = "property"
+LOCATION_ENTITY = "location"
+
+
+def _outbox_entry(obj) -> Tuple[str, object]:
+    if isinstance(obj, Property):
+        return PROPERTY_ENTITY, obj.id
+    if isinstance(obj, PropertyImage):
+        return PROPERTY_ENTITY, obj.property_id
+    if isinstance(obj, Location):
+        return LOCATION_ENTITY, obj.id
+    return None, None
+
+
+def record_search_changes(session: Session, flush_context):
+    """after_flush listener: queue the flushed search-relevant objects."""
+    entries: Set[Tuple[str, object]] = set()
+    
+    changed = list(session.new) + list(session.deleted)
+    changed += [obj for obj in session.dirty if session.is_modified(obj, include_collections=False)]
+    
+    for obj in changed:
+        entity_type, entity_id = _outbox_entry(obj)
+        if entity_type and entity_id is not None:
+            entries.add((entity_type, entity_id))
+    
+    if entries:
+        # Core insert: adding ORM objects is not allowed during a flush
+        session.connection().execute(
+            SearchOutbox.__table__.insert(),
+            [{"entity_type": entity_type, "entity_id": entity_id} for entity_type, entity_id in entries],
+        )
+
+
+def queue_search_changes(session: Session, entity_type: str, entity_ids: Iterable[Any]):
+    """
+    Queue entities changed with Core statements (which bypass the flush hook).
+    
+    Runs on the session's connection, so the rows commit with the change.
+    """
+    rows = [{"entity_type": entity_type, "entity_id": entity_id} for entity_id in set(entity_ids)]
+    if rows:
+        session.connection().execute(SearchOutbox.__table__.insert(), rows)
@@ -0,0 +1,127 @@
+"""
+Monthly range partitions for the append-only log tables.
+
+search_analytics and activity_logs are partitioned by created_at, one
+partition per calendar month named <table>_yYYYYmMM. The worker creates
+partitions ahead of time and enforces retention by dropping whole
+partitions, so old rows go without DELETE or vacuum work. Queries filtered
+on created_at only touch the matching partitions.
+
+Each table also has a DEFAULT partition, <table>_default, so an insert
+never fails for lack of a month partition (worker down for longer than
+PARTITION_MONTHS_AHEAD, a skewed created_at). Creating a month's partition
+moves that month's rows out of it; the worker does this for every month
+the default holds, so it stays empty in normal operation.
+"""
+import re
+from datetime import date, datetime
+from typing import List, Tuple, Union
+
+from sqlalchemy import text
+
+PARTITIONED_TABLES = ("search_analytics", "activity_logs")
+
+_PARTITION_RE = re.compile(r"_y(\d{4})m(\d{2})$")
+
+
+def month_start(value: Union[date, datetime]) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_y{month.year}m{month.month:02d}"
+
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+
+def list_partitions(conn, table: str) -> List[Tuple[str, date]]:
+    """(name, month) of the table's monthly partitions, oldest first."""
+    rows = conn.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = CAST(:table AS regclass)"
+        ),
+        {"table": table},
+    ).all()
+    
+    partitions = []
+    for (name,) in rows:
+        match = _PARTITION_RE.search(name)
+        if match:
+            partitions.append((name, date(int(match.group(1)), int(match.group(2)), 1)))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+def create_partitions(conn, table: str, first: date, last: date) -> List[str]:
+    """
+    Create the missing monthly partitions from `first` through `last`.
+    
+    Returns:
+        Names of the partitions created
+    """
+    existing = {name for name, _ in list_partitions(conn, table)}
+    created = []
+    month = month_start(first)
+    while month <= last:
+        name = partition_name(table, month)
+        if name not in existing:
+            _create_partition(conn, table, month)
+            created.append(name)
+        month = add_months(month, 1)
+    return created
+
+
+def default_partition_months(conn, table: str) -> List[date]:
+    """Months that have rows in the table's DEFAULT partition, oldest first."""
+    rows = conn.execute(text(
+        f"SELECT DISTINCT date_trunc('month', created_at) AS month "
+        f"FROM {default_partition_name(table)} ORDER BY month"
+    )).scalars().all()
+    return [month_start(month) for month in rows]
+
+
+def _create_partition(conn, table: str, month: date) -> None:
+    """
+    Create one monthly partition, moving its rows out of the DEFAULT partition.
+    
+    Postgres refuses to attach a range the default already holds rows for,
+    so they are parked in a temporary table and inserted again through the
+    parent once the partition exists. Runs in the caller's transaction.
+    """
+    start, end = month.isoformat(), add_months(month, 1).isoformat()
+    default = default_partition_name(table)
+    conn.execute(text(f"CREATE TEMP TABLE _moving (LIKE {table}) ON COMMIT DROP"))
+    moved = conn.execute(text(
+        f"WITH moved AS (DELETE FROM {default} WHERE created_at >= '{start}' AND created_at < '{end}' RETURNING *) "
+        f"INSERT INTO _moving SELECT * FROM moved"
+    )).rowcount
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {partition_name(table, month)} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{start}') TO ('{end}')"
+    ))
+    if moved:
+        conn.execute(text(f"INSERT INTO {table} SELECT * FROM _moving"))
+    conn.execute(text("DROP TABLE _moving"))
+
+
+def drop_partitions_before(conn, table: str, before: date) -> List[str]:
+    """
+    Drop partitions whose whole month lies before `before`.
+    
+    Returns:
+        Names of the partitions dropped
+    """
+    dropped = []
+    for name, month in list_partitions(conn, table):
+        if add_months(month, 1) <= before:
+            conn.execute(text(f"DROP TABLE IF EXISTS {name}"))
+            dropped.append(name)
+    return dropped
@@ -1,6 +1,7 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.db.outbox import record_search_changes
 
 engine = create_engine(
     settings.DATABASE_URL,
@@ -11,3 +12,5 @@ engine = create_engine(
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Queue search index updates in the same transaction as the data change
+event.listen(SessionLocal, "after_flush", record_search_changes)
@@ -1,7 +1,9 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.core.rate_limit import rate_limit_middleware
+from app.core.middleware import RateLimitMiddleware, TimingMiddleware
+from app.core.metrics import metrics
+from app.services.meilisearch_service import meilisearch_service
 from app.api.routes import (
     auth,
     public,
@@ -11,6 +13,10 @@ from app.api.routes import (
     admin_leads,
     admin_settings,
     uploads,
+    admin_search,
+    admin_pois,
+    admin_jobs,
+    admin_analytics,
     search,
     user_accounts,
     email_alerts,
@@ -22,8 +28,9 @@ app = FastAPI(
     version="1.0.0",
 )
 
-# Rate limiting middleware (must be before CORS)
-app.middleware("http")(rate_limit_middleware)
+# Middleware (pure ASGI; the last added runs first):
+# timing -> CORS -> rate limiting -> routes
+app.add_middleware(RateLimitMiddleware)
 
 # CORS
 app.add_middleware(
@@ -34,6 +41,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(TimingMiddleware)
+
 # Public routes
 app.include_router(public.router, prefix="/api/public", tags=["public"])
 app.include_router(search.router, prefix="/api/search", tags=["search"])
@@ -50,6 +59,17 @@ app.include_router(admin_agents.router, prefix="/api/admin/agents", tags=["admin
 app.include_router(admin_leads.router, prefix="/api/admin/leads", tags=["admin-leads"])
 app.include_router(admin_settings.router, prefix="/api/admin/settings", tags=["admin-settings"])
 app.include_router(uploads.router, prefix="/api/admin/uploads", tags=["admin-uploads"])
+app.include_router(admin_search.router, prefix="/api/admin/search", tags=["admin-search"])
+app.include_router(admin_pois.router, prefix="/api/admin/pois", tags=["admin-pois"])
+app.include_router(admin_jobs.router, prefix="/api/admin/jobs", tags=["admin-jobs"])
+app.include_router(admin_analytics.router, prefix="/api/admin/analytics", tags=["admin-analytics"])
+
+
+@app.on_event("startup")
+def configure_search_index():
+    # Reconcile Meilisearch settings once here instead of on every request.
+    # The outbox relay runs in the worker (python -m app.worker).
+    meilisearch_service.ensure_index(force=True)
 
 
 @app.get("/")
@@ -61,3 +81,8 @@ def read_root():
 def health_check():
     return {"status": "healthy"}
 
+
+@app.get("/metrics", include_in_schema=False)
+def metrics_endpoint():
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4")
+
@@ -0,0 +1,8 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, Optional
+
+
+class SearchTrackEvent(BaseModel):
+    query: Optional[str] = Field(None, max_length=500)
+    filters: Optional[Dict[str, Any]] = None
+    result_count: Optional[int] = Field(None, ge=0, le=2_147_483_647)  # Integer column
@@ -0,0 +1,92 @@
+"""
+Microbenchmark of per-request middleware overhead on /api/public/properties.
+
+Runs the same trivial endpoint in-process (no server, no database) behind:
+    none     no middleware
+    legacy   the previous @app.middleware("http") rate limiter
+             (BaseHTTPMiddleware)
+    asgi     the pure ASGI stack from app.core.middleware (timing + rate limit)
+
+The limiters run without Redis, so the numbers isolate the middleware
+machinery itself. Usage:
+    docker-compose exec api python -m app.scripts.benchmark_middleware [--requests 5000]
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI, Request
+
+from app.core.middleware import PrefixTable, RateLimitMiddleware, TimingMiddleware
+from app.core.rate_limit import RateLimiter
+
+PATH = "/api/public/properties"
+
+
+def _limiter() -> RateLimiter:
+    limiter = RateLimiter()
+    limiter._script = None  # no Redis: every check allows
+    return limiter
+
+
+def build_app(stack: str) -> FastAPI:
+    app = FastAPI()
+    
+    @app.get(PATH)
+    def properties():
+        return {"items": [], "total": 0}
+    
+    limiter = _limiter()
+    
+    if stack == "legacy":
+        async def rate_limit_middleware(request: Request, call_next):
+            # Same routing as the removed implementation
+            if request.url.path in ["/health", "/", "/docs", "/openapi.json", "/redoc"]:
+                return await call_next(request)
+            if not request.url.path.startswith("/api/public"):
+                return await call_next(request)
+            await limiter.check_rate_limit(request)
+            return await call_next(request)
+        
+        app.middleware("http")(rate_limit_middleware)
+    
+    elif stack == "asgi":
+        app.add_middleware(RateLimitMiddleware, routes=PrefixTable([("/api/public", limiter)]))
+        app.add_middleware(TimingMiddleware)
+    
+    return app
+
+
+async def measure(app: FastAPI, requests: int) -> float:
+    """Mean microseconds per request."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(200):  # warm up
+            await client.get(PATH)
+        started = time.perf_counter()
+        for _ in range(requests):
+            await client.get(PATH)
+        return (time.perf_counter() - started) / requests * 1e6
+
+
+async def run(requests: int):
+    results = {}
+    for stack in ("none", "legacy", "asgi"):
+        results[stack] = await measure(build_app(stack), requests)
+    
+    baseline = results["none"]
+    print(f"{'stack':<8} {'us/request':>11} {'overhead':>10}")
+    for stack, micros in results.items():
+        print(f"{stack:<8} {micros:>11.1f} {micros - baseline:>+10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark middleware overhead")
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests))
+
+
+if __name__ == "__main__":
+    main()
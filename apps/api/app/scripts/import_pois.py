@@ -0,0 +1,127 @@
+"""
+Import points of interest from an OpenStreetMap extract into the pois table.
+
+Accepts an Overpass JSON dump (`out center tags;`) or, when pyosmium is
+installed, an .osm.pbf extract such as Geofabrik's palestine-latest.osm.pbf.
+POIs are upserted by OSM id; with --prune, POIs missing from the extract are
+deleted. API workers pick up the new data within a minute.
+
+Usage:
+    docker-compose exec api python -m app.scripts.import_pois palestine.json
+    docker-compose exec api python -m app.scripts.import_pois palestine-latest.osm.pbf --prune
+    docker-compose exec api python -m app.scripts.import_pois --download
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime
+from typing import Dict, Iterator, List
+
+from app.crud.crud_poi import crud_poi
+from app.db.session import SessionLocal
+from app.services.osm_service import osm_service, poi_from_element, poi_from_tags, PALESTINE_BBOX
+
+
+def read_overpass_json(path: str) -> Iterator[Dict]:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    for element in data.get("elements", []):
+        poi = poi_from_element(element)
+        if poi:
+            yield poi
+
+
+def read_pbf(path: str) -> List[Dict]:
+    try:
+        import osmium
+    except ImportError:
+        print("❌ Reading .pbf extracts requires pyosmium (pip install osmium)")
+        raise SystemExit(1)
+    
+    class POIHandler(osmium.SimpleHandler):
+        def __init__(self):
+            super().__init__()
+            self.pois = []
+        
+        def node(self, n):
+            if not n.tags:
+                return
+            poi = poi_from_tags(f"node/{n.id}", n.location.lat, n.location.lon, dict(n.tags))
+            if poi:
+                self.pois.append(poi)
+        
+        def way(self, w):
+            if not w.tags:
+                return
+            tags = dict(w.tags)
+            if not poi_from_tags("", 0.0, 0.0, tags):
+                return
+            # Center of the outline, like Overpass `out center`
+            points = [(node.lat, node.lon) for node in w.nodes if node.location.valid()]
+            if not points:
+                return
+            lat = sum(p[0] for p in points) / len(points)
+            lng = sum(p[1] for p in points) / len(points)
+            self.pois.append(poi_from_tags(f"way/{w.id}", lat, lng, tags))
+    
+    handler = POIHandler()
+    handler.apply_file(path, locations=True)
+    return handler.pois
+
+
+def _batched(items, size: int) -> Iterator[List[Dict]]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import POIs from an OSM extract")
+    parser.add_argument("path", nargs="?", help="Overpass JSON dump or .osm.pbf extract")
+    parser.add_argument("--download", action="store_true", help="Fetch the extract from Overpass instead")
+    parser.add_argument("--prune", action="store_true", help="Delete POIs that are not in the extract")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    
+    if not args.path and not args.download:
+        parser.error("give an extract path or --download")
+    
+    started_at = datetime.utcnow()
+    started = time.perf_counter()
+    
+    if args.download:
+        print(f"🌍 Downloading POIs for {PALESTINE_BBOX} from Overpass...")
+        pois = asyncio.run(osm_service.fetch_pois(PALESTINE_BBOX))
+    elif args.path.endswith(".pbf"):
+        print(f"📦 Reading {args.path}...")
+        pois = read_pbf(args.path)
+    else:
+        print(f"📄 Reading {args.path}...")
+        pois = read_overpass_json(args.path)
+    
+    db = SessionLocal()
+    try:
+        imported = 0
+        # Elements can repeat in merged dumps; one row per id per statement
+        for batch in _batched(pois, args.batch_size):
+            unique = list({poi["id"]: poi for poi in batch}.values())
+            imported += crud_poi.upsert_bulk(db, pois=unique)
+            print(f"  {imported} POIs", flush=True)
+        
+        pruned = 0
+        if args.prune:
+            pruned = crud_poi.delete_not_updated_since(db, since=started_at)
+    finally:
+        db.close()
+    
+    print(f"✅ Imported {imported} POIs ({pruned} pruned) in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
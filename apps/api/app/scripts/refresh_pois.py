@@ -0,0 +1,59 @@
+"""
+Refresh cached nearby POIs for properties, one Overpass query per map tile.
+
+The worker runs this every POI_REFRESH_INTERVAL_HOURS; use the script for
+one-off runs with progress output. Only properties whose POIs are older than
+--max-age-days are refreshed.
+
+Usage:
+    docker-compose exec api python -m app.scripts.refresh_pois [--max-age-days 30] [--source overpass|local] [--concurrency 2]
+"""
+import argparse
+
+from app.core.config import settings
+from app.services.poi_refresh_service import SOURCES, poi_refresh_service
+
+
+def print_tile(timing: dict):
+    status = poi_refresh_service.status
+    done = status["tiles_done"] + status["tiles_failed"]
+    prefix = f"  [{done}/{status['tiles_total']}] tile {timing['tile']}: {timing['properties']} properties"
+    if timing.get("error"):
+        print(f"{prefix} ❌ {timing['error']}", flush=True)
+        return
+    print(
+        f"{prefix}, {timing['pois']} POIs - fetch {timing['fetch_seconds']}s, "
+        f"assign {timing['assign_seconds']}s, write {timing['write_seconds']}s",
+        flush=True,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh cached nearby POIs")
+    parser.add_argument("--max-age-days", type=int, default=settings.POI_REFRESH_MAX_AGE_DAYS)
+    parser.add_argument("--source", choices=SOURCES, default=settings.POI_REFRESH_SOURCE)
+    parser.add_argument("--concurrency", type=int, default=settings.POI_REFRESH_CONCURRENCY)
+    args = parser.parse_args()
+    
+    print(f"📍 Refreshing POIs older than {args.max_age_days} days from {args.source}...")
+    try:
+        result = poi_refresh_service.run(
+            max_age_days=args.max_age_days,
+            source=args.source,
+            concurrency=args.concurrency,
+            progress=print_tile,
+        )
+    except Exception as e:
+        print(f"❌ POI refresh failed: {e}")
+        raise SystemExit(1)
+    
+    print(
+        f"✅ Refreshed {result['properties']} properties in {result['tiles']} tiles "
+        f"({result['tiles_failed']} failed) in {result['seconds']}s"
+    )
+    if result["tiles_failed"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Rebuild the Meilisearch properties index from the database.
+
+Streams properties in chunks into a temporary index and swaps it with the
+live one when done, so searches keep being served from the old index.
+
+Usage:
+    docker-compose exec api python -m app.scripts.reindex_search [--batch-size 1000] [--concurrency 4]
+"""
+import argparse
+
+from app.services.meilisearch_service import meilisearch_service
+from app.services.reindex_service import reindex_service
+
+
+def print_progress(indexed: int, total: int, elapsed: float):
+    rate = indexed / elapsed if elapsed else 0
+    percent = indexed * 100 / total if total else 100
+    print(f"  {indexed}/{total} ({percent:.1f}%) - {rate:.0f} docs/s", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the search index")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+    
+    if not meilisearch_service.is_available():
+        print("❌ Meilisearch is not configured (MEILI_URL / MEILI_MASTER_KEY)")
+        raise SystemExit(1)
+    
+    print("🔎 Reindexing properties...")
+    try:
+        result = reindex_service.run(
+            batch_size=args.batch_size,
+            concurrency=args.concurrency,
+            progress=print_progress,
+        )
+    except Exception as e:
+        print(f"❌ Reindex failed: {e}")
+        raise SystemExit(1)
+    
+    print(
+        f"✅ Indexed {result['indexed']} properties in {result['seconds']}s "
+        f"({result['docs_per_second']} docs/s), {result['caught_up']} changed during the run re-pushed"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+"""
+Server-side map clustering for the listings map.
+
+Each API worker holds the coordinates and filter columns of every published
+listing in NumPy arrays, with each point's Web Mercator cell on a fine grid
+at MAX_ZOOM. Cells at a lower zoom are the same cell numbers shifted right,
+so the grids of all zoom levels nest. A viewport request filters the arrays,
+groups the remaining points by their cell at the requested zoom and returns
+one cluster per cell, so the response grows with the clusters on screen,
+not with the listings behind them.
+
+The index polls the properties table every MAP_INDEX_REFRESH_SECONDS and
+applies only the rows changed since the last poll. Deletions leave no
+changed row, so each poll also compares a fingerprint of the listing ids
+with the database and reloads everything on a mismatch.
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.geo import haversine_m
+from app.core.polygon import Ring, points_in_polygon, polygon_bbox
+from app.core.scores import SCORE_CATEGORIES, WALKABILITY_FIELD, nearest_field
+from app.crud.crud_location import crud_location
+from app.crud.crud_property import crud_property
+
+logger = logging.getLogger(__name__)
+
+# Deepest zoom level served (Leaflet tiles go to 19)
+MAX_ZOOM = 20
+
+# Clusters are grid cells of 256 / 2**CELL_BITS = 64 screen pixels
+CELL_BITS = 2
+GRID_BITS = MAX_ZOOM + CELL_BITS
+
+# Web Mercator stops at this latitude
+MAX_LATITUDE = 85.05112878
+
+# Rows committed late with an older timestamp are caught by re-reading this
+# much before the last poll (applying a row twice is harmless)
+CHANGE_OVERLAP = timedelta(seconds=60)
+
+# Filter columns held as floats, NULL as NaN so comparisons fail like in SQL
+NUMERIC_COLUMNS = (
+    "price_amount",
+    "area_m2",
+    "bedrooms",
+    "bathrooms",
+    "year_built",
+    "floor",
+    WALKABILITY_FIELD,
+    *(nearest_field(category) for category in SCORE_CATEGORIES),
+)
+FLAG_COLUMNS = ("furnished", "parking", "featured")
+LABEL_COLUMNS = ("purpose", "type", "location_id")
+
+
+def grid_cells(lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """(x, y) Web Mercator cells at MAX_ZOOM, shape (n, 2)."""
+    scale = 1 << GRID_BITS
+    sin_lat = np.sin(np.radians(np.clip(lats, -MAX_LATITUDE, MAX_LATITUDE)))
+    x = (lngs + 180.0) / 360.0
+    y = 0.5 - np.log((1 + sin_lat) / (1 - sin_lat)) / (4 * np.pi)
+    cells = np.stack([x, y], axis=1) * scale
+    return np.clip(cells.astype(np.int64), 0, scale - 1)
+
+
+def _label(value: Any) -> str:
+    return str(value.value if hasattr(value, "value") else value)
+
+
+def _number(value: Any) -> float:
+    return np.nan if value is None else float(value)
+
+
+def id_key(property_id: str) -> int:
+    """First 15 hex digits of a UUID as an integer; summed into the id fingerprint (see CRUDProperty.map_rows_fingerprint)."""
+    return int(property_id.replace("-", "")[:15], 16)
+
+
+class _MapPoints:
+    """Immutable column arrays of the mapped listings; replaced, never mutated."""
+    
+    def __init__(self, rows: List[Any]):
+        self.ids = np.array([str(row.id) for row in rows], dtype=object)
+        self.id_sum = sum(id_key(property_id) for property_id in self.ids)
+        self.lats = np.array([float(row.lat) for row in rows], dtype=np.float64)
+        self.lngs = np.array([float(row.lng) for row in rows], dtype=np.float64)
+        self.cells = grid_cells(self.lats, self.lngs) if rows else np.empty((0, 2), dtype=np.int64)
+        self.columns: Dict[str, np.ndarray] = {}
+        for name in NUMERIC_COLUMNS:
+            self.columns[name] = np.array([_number(getattr(row, name)) for row in rows], dtype=np.float64)
+        for name in FLAG_COLUMNS:
+            self.columns[name] = np.array([bool(getattr(row, name)) for row in rows], dtype=bool)
+        for name in LABEL_COLUMNS:
+            self.columns[name] = np.array([_label(getattr(row, name)) for row in rows], dtype=object)
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    def fingerprint(self) -> Tuple[int, int]:
+        return len(self), self.id_sum
+    
+    def replace(self, changed: List[Any]) -> "_MapPoints":
+        """Copy with the changed rows applied: updated, added, or dropped if no longer mappable."""
+        changed_ids = np.array([str(row.id) for row in changed], dtype=object)
+        keep = ~np.isin(self.ids, changed_ids)
+        added = _MapPoints([
+            row for row in changed
+            if row.published and row.lat is not None and row.lng is not None
+        ])
+        
+        merged = _MapPoints([])
+        merged.ids = np.concatenate([self.ids[keep], added.ids])
+        merged.id_sum = self.id_sum - sum(id_key(property_id) for property_id in self.ids[~keep]) + added.id_sum
+        merged.lats = np.concatenate([self.lats[keep], added.lats])
+        merged.lngs = np.concatenate([self.lngs[keep], added.lngs])
+        merged.cells = np.concatenate([self.cells[keep], added.cells])
+        merged.columns = {
+            name: np.concatenate([values[keep], added.columns[name]])
+            for name, values in self.columns.items()
+        }
+        return merged
+
+
+class MapIndexService:
+    """
+    In-memory cluster index over the published listings.
+    
+    Loaded on first use; afterwards each request that finds the index older
+    than MAP_INDEX_REFRESH_SECONDS applies the rows changed since the last
+    poll. Deleted listings leave no changed row behind, so a fingerprint
+    mismatch (count and sum of id keys) triggers a full reload instead.
+    """
+    
+    def __init__(self, refresh_seconds: float = 10.0):
+        self.refresh_seconds = refresh_seconds
+        self._points: Optional[_MapPoints] = None
+        self._watermark: Optional[datetime] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+    
+    def _is_fresh(self) -> bool:
+        return self._points is not None and time.monotonic() - self._checked_at < self.refresh_seconds
+    
+    def _refresh(self, db: Session):
+        if self._is_fresh():
+            return
+        
+        with self._lock:
+            if self._is_fresh():
+                return
+            
+            started = time.perf_counter()
+            polled_at = datetime.utcnow()
+            if self._points is not None:
+                changed = crud_property.get_map_rows(db, changed_since=self._watermark - CHANGE_OVERLAP)
+                points = self._points.replace(changed) if changed else self._points
+                if points.fingerprint() == crud_property.map_rows_fingerprint(db):
+                    self._points = points
+                    self._watermark = polled_at
+                    self._checked_at = time.monotonic()
+                    return
+            
+            self._points = _MapPoints(crud_property.get_map_rows(db))
+            self._watermark = polled_at
+            self._checked_at = time.monotonic()
+            logger.info(
+                f"Loaded {len(self._points)} listings into the map index "
+                f"in {time.perf_counter() - started:.2f}s"
+            )
+    
+    def _filter_mask(
+        self,
+        db: Session,
+        points: _MapPoints,
+        *,
+        q: Optional[str] = None,
+        purpose: Optional[str] = None,
+        type: Optional[Union[str, List[str]]] = None,
+        location_slug: Optional[Union[str, List[str]]] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        bedrooms: Optional[int] = None,
+        bathrooms: Optional[int] = None,
+        min_area: Optional[float] = None,
+        max_area: Optional[float] = None,
+        year_built: Optional[int] = None,
+        furnished: Optional[bool] = None,
+        parking: Optional[bool] = None,
+        floor: Optional[int] = None,
+        featured: Optional[bool] = None,
+        near: Optional[Dict[str, int]] = None,
+        min_walkability: Optional[int] = None,
+        near_lat: Optional[float] = None,
+        near_lng: Optional[float] = None,
+        radius_m: Optional[float] = None,
+        polygon: Optional[List[Ring]] = None,
+    ) -> np.ndarray:
+        """
+        Vectorized listing filters over the index.
+        
+        Mirrors CRUDProperty.filter_query, like the Meilisearch filters do.
+        Only the text search `q` goes to the database, for the matching IDs.
+        `polygon` is tested on the points inside its bounding box only.
+        """
+        columns = points.columns
+        mask = np.ones(len(points), dtype=bool)
+        
+        def as_list(value):
+            return value if isinstance(value, list) else [value]
+        
+        if purpose:
+            mask &= columns["purpose"] == purpose
+        if type:
+            mask &= np.isin(columns["type"], as_list(type))
+        if location_slug:
+            location_ids = crud_location.get_ids_by_slugs(db, slugs=as_list(location_slug))
+            mask &= np.isin(columns["location_id"], [str(location_id) for location_id in location_ids])
+        
+        bounds = (
+            ("price_amount", min_price, max_price),
+            ("bedrooms", bedrooms, None),
+            ("bathrooms", bathrooms, None),
+            ("area_m2", min_area, max_area),
+            ("year_built", year_built, None),
+            (WALKABILITY_FIELD, min_walkability, None),
+            *((nearest_field(category), None, meters) for category, meters in (near or {}).items()),
+        )
+        for name, low, high in bounds:
+            if low is not None:
+                mask &= columns[name] >= low
+            if high is not None:
+                mask &= columns[name] <= high
+        
+        if floor is not None:
+            mask &= columns["floor"] == floor
+        for name, value in (("furnished", furnished), ("parking", parking), ("featured", featured)):
+            if value is not None:
+                mask &= columns[name] == value
+        
+        if radius_m is not None and near_lat is not None and near_lng is not None:
+            mask &= haversine_m(near_lat, near_lng, points.lats, points.lngs) <= radius_m
+        
+        if polygon:
+            west, south, east, north = polygon_bbox(polygon)
+            candidates = np.flatnonzero(
+                mask
+                & (points.lats >= south) & (points.lats <= north)
+                & (points.lngs >= west) & (points.lngs <= east)
+            )
+            mask = np.zeros(len(points), dtype=bool)
+            mask[candidates] = points_in_polygon(points.lats[candidates], points.lngs[candidates], polygon)
+        
+        if q:
+            matching = crud_property.get_filtered_ids(db, q=q, published=True)
+            mask &= np.isin(points.ids, [str(property_id) for property_id in matching])
+        return mask
+    
+    def clusters(
+        self,
+        db: Session,
+        *,
+        west: float,
+        south: float,
+        east: float,
+        north: float,
+        zoom: int,
+        **filters,
+    ) -> Dict[str, Any]:
+        """
+        Clusters of the listings inside a bounding box at a zoom level.
+        
+        Args:
+            db: Database session (used to load and refresh the index)
+            west, south, east, north: Bounding box in degrees
+            zoom: Map zoom level (0 - MAX_ZOOM)
+            **filters: Listing filters of CRUDProperty.filter_query
+        
+        Returns:
+            Dict with the total listings in view and one cluster per grid
+            cell: centroid, count and price range, plus the listing id for
+            single-listing clusters
+        """
+        self._refresh(db)
+        points = self._points
+        
+        in_view = (
+            (points.lats >= south) & (points.lats <= north)
+            & (points.lngs >= west) & (points.lngs <= east)
+        )
+        selected = np.flatnonzero(in_view & self._filter_mask(db, points, **filters))
+        if selected.size == 0:
+            return {"zoom": zoom, "total": 0, "clusters": []}
+        
+        cells = points.cells[selected] >> (MAX_ZOOM - zoom)
+        keys = (cells[:, 0] << 32) | cells[:, 1]
+        order = np.argsort(keys, kind="stable")
+        selected = selected[order]
+        keys = keys[order]
+        
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        counts = np.diff(np.r_[starts, selected.size])
+        lats = np.add.reduceat(points.lats[selected], starts) / counts
+        lngs = np.add.reduceat(points.lngs[selected], starts) / counts
+        prices = points.columns["price_amount"][selected]
+        min_prices = np.minimum.reduceat(prices, starts)
+        max_prices = np.maximum.reduceat(prices, starts)
+        
+        clusters = []
+        for i, start in enumerate(starts):
+            cluster = {
+                "lat": round(float(lats[i]), 6),
+                "lng": round(float(lngs[i]), 6),
+                "count": int(counts[i]),
+                "min_price": float(min_prices[i]),
+                "max_price": float(max_prices[i]),
+            }
+            if counts[i] == 1:
+                cluster["id"] = points.ids[selected[start]]
+            clusters.append(cluster)
+        
+        return {"zoom": zoom, "total": int(selected.size), "clusters": clusters}
+
+
+# Singleton instance
+map_index_service = MapIndexService(refresh_seconds=settings.MAP_INDEX_REFRESH_SECONDS)
@@ -1,26 +1,321 @@
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple, Iterable, Iterator, Callable
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from decimal import Decimal
+from itertools import islice
 from meilisearch import Client
+from meilisearch.errors import MeilisearchApiError
 from app.core.config import settings
+from app.core.circuit_breaker import CircuitBreaker, OPEN
+from app.core.metrics import metrics
+from app.core.facets import price_bucket, bedrooms_bucket
+from app.core.scores import SCORE_CATEGORIES, SCORE_FIELDS, WALKABILITY_FIELD, nearest_field
+from app.core.text import normalize_arabic
+import hashlib
+import json
 import logging
+import math
+import time
 
 logger = logging.getLogger(__name__)
 
-# Initialize Meilisearch client
+# Initialize Meilisearch clients: searches fail fast, indexing calls may
+# carry thousands of documents and get a longer timeout
 meilisearch_client: Optional[Client] = None
+meilisearch_write_client: Optional[Client] = None
 
 if settings.MEILI_URL and settings.MEILI_MASTER_KEY:
     try:
         meilisearch_client = Client(
             url=settings.MEILI_URL,
             api_key=settings.MEILI_MASTER_KEY,
+            timeout=settings.MEILI_TIMEOUT_SECONDS,
+        )
+        meilisearch_write_client = Client(
+            url=settings.MEILI_URL,
+            api_key=settings.MEILI_MASTER_KEY,
+            timeout=settings.MEILI_WRITE_TIMEOUT_SECONDS,
         )
         logger.info("Meilisearch client initialized successfully")
     except Exception as e:
         logger.warning(f"Failed to initialize Meilisearch: {e}")
         meilisearch_client = None
+        meilisearch_write_client = None
 else:
     logger.warning("Meilisearch not configured (MEILI_URL or MEILI_MASTER_KEY missing)")
 
+search_requests_counter = metrics.counter(
+    "meilisearch_search_requests_total",
+    "Meilisearch search calls by outcome",
+)
+search_fallback_counter = metrics.counter(
+    "search_fallback_total",
+    "Searches served from the database because Meilisearch was unavailable",
+)
+
+
+class SearchUnavailableError(Exception):
+    """Meilisearch could not serve a search; callers should use the database."""
+
+
+# Bump when the document shape changes; hits with another version are
+# treated as stale and re-hydrated from the database.
+DOCUMENT_VERSION = 4
+
+# Desired index configuration. ensure_index() reconciles the server with this.
+INDEX_SETTINGS: Dict[str, List[str]] = {
+    # Order matters: earlier attributes rank higher. Arabic is searched
+    # through the normalize_arabic() copies, queries are folded the same way.
+    "searchableAttributes": [
+        "title_en",
+        "title_ar_normalized",
+        "description_en",
+        "description_ar_normalized",
+        "location_name_en",
+        "location_name_ar_normalized",
+    ],
+    "filterableAttributes": [
+        "purpose",
+        "type",
+        "status",
+        "price_amount",
+        "price_currency",
+        "bedrooms",
+        "bathrooms",
+        "area_m2",
+        "year_built",
+        "floor",
+        "furnished",
+        "parking",
+        "featured",
+        "published",
+        "location_id",
+        "location_slug_en",
+        "location_slug_ar",
+        "bedrooms_bucket",
+        "price_bucket",
+        "_geo",
+        *(nearest_field(category) for category in SCORE_CATEGORIES),
+        WALKABILITY_FIELD,
+    ],
+    "sortableAttributes": [
+        "price_amount",
+        "created_at",
+        "area_m2",
+        "_geo",
+        WALKABILITY_FIELD,
+    ],
+}
+
+# Settings whose order is irrelevant to Meilisearch (compared as sets)
+_UNORDERED_SETTINGS = {"filterableAttributes", "sortableAttributes"}
+
+# How long startup/checks wait for a settings task to be processed
+SETTINGS_TASK_TIMEOUT_MS = 30000
+
+# How long a reindex waits for each document batch to be processed
+REINDEX_TASK_TIMEOUT_MS = 600000
+
+
+def settings_fingerprint(index_settings: Dict[str, Any]) -> str:
+    """
+    Stable hash of the INDEX_SETTINGS keys in an index settings payload.
+    
+    Works on both the desired settings and what the server reports, so a
+    mismatch means the server has drifted.
+    """
+    relevant = {}
+    for key in INDEX_SETTINGS:
+        value = list(index_settings.get(key) or [])
+        relevant[key] = sorted(value) if key in _UNORDERED_SETTINGS else value
+    payload = json.dumps(relevant, sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+DESIRED_SETTINGS_FINGERPRINT = settings_fingerprint(INDEX_SETTINGS)
+
+# Document attributes needed to render a listing card without the database
+CARD_ATTRIBUTES = [
+    "id",
+    "title_en",
+    "title_ar",
+    "slug_en",
+    "slug_ar",
+    "description_en",
+    "description_ar",
+    "purpose",
+    "type",
+    "status",
+    "price_amount",
+    "price_currency",
+    "area_m2",
+    "bedrooms",
+    "bathrooms",
+    "furnished",
+    "parking",
+    "floor",
+    "year_built",
+    "lat",
+    "lng",
+    WALKABILITY_FIELD,
+    "featured",
+    "published",
+    "location_id",
+    "location_name_en",
+    "agent_id",
+    "created_at",
+    "updated_at",
+    "first_image",
+    "doc_version",
+]
+
+
+def _enum_value(value: Any) -> Any:
+    return value.value if hasattr(value, 'value') else value
+
+
+def property_index_data(prop: Any) -> Dict[str, Any]:
+    """
+    Index data dictionary for a property.
+    
+    Accepts a Property model (location and images are read through its
+    relationships) or a flat row from CRUDProperty.iter_index_rows.
+    """
+    if hasattr(prop, "images"):
+        location = prop.location
+        first_image = prop.images[0].file_key if prop.images else None
+        location_fields = {
+            "location_name_en": location.name_en if location else "",
+            "location_name_ar": location.name_ar if location else "",
+            "location_slug_en": location.slug_en if location else "",
+            "location_slug_ar": location.slug_ar if location else "",
+        }
+    else:
+        first_image = prop.first_image
+        location_fields = {
+            "location_name_en": prop.location_name_en or "",
+            "location_name_ar": prop.location_name_ar or "",
+            "location_slug_en": prop.location_slug_en or "",
+            "location_slug_ar": prop.location_slug_ar or "",
+        }
+    
+    return {
+        "id": str(prop.id),
+        "title_en": prop.title_en,
+        "title_ar": prop.title_ar,
+        "slug_en": prop.slug_en,
+        "slug_ar": prop.slug_ar,
+        "description_en": prop.description_en,
+        "description_ar": prop.description_ar,
+        "purpose": _enum_value(prop.purpose),
+        "type": _enum_value(prop.type),
+        "status": _enum_value(prop.status),
+        "price_amount": float(prop.price_amount),
+        "price_currency": _enum_value(prop.price_currency),
+        "area_m2": float(prop.area_m2) if prop.area_m2 else None,
+        "bedrooms": prop.bedrooms,
+        "bathrooms": prop.bathrooms,
+        "furnished": prop.furnished,
+        "parking": prop.parking,
+        "floor": prop.floor,
+        "year_built": prop.year_built,
+        "lat": float(prop.lat) if prop.lat is not None else None,
+        "lng": float(prop.lng) if prop.lng is not None else None,
+        "featured": prop.featured,
+        "published": prop.published,
+        "location_id": str(prop.location_id),
+        **location_fields,
+        "agent_id": str(prop.agent_id) if prop.agent_id else None,
+        "first_image": first_image,
+        "created_at": prop.created_at.isoformat(),
+        "updated_at": prop.updated_at.isoformat(),
+        **{field: getattr(prop, field) for field in SCORE_FIELDS},
+    }
+
+
+def _format_filter_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return str(value).lower()
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        # The filter grammar has no inf/nan or exponent notation
+        if not math.isfinite(value):
+            raise ValueError(f"Filter value must be finite, got {value!r}")
+        return format(Decimal(repr(value)), "f")
+    # Double-quoted string with backslashes and quotes escaped
+    escaped = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+def _attribute_condition(attribute: str, value: Any) -> Optional[str]:
+    if isinstance(value, dict):
+        # Range: {"gte": low, "lte": high}, either bound optional
+        bounds = []
+        if value.get("gte") is not None:
+            bounds.append(f"{attribute} >= {_format_filter_value(value['gte'])}")
+        if value.get("lte") is not None:
+            bounds.append(f"{attribute} <= {_format_filter_value(value['lte'])}")
+        return " AND ".join(bounds) or None
+    if isinstance(value, (list, tuple, set)):
+        if not value:
+            return None
+        values = ", ".join(_format_filter_value(v) for v in value)
+        return f"{attribute} IN [{values}]"
+    return f"{attribute} = {_format_filter_value(value)}"
+
+
+def build_filter_expression(
+    filters: Optional[Dict[Any, Any]],
+    geo_radius: Optional[Tuple[float, float, float]] = None,
+) -> Optional[str]:
+    """
+    Build a Meilisearch filter expression from a filter dictionary.
+    
+    Values map to conditions by type:
+        True / 3 / "sell"         -> attr = true / attr = 3 / attr = "sell"
+        ["a", "b"]                -> attr IN ["a", "b"]
+        {"gte": 1, "lte": 5}      -> attr >= 1 AND attr <= 5
+    A tuple of attributes as the key ORs the condition across them, e.g.
+    {("location_slug_en", "location_slug_ar"): ["ramallah"]}. None values
+    are skipped, and all conditions are ANDed together.
+    
+    Args:
+        filters: Filter dictionary
+        geo_radius: Optional (lat, lng, radius in meters) restriction on _geo
+    """
+    conditions = []
+    for key, value in (filters or {}).items():
+        if value is None:
+            continue
+        if isinstance(key, tuple):
+            parts = [c for c in (_attribute_condition(attr, value) for attr in key) if c]
+            if parts:
+                conditions.append("(" + " OR ".join(parts) + ")")
+        else:
+            condition = _attribute_condition(key, value)
+            if condition:
+                conditions.append(f"({condition})" if " AND " in condition else condition)
+    
+    if geo_radius:
+        lat, lng, radius = geo_radius
+        conditions.append(f"_geoRadius({float(lat)}, {float(lng)}, {int(radius)})")
+    
+    return " AND ".join(conditions) or None
+
+
+def _batched(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def geo_sort(lat: float, lng: float, direction: str = "asc") -> str:
+    """Sort rule ordering hits by distance from a point."""
+    return f"_geoPoint({float(lat)}, {float(lng)}):{direction}"
+
 
 class MeilisearchService:
     """Service for Meilisearch operations."""
@@ -28,62 +323,133 @@ class MeilisearchService:
     INDEX_NAME = "properties"
     
     def __init__(self):
-        self.client = meilisearch_client
+        self.client = meilisearch_client  # Searches and health checks
+        self.write_client = meilisearch_write_client  # Everything else
+        # monotonic time of the last successful settings check
+        self._settings_checked_at: Optional[float] = None
+        self.breaker = CircuitBreaker(
+            "meilisearch",
+            failure_threshold=settings.MEILI_BREAKER_FAILURE_THRESHOLD,
+            slow_call_seconds=settings.MEILI_BREAKER_SLOW_CALL_SECONDS,
+            reset_timeout=settings.MEILI_BREAKER_RESET_SECONDS,
+            probe=self._health_probe,
+            probe_interval=settings.MEILI_BREAKER_PROBE_SECONDS,
+        )
     
     def is_available(self) -> bool:
-        """Check if Meilisearch is available."""
+        """Check if Meilisearch is configured."""
         return self.client is not None
     
-    def ensure_index(self):
-        """Create index if it doesn't exist and configure settings."""
+    def can_search(self) -> bool:
+        """Configured and not cut off by the circuit breaker."""
+        return self.is_available() and self.breaker.state != OPEN
+    
+    def _health_probe(self) -> bool:
+        return self.client.health().get("status") == "available"
+    
+    def ensure_index(self, force: bool = False):
+        """
+        Create the index if needed and reconcile its settings with INDEX_SETTINGS.
+        
+        Runs at startup and then at most once per MEILI_SETTINGS_CHECK_INTERVAL_SECONDS
+        (from the write paths). Settings are only pushed when the server's
+        fingerprint differs from the desired one, and the task is awaited so
+        later writes see the new configuration.
+        
+        Args:
+            force: Check the server even if the last check is recent
+        """
         if not self.is_available():
             return
         
+        now = time.monotonic()
+        if (
+            not force
+            and self._settings_checked_at is not None
+            and now - self._settings_checked_at < settings.MEILI_SETTINGS_CHECK_INTERVAL_SECONDS
+        ):
+            return
+        
         try:
-            # Get or create index
-            index = self.client.index(self.INDEX_NAME)
-            
-            # Configure searchable attributes
-            index.update_searchable_attributes([
-                "title_en",
-                "title_ar",
-                "description_en",
-                "description_ar",
-                "location_name_en",
-                "location_name_ar",
-            ])
-            
-            # Configure filterable attributes
-            index.update_filterable_attributes([
-                "purpose",
-                "type",
-                "status",
-                "price_amount",
-                "price_currency",
-                "bedrooms",
-                "bathrooms",
-                "area_m2",
-                "furnished",
-                "parking",
-                "featured",
-                "published",
-                "location_id",
-                "location_slug_en",
-                "location_slug_ar",
-            ])
+            index = self.write_client.index(self.INDEX_NAME)
+            try:
+                current = index.get_settings()
+            except MeilisearchApiError as e:
+                if e.code != "index_not_found":
+                    raise
+                task = self.write_client.create_index(self.INDEX_NAME, {"primaryKey": "id"})
+                self.write_client.wait_for_task(task.task_uid, timeout_in_ms=SETTINGS_TASK_TIMEOUT_MS)
+                current = {}
             
-            # Configure sortable attributes
-            index.update_sortable_attributes([
-                "price_amount",
-                "created_at",
-                "area_m2",
-            ])
+            if settings_fingerprint(current) != DESIRED_SETTINGS_FINGERPRINT:
+                task = index.update_settings(INDEX_SETTINGS)
+                result = index.wait_for_task(task.task_uid, timeout_in_ms=SETTINGS_TASK_TIMEOUT_MS)
+                if result.status != "succeeded":
+                    logger.error(f"Meilisearch settings update failed: {result.error}")
+                    return
+                logger.info(f"Meilisearch index '{self.INDEX_NAME}' settings updated")
             
-            logger.info(f"Meilisearch index '{self.INDEX_NAME}' configured")
+            self._settings_checked_at = now
             
         except Exception as e:
             logger.error(f"Error configuring Meilisearch index: {e}")
     
+    def _build_document(self, property_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Prepare a property data dictionary for indexing."""
+        document = {
+            "id": str(property_data.get("id")),
+            "title_en": property_data.get("title_en", ""),
+            "title_ar": property_data.get("title_ar", ""),
+            "slug_en": property_data.get("slug_en", ""),
+            "slug_ar": property_data.get("slug_ar", ""),
+            "description_en": property_data.get("description_en", ""),
+            "description_ar": property_data.get("description_ar", ""),
+            "purpose": property_data.get("purpose"),
+            "type": property_data.get("type"),
+            "status": property_data.get("status"),
+            "price_amount": float(property_data.get("price_amount", 0)),
+            "price_currency": property_data.get("price_currency"),
+            "area_m2": float(property_data.get("area_m2", 0)) if property_data.get("area_m2") else None,
+            "bedrooms": property_data.get("bedrooms"),
+            "bathrooms": property_data.get("bathrooms"),
+            "furnished": property_data.get("furnished", False),
+            "parking": property_data.get("parking", False),
+            "floor": property_data.get("floor"),
+            "year_built": property_data.get("year_built"),
+            "lat": property_data.get("lat"),
+            "lng": property_data.get("lng"),
+            "featured": property_data.get("featured", False),
+            "published": property_data.get("published", False),
+            "location_id": str(property_data.get("location_id", "")),
+            "location_name_en": property_data.get("location_name_en", ""),
+            "location_name_ar": property_data.get("location_name_ar", ""),
+            "location_slug_en": property_data.get("location_slug_en", ""),
+            "location_slug_ar": property_data.get("location_slug_ar", ""),
+            "agent_id": str(property_data.get("agent_id", "")) if property_data.get("agent_id") else None,
+            "first_image": property_data.get("first_image"),
+            "created_at": property_data.get("created_at"),
+            "updated_at": property_data.get("updated_at"),
+            "doc_version": DOCUMENT_VERSION,
+            # Search copies of the Arabic text, folded like the SQL normalize_ar()
+            "title_ar_normalized": normalize_arabic(property_data.get("title_ar") or ""),
+            "description_ar_normalized": normalize_arabic(property_data.get("description_ar") or ""),
+            "location_name_ar_normalized": normalize_arabic(property_data.get("location_name_ar") or ""),
+            # Facet buckets, numbered exactly like the SQL facet query
+            "bedrooms_bucket": bedrooms_bucket(property_data.get("bedrooms")),
+            "price_bucket": price_bucket(property_data.get("price_amount")),
+            # Neighborhood scores, filterable like the SQL columns
+            **{field: property_data.get(field) for field in SCORE_FIELDS},
+        }
+        
+        # Only documents with coordinates take part in geo filters and sorting
+        if property_data.get("lat") is not None and property_data.get("lng") is not None:
+            document["_geo"] = {
+                "lat": float(property_data["lat"]),
+                "lng": float(property_data["lng"]),
+            }
+        
+        return document
+    
     def index_property(self, property_data: Dict[str, Any]):
         """
         Index a single property.
@@ -96,39 +462,9 @@ class MeilisearchService:
         
         try:
             self.ensure_index()
-            index = self.client.index(self.INDEX_NAME)
+            index = self.write_client.index(self.INDEX_NAME)
             
-            # Prepare document for indexing
-            document = {
-                "id": str(property_data.get("id")),
-                "title_en": property_data.get("title_en", ""),
-                "title_ar": property_data.get("title_ar", ""),
-                "slug_en": property_data.get("slug_en", ""),
-                "slug_ar": property_data.get("slug_ar", ""),
-                "description_en": property_data.get("description_en", ""),
-                "description_ar": property_data.get("description_ar", ""),
-                "purpose": property_data.get("purpose"),
-                "type": property_data.get("type"),
-                "status": property_data.get("status"),
-                "price_amount": float(property_data.get("price_amount", 0)),
-                "price_currency": property_data.get("price_currency"),
-                "area_m2": float(property_data.get("area_m2", 0)) if property_data.get("area_m2") else None,
-                "bedrooms": property_data.get("bedrooms"),
-                "bathrooms": property_data.get("bathrooms"),
-                "furnished": property_data.get("furnished", False),
-                "parking": property_data.get("parking", False),
-                "floor": property_data.get("floor"),
-                "year_built": property_data.get("year_built"),
-                "featured": property_data.get("featured", False),
-                "published": property_data.get("published", False),
-                "location_id": str(property_data.get("location_id", "")),
-                "location_name_en": property_data.get("location_name_en", ""),
-                "location_name_ar": property_data.get("location_name_ar", ""),
-                "location_slug_en": property_data.get("location_slug_en", ""),
-                "location_slug_ar": property_data.get("location_slug_ar", ""),
-                "agent_id": str(property_data.get("agent_id", "")) if property_data.get("agent_id") else None,
-                "created_at": property_data.get("created_at"),
-            }
+            document = self._build_document(property_data)
             
             index.add_documents([document])
             logger.debug(f"Indexed property: {document['id']}")
@@ -146,7 +482,7 @@ class MeilisearchService:
             return
         
         try:
-            index = self.client.index(self.INDEX_NAME)
+            index = self.write_client.index(self.INDEX_NAME)
             index.delete_document(property_id)
             logger.debug(f"Deleted property from index: {property_id}")
         except Exception as e:
@@ -159,76 +495,96 @@ class MeilisearchService:
         sort: Optional[List[str]] = None,
         limit: int = 20,
         offset: int = 0,
+        facets: Optional[List[str]] = None,
+        geo_radius: Optional[Tuple[float, float, float]] = None,
+        attributes_to_retrieve: Optional[List[str]] = None,
     ) -> Dict[str, Any]:
         """
         Search properties.
         
         Args:
             query: Search query string
-            filters: Filter dictionary (e.g., {"purpose": "sell", "type": "apartment"})
-            sort: Sort order (e.g., ["price_amount:asc"])
+            filters: Filter dictionary, see build_filter_expression
+                (e.g., {"purpose": "sell", "type": ["apartment", "villa"]})
+            sort: Sort order (e.g., ["price_amount:asc"] or [geo_sort(lat, lng)])
             limit: Maximum results
             offset: Offset for pagination
+            facets: Attributes to return value counts for (facetDistribution)
+            geo_radius: Optional (lat, lng, radius in meters) restriction
+            attributes_to_retrieve: Document attributes to return (default all)
         
         Returns:
-            Search results dictionary with hits, total, etc.
+            Search results dictionary with hits, total, facet_distribution, etc.
+        
+        Raises:
+            SearchUnavailableError: Not configured, circuit open, or the call
+                failed (transport errors, timeouts, 5xx responses and slow
+                calls feed the circuit breaker; 4xx responses do not)
         """
         if not self.is_available():
-            return {
-                "hits": [],
-                "total": 0,
-                "offset": offset,
-                "limit": limit,
-            }
+            raise SearchUnavailableError("Meilisearch is not configured")
         
+        index = self.client.index(self.INDEX_NAME)
+        
+        # Everything that can raise on bad input happens before the breaker
+        # reserves a (half-open) trial, which only a recorded outcome releases
+        filter_str = build_filter_expression(filters, geo_radius=geo_radius)
+        
+        # Perform search
+        search_params = {
+            "limit": limit,
+            "offset": offset,
+        }
+        
+        if filter_str:
+            search_params["filter"] = filter_str
+        
+        if sort:
+            search_params["sort"] = sort
+        
+        if facets:
+            search_params["facets"] = facets
+        
+        if attributes_to_retrieve:
+            search_params["attributesToRetrieve"] = attributes_to_retrieve
+        
+        normalized_query = normalize_arabic(query)
+        
+        if not self.breaker.allow_request():
+            search_requests_counter.inc(outcome="rejected")
+            raise SearchUnavailableError("Meilisearch circuit is open")
+        
+        started = time.monotonic()
         try:
-            self.ensure_index()
-            index = self.client.index(self.INDEX_NAME)
-            
-            # Build filter string
-            filter_str = None
-            if filters:
-                filter_parts = []
-                for key, value in filters.items():
-                    if value is not None:
-                        if isinstance(value, bool):
-                            filter_parts.append(f"{key} = {str(value).lower()}")
-                        elif isinstance(value, (int, float)):
-                            filter_parts.append(f"{key} = {value}")
-                        else:
-                            filter_parts.append(f"{key} = '{value}'")
-                if filter_parts:
-                    filter_str = " AND ".join(filter_parts)
-            
-            # Perform search
-            search_params = {
-                "limit": limit,
-                "offset": offset,
-            }
-            
-            if filter_str:
-                search_params["filter"] = filter_str
-            
-            if sort:
-                search_params["sort"] = sort
-            
-            results = index.search(query, search_params)
-            
-            return {
-                "hits": results.get("hits", []),
-                "total": results.get("estimatedTotalHits", 0),
-                "offset": offset,
-                "limit": limit,
-            }
-            
+            results = index.search(normalized_query, search_params)
+        except MeilisearchApiError as e:
+            if e.status_code is not None and e.status_code < 500:
+                # Rejected query (e.g. a bad filter): the service is healthy,
+                # so user input must not trip the breaker
+                self.breaker.record_success(time.monotonic() - started)
+                search_requests_counter.inc(outcome="rejected_query")
+                logger.warning(f"Meilisearch rejected search: {e}")
+                raise SearchUnavailableError(str(e)) from e
+            self.breaker.record_failure()
+            search_requests_counter.inc(outcome="error")
+            logger.error(f"Error searching Meilisearch: {e}")
+            raise SearchUnavailableError(str(e)) from e
         except Exception as e:
+            self.breaker.record_failure()
+            search_requests_counter.inc(outcome="error")
             logger.error(f"Error searching Meilisearch: {e}")
-            return {
-                "hits": [],
-                "total": 0,
-                "offset": offset,
-                "limit": limit,
-            }
+            raise SearchUnavailableError(str(e)) from e
+        
+        self.breaker.record_success(time.monotonic() - started)
+        search_requests_counter.inc(outcome="ok")
+        
+        return {
+            "hits": results.get("hits", []),
+            "total": results.get("estimatedTotalHits", 0),
+            "offset": offset,
+            "limit": limit,
+            "facet_distribution": results.get("facetDistribution", {}),
+        }
     
     def bulk_index(self, properties: List[Dict[str, Any]]):
         """Bulk index multiple properties."""
@@ -237,41 +593,11 @@ class MeilisearchService:
         
         try:
             self.ensure_index()
-            index = self.client.index(self.INDEX_NAME)
+            index = self.write_client.index(self.INDEX_NAME)
             
             documents = []
             for prop_data in properties:
-                document = {
-                    "id": str(prop_data.get("id")),
-                    "title_en": prop_data.get("title_en", ""),
-                    "title_ar": prop_data.get("title_ar", ""),
-                    "slug_en": prop_data.get("slug_en", ""),
-                    "slug_ar": prop_data.get("slug_ar", ""),
-                    "description_en": prop_data.get("description_en", ""),
-                    "description_ar": prop_data.get("description_ar", ""),
-                    "purpose": prop_data.get("purpose"),
-                    "type": prop_data.get("type"),
-                    "status": prop_data.get("status"),
-                    "price_amount": float(prop_data.get("price_amount", 0)),
-                    "price_currency": prop_data.get("price_currency"),
-                    "area_m2": float(prop_data.get("area_m2", 0)) if prop_data.get("area_m2") else None,
-                    "bedrooms": prop_data.get("bedrooms"),
-                    "bathrooms": prop_data.get("bathrooms"),
-                    "furnished": prop_data.get("furnished", False),
-                    "parking": prop_data.get("parking", False),
-                    "floor": prop_data.get("floor"),
-                    "year_built": prop_data.get("year_built"),
-                    "featured": prop_data.get("featured", False),
-                    "published": prop_data.get("published", False),
-                    "location_id": str(prop_data.get("location_id", "")),
-                    "location_name_en": prop_data.get("location_name_en", ""),
-                    "location_name_ar": prop_data.get("location_name_ar", ""),
-                    "location_slug_en": prop_data.get("location_slug_en", ""),
-                    "location_slug_ar": prop_data.get("location_slug_ar", ""),
-                    "agent_id": str(prop_data.get("agent_id", "")) if prop_data.get("agent_id") else None,
-                    "created_at": prop_data.get("created_at"),
-                }
-                documents.append(document)
+                documents.append(self._build_document(prop_data))
             
             if documents:
                 index.add_documents(documents)
@@ -280,6 +606,132 @@ class MeilisearchService:
         except Exception as e:
             logger.error(f"Error bulk indexing properties: {e}")
 
+    
+    def apply_changes(self, upserts: List[Dict[str, Any]], delete_ids: List[str]):
+        """
+        Upsert and delete documents, waiting until Meilisearch has applied them.
+        
+        Unlike index_property/delete_property this raises on failure, so the
+        caller can retry.
+        
+        Args:
+            upserts: Property data dictionaries to (re)index
+            delete_ids: IDs of documents to remove
+        """
+        if not self.is_available():
+            raise RuntimeError("Meilisearch is not configured")
+        
+        self.ensure_index()
+        index = self.write_client.index(self.INDEX_NAME)
+        
+        tasks = []
+        if upserts:
+            tasks.append(index.add_documents([self._build_document(p) for p in upserts]))
+        if delete_ids:
+            tasks.append(index.delete_documents(delete_ids))
+        for task_info in tasks:
+            self._wait_for_task(task_info)
+    
+    def _wait_for_task(self, task_info, timeout_in_ms: int = SETTINGS_TASK_TIMEOUT_MS):
+        """Wait for an enqueued task and raise if it did not succeed."""
+        task = self.write_client.wait_for_task(task_info.task_uid, timeout_in_ms=timeout_in_ms)
+        if task.status != "succeeded":
+            raise RuntimeError(f"Meilisearch task {task.uid} {task.status}: {task.error}")
+        return task
+    
+    def reindex(
+        self,
+        properties: Iterable[Dict[str, Any]],
+        batch_size: int = 1000,
+        concurrency: int = 4,
+        progress: Optional[Callable[[int, float], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Rebuild the index from scratch and swap it in atomically.
+        
+        Documents go to a temporary index (configured with INDEX_SETTINGS
+        first), uploaded `concurrency` batches at a time. Once every batch task
+        has succeeded the temporary index is swapped with the live one, so
+        searches never see a partially built index. On any failure the live
+        index is left untouched. Writes to the live index while this runs are
+        discarded by the swap; the caller has to re-push them (see
+        ReindexService).
+        
+        Args:
+            properties: Property data dictionaries (consumed lazily; at most
+                `concurrency` batches are held in memory)
+            batch_size: Documents per add_documents request
+            concurrency: Batches uploaded in parallel
+            progress: Called with (documents uploaded, seconds elapsed)
+        
+        Returns:
+            Dictionary with indexed count, duration and throughput
+        """
+        if not self.is_available():
+            raise RuntimeError("Meilisearch is not configured")
+        
+        started = time.monotonic()
+        # The live index must exist to be swapped
+        self.ensure_index(force=True)
+        
+        temp_name = f"{self.INDEX_NAME}_reindex_{int(time.time())}"
+        self._wait_for_task(self.write_client.create_index(temp_name, {"primaryKey": "id"}))
+        temp_index = self.write_client.index(temp_name)
+        
+        def upload(batch: List[Dict[str, Any]]) -> Tuple[int, int]:
+            task_info = temp_index.add_documents(batch)
+            return task_info.task_uid, len(batch)
+        
+        try:
+            # Settings before documents, so each document is indexed only once
+            self._wait_for_task(temp_index.update_settings(INDEX_SETTINGS))
+            
+            task_uids = []
+            uploaded = 0
+            
+            def collect(done):
+                nonlocal uploaded
+                for future in done:
+                    task_uid, count = future.result()
+                    task_uids.append(task_uid)
+                    uploaded += count
+                    if progress:
+                        progress(uploaded, time.monotonic() - started)
+            
+            documents = (self._build_document(p) for p in properties)
+            pending = set()
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                for batch in _batched(documents, batch_size):
+                    if len(pending) >= concurrency:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        collect(done)
+                    pending.add(pool.submit(upload, batch))
+                collect(wait(pending).done)
+            
+            # Tasks are processed in enqueue order, so most of these return immediately
+            for task_uid in sorted(task_uids):
+                task = self.write_client.wait_for_task(task_uid, timeout_in_ms=REINDEX_TASK_TIMEOUT_MS)
+                if task.status != "succeeded":
+                    raise RuntimeError(f"Meilisearch task {task.uid} {task.status}: {task.error}")
+            
+            self._wait_for_task(
+                self.write_client.swap_indexes([{"indexes": [self.INDEX_NAME, temp_name]}])
+            )
+        except Exception:
+            self.write_client.delete_index(temp_name)
+            raise
+        
+        # After the swap the temporary name holds the previous documents
+        self.write_client.delete_index(temp_name)
+        
+        elapsed = time.monotonic() - started
+        logger.info(f"Reindexed {uploaded} properties in {elapsed:.1f}s")
+        return {
+            "indexed": uploaded,
+            "seconds": round(elapsed, 1),
+            "docs_per_second": round(uploaded / elapsed, 1) if elapsed else None,
+        }
+
 
 # Singleton instance
 meilisearch_service = MeilisearchService()
@@ -1,9 +1,12 @@
 """
-OpenStreetMap service for fetching nearby Points of Interest (POIs)
-Uses Overpass API to query OSM data
+OpenStreetMap service for downloading Points of Interest (POIs)
+
+Uses the Overpass API to fetch POI extracts for an area. Per-property lookups
+are answered from the local POI table (see app.services.poi_service).
 """
+import asyncio
 import httpx
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional, Tuple
 from app.core.config import settings
 import logging
 
@@ -12,60 +15,158 @@ logger = logging.getLogger(__name__)
 # Overpass API endpoint (public, free, rate-limited)
 OVERPASS_API_URL = "https://overpass-api.de/api/interpreter"
 
-# POI categories with their OSM tags
+# Responses worth retrying (rate limited / overloaded), with exponential backoff
+RETRY_STATUS_CODES = {429, 502, 503, 504}
+RETRY_BACKOFF_SECONDS = 2.0
+
+# (south, west, north, east) covering the West Bank and Gaza
+PALESTINE_BBOX = (31.2, 34.2, 32.6, 35.6)
+
+# POI categories with their OSM tag filters (Overpass QL)
 POI_CATEGORIES = {
     "schools": {
-        "query": 'node["amenity"~"^(school|university|kindergarten|college)$"](around:{radius},{lat},{lng});',
+        "query": '["amenity"~"^(school|university|kindergarten|college)$"]',
         "icon": "school",
     },
     "mosques": {
-        "query": 'node["amenity"="place_of_worship"]["religion"="muslim"](around:{radius},{lat},{lng});',
+        "query": '["amenity"="place_of_worship"]["religion"="muslim"]',
         "icon": "mosque",
     },
     "hospitals": {
-        "query": 'node["amenity"~"^(hospital|clinic|pharmacy)$"](around:{radius},{lat},{lng});',
+        "query": '["amenity"~"^(hospital|clinic|pharmacy)$"]',
         "icon": "hospital",
     },
     "supermarkets": {
-        "query": 'node["shop"~"^(supermarket|convenience|grocery)$"](around:{radius},{lat},{lng});',
+        "query": '["shop"~"^(supermarket|convenience|grocery)$"]',
         "icon": "store",
     },
     "banks": {
-        "query": 'node["amenity"="bank"](around:{radius},{lat},{lng});',
+        "query": '["amenity"="bank"]',
         "icon": "bank",
     },
     "restaurants": {
-        "query": 'node["amenity"~"^(restaurant|cafe|fast_food)$"](around:{radius},{lat},{lng});',
+        "query": '["amenity"~"^(restaurant|cafe|fast_food)$"]',
         "icon": "restaurant",
     },
     "parks": {
-        "query": 'node["leisure"~"^(park|playground)$"](around:{radius},{lat},{lng});',
+        "query": '["leisure"~"^(park|playground)$"]',
         "icon": "park",
     },
     "gas_stations": {
-        "query": 'node["amenity"="fuel"](around:{radius},{lat},{lng});',
+        "query": '["amenity"="fuel"]',
         "icon": "gas_station",
     },
 }
 
 
+def categorize_poi(tags: Dict[str, str]) -> Optional[str]:
+    """Determine POI category based on OSM tags."""
+    amenity = tags.get("amenity", "").lower()
+    shop = tags.get("shop", "").lower()
+    leisure = tags.get("leisure", "").lower()
+    religion = tags.get("religion", "").lower()
+    
+    # Schools
+    if amenity in ["school", "university", "kindergarten", "college"]:
+        return "schools"
+    
+    # Mosques
+    if amenity == "place_of_worship" and religion == "muslim":
+        return "mosques"
+    
+    # Hospitals
+    if amenity in ["hospital", "clinic", "pharmacy"]:
+        return "hospitals"
+    
+    # Supermarkets
+    if shop in ["supermarket", "convenience", "grocery"]:
+        return "supermarkets"
+    
+    # Banks
+    if amenity == "bank":
+        return "banks"
+    
+    # Restaurants
+    if amenity in ["restaurant", "cafe", "fast_food"]:
+        return "restaurants"
+    
+    # Parks
+    if leisure in ["park", "playground"]:
+        return "parks"
+    
+    # Gas stations
+    if amenity == "fuel":
+        return "gas_stations"
+    
+    return None
+
+
+def poi_from_tags(osm_id: str, lat: float, lng: float, tags: Dict[str, str]) -> Optional[Dict[str, Any]]:
+    """
+    Build a POI row from an OSM element's id, position and tags.
+    
+    Returns:
+        Dict matching the POI model columns, or None if the element is not
+        in any of POI_CATEGORIES
+    """
+    category = categorize_poi(tags)
+    if not category or lat is None or lng is None:
+        return None
+    
+    # Extract name (prefer Arabic name if available, fallback to English)
+    name = (
+        tags.get("name:ar")
+        or tags.get("name")
+        or tags.get("amenity")
+        or tags.get("shop")
+        or "Unknown"
+    )
+    
+    return {
+        "id": osm_id,
+        "category": category,
+        "name": name[:500],
+        "name_en": (tags.get("name:en") or tags.get("name") or "")[:500] or None,
+        "name_ar": (tags.get("name:ar") or "")[:500] or None,
+        "lat": float(lat),
+        "lng": float(lng),
+        "poi_type": tags.get("amenity") or tags.get("shop") or tags.get("leisure"),
+        "address": (tags.get("addr:street") or tags.get("address") or "")[:500] or None,
+    }
+
+
+def poi_from_element(element: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Build a POI row from an Overpass JSON element (node, or way/relation with center)."""
+    element_type = element.get("type")
+    if element_type == "node":
+        lat, lng = element.get("lat"), element.get("lon")
+    else:
+        center = element.get("center") or {}
+        lat, lng = center.get("lat"), center.get("lon")
+    
+    return poi_from_tags(
+        f"{element_type}/{element.get('id')}",
+        lat,
+        lng,
+        element.get("tags", {}),
+    )
+
+
 class OSMService:
-    """Service for querying OpenStreetMap data via Overpass API"""
+    """Service for downloading POI extracts from OpenStreetMap via Overpass API"""
 
     def __init__(self):
         self.api_url = OVERPASS_API_URL
-        self.timeout = 30.0  # Overpass API can be slow
+        self.timeout = 180.0  # Area extracts are large and Overpass can be slow
 
     def _build_overpass_query(
-        self, lat: float, lng: float, radius: int = 1000, categories: Optional[List[str]] = None
+        self, bbox: Tuple[float, float, float, float], categories: Optional[List[str]] = None
     ) -> str:
         """
-        Build Overpass QL query for nearby POIs.
+        Build Overpass QL query for all POIs in a bounding box.
         
         Args:
-            lat: Latitude
-            lng: Longitude
-            radius: Search radius in meters (default: 1000m = 1km)
+            bbox: (south, west, north, east)
             categories: List of category keys from POI_CATEGORIES (None = all)
         
         Returns:
@@ -74,220 +175,85 @@ class OSMService:
         if categories is None:
             categories = list(POI_CATEGORIES.keys())
         
-        # Build query parts for each category
+        area = ",".join(str(value) for value in bbox)
+        
+        # Nodes, ways and relations; ways/relations are reported by their center
         query_parts = []
         for category in categories:
             if category in POI_CATEGORIES:
-                query_template = POI_CATEGORIES[category]["query"]
-                query_parts.append(
-                    query_template.format(radius=radius, lat=lat, lng=lng)
-                )
+                query_parts.append(f"nwr{POI_CATEGORIES[category]['query']}({area});")
         
-        # Combine into full query
         query = f"""
-        [out:json][timeout:25];
+        [out:json][timeout:{int(self.timeout)}];
         (
             {''.join(query_parts)}
         );
-        out body;
-        >;
-        out skel qt;
+        out center tags;
         """
         return query
 
-    async def get_nearby_pois(
+    def client(self, max_connections: int = 4) -> httpx.AsyncClient:
+        """Pooled HTTP client for several Overpass requests (use with `async with`)."""
+        return httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            transport=httpx.AsyncHTTPTransport(retries=2),  # Connection failures
+        )
+
+    async def fetch_pois(
         self,
-        lat: float,
-        lng: float,
-        radius: int = 1000,
+        bbox: Tuple[float, float, float, float] = PALESTINE_BBOX,
         categories: Optional[List[str]] = None,
-        limit_per_category: int = 10,
-    ) -> Dict[str, List[Dict]]:
+        client: Optional[httpx.AsyncClient] = None,
+        retries: int = 3,
+    ) -> List[Dict[str, Any]]:
         """
-        Get nearby Points of Interest from OpenStreetMap.
+        Download all POIs in a bounding box.
         
         Args:
-            lat: Latitude
-            lng: Longitude
-            radius: Search radius in meters (default: 1000m = 1km)
+            bbox: (south, west, north, east), defaults to PALESTINE_BBOX
             categories: List of category keys (None = all)
-            limit_per_category: Max number of results per category
+            client: Shared client from client() (None = one-off client)
+            retries: Extra attempts on timeouts, 429 and 5xx gateway errors
         
         Returns:
-            Dictionary with category keys and lists of POI objects
-            Example:
-            {
-                "schools": [
-                    {
-                        "name": "Al-Aqsa School",
-                        "lat": 31.7683,
-                        "lng": 35.2137,
-                        "distance": 250.5,
-                        "type": "school"
-                    }
-                ],
-                "mosques": [...]
-            }
+            List of POI rows (see poi_from_tags)
         """
-        if not lat or not lng:
-            return {}
+        if client is None:
+            async with self.client(max_connections=1) as client:
+                return await self.fetch_pois(bbox, categories, client, retries)
+        
+        query = self._build_overpass_query(bbox, categories)
         
-        try:
-            query = self._build_overpass_query(lat, lng, radius, categories)
-            
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
+        for attempt in range(retries + 1):
+            try:
                 response = await client.post(
                     self.api_url,
                     data=query,
                     headers={"Content-Type": "text/plain"},
                 )
                 response.raise_for_status()
-                data = response.json()
-                
-                # Parse Overpass response
-                return self._parse_overpass_response(
-                    data, lat, lng, categories, limit_per_category
+                return self.parse_overpass_response(response.json())
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                retryable = (
+                    not isinstance(e, httpx.HTTPStatusError)
+                    or e.response.status_code in RETRY_STATUS_CODES
                 )
-        
-        except httpx.TimeoutException:
-            logger.error(f"Overpass API timeout for ({lat}, {lng})")
-            return {}
-        except httpx.HTTPStatusError as e:
-            logger.error(f"Overpass API error: {e.response.status_code}")
-            return {}
-        except Exception as e:
-            logger.error(f"Error fetching POIs: {e}")
-            return {}
-
-    def _parse_overpass_response(
-        self,
-        data: Dict,
-        origin_lat: float,
-        origin_lng: float,
-        categories: Optional[List[str]],
-        limit_per_category: int,
-    ) -> Dict[str, List[Dict]]:
-        """Parse Overpass API response into structured POI data."""
-        if categories is None:
-            categories = list(POI_CATEGORIES.keys())
-        
-        result = {category: [] for category in categories}
-        
-        if "elements" not in data:
-            return result
-        
-        # Group elements by category based on their tags
-        for element in data["elements"]:
-            if element.get("type") != "node":
-                continue
-            
-            tags = element.get("tags", {})
-            lat = element.get("lat")
-            lng = element.get("lon")
-            
-            if not lat or not lng:
-                continue
-            
-            # Calculate distance from origin
-            distance = self._calculate_distance(origin_lat, origin_lng, lat, lng)
-            
-            # Determine category
-            category = self._categorize_poi(tags)
-            if not category or category not in categories:
-                continue
-            
-            # Extract name (prefer Arabic name if available, fallback to English)
-            name = (
-                tags.get("name:ar")
-                or tags.get("name")
-                or tags.get("amenity")
-                or tags.get("shop")
-                or "Unknown"
-            )
-            
-            poi = {
-                "name": name,
-                "name_en": tags.get("name"),
-                "name_ar": tags.get("name:ar"),
-                "lat": lat,
-                "lng": lng,
-                "distance": round(distance, 1),  # Distance in meters
-                "type": tags.get("amenity") or tags.get("shop") or tags.get("leisure"),
-                "address": tags.get("addr:street") or tags.get("address"),
-            }
-            
-            result[category].append(poi)
-        
-        # Sort by distance and limit results per category
-        for category in result:
-            result[category].sort(key=lambda x: x["distance"])
-            result[category] = result[category][:limit_per_category]
-        
-        return result
+                if not retryable or attempt == retries:
+                    raise
+                delay = RETRY_BACKOFF_SECONDS * 2 ** attempt
+                logger.warning(f"Overpass request failed ({e!r}), retrying in {delay:.0f}s")
+                await asyncio.sleep(delay)
 
-    def _categorize_poi(self, tags: Dict[str, str]) -> Optional[str]:
-        """Determine POI category based on OSM tags."""
-        amenity = tags.get("amenity", "").lower()
-        shop = tags.get("shop", "").lower()
-        leisure = tags.get("leisure", "").lower()
-        religion = tags.get("religion", "").lower()
-        
-        # Schools
-        if amenity in ["school", "university", "kindergarten", "college"]:
-            return "schools"
-        
-        # Mosques
-        if amenity == "place_of_worship" and religion == "muslim":
-            return "mosques"
-        
-        # Hospitals
-        if amenity in ["hospital", "clinic", "pharmacy"]:
-            return "hospitals"
-        
-        # Supermarkets
-        if shop in ["supermarket", "convenience", "grocery"]:
-            return "supermarkets"
-        
-        # Banks
-        if amenity == "bank":
-            return "banks"
-        
-        # Restaurants
-        if amenity in ["restaurant", "cafe", "fast_food"]:
-            return "restaurants"
-        
-        # Parks
-        if leisure in ["park", "playground"]:
-            return "parks"
-        
-        # Gas stations
-        if amenity == "fuel":
-            return "gas_stations"
-        
-        return None
-
-    def _calculate_distance(self, lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-        """
-        Calculate distance between two points using Haversine formula.
-        Returns distance in meters.
-        """
-        from math import radians, cos, sin, asin, sqrt
-        
-        # Convert to radians
-        lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
-        
-        # Haversine formula
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
-        a = sin(dlat / 2) ** 2 + cos(lat1) * cos(lat2) * sin(dlon / 2) ** 2
-        c = 2 * asin(sqrt(a))
-        
-        # Earth radius in meters
-        r = 6371000
-        
-        return c * r
+    def parse_overpass_response(self, data: Dict) -> List[Dict[str, Any]]:
+        """Parse an Overpass JSON response (or dump) into POI rows."""
+        pois = []
+        for element in data.get("elements", []):
+            poi = poi_from_element(element)
+            if poi:
+                pois.append(poi)
+        return pois
 
 
 # Singleton instance
 osm_service = OSMService()
-
@@ -0,0 +1,250 @@
+"""
+Batched refresh of cached nearby POIs (property_poi_links).
+
+Listings cluster in a few cities, so instead of one Overpass query per
+property the job groups stale properties into map tiles, downloads each
+tile's POIs once (bounding box of its properties plus the search radius) and
+assigns them to every property in the tile with one distance matrix. Each
+tile is written in a single transaction.
+"""
+import asyncio
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+from app.core.geo import degree_span
+from app.crud.crud_poi import crud_poi
+from app.crud.crud_property import crud_property
+from app.crud.crud_property_poi import crud_property_poi
+from app.db.session import SessionLocal
+from app.services.osm_service import osm_service
+from app.services.poi_service import assign_nearest, property_poi_links
+
+logger = logging.getLogger(__name__)
+
+# Tile size in degrees (~5.5 km); one Overpass query per tile
+TILE_DEGREES = 0.05
+
+# Where tile POIs come from
+SOURCE_OVERPASS = "overpass"  # Live Overpass query (also refreshes the local pois table)
+SOURCE_LOCAL = "local"  # The imported pois table, no network
+SOURCES = (SOURCE_OVERPASS, SOURCE_LOCAL)
+
+Tile = Tuple[int, int]
+
+
+def group_by_tile(rows: List[Any]) -> Dict[Tile, List[Any]]:
+    """Group (id, lat, lng) rows by the map tile containing them."""
+    tiles: Dict[Tile, List[Any]] = {}
+    for row in rows:
+        key = (math.floor(float(row.lat) / TILE_DEGREES), math.floor(float(row.lng) / TILE_DEGREES))
+        tiles.setdefault(key, []).append(row)
+    return tiles
+
+
+def tile_bbox(lats: np.ndarray, lngs: np.ndarray, radius: float) -> Tuple[float, float, float, float]:
+    """(south, west, north, east) around the given points, padded by `radius` meters."""
+    dlat, dlng = degree_span(float(np.abs(lats).max()), radius)
+    return (
+        round(float(lats.min()) - dlat, 6),
+        round(float(lngs.min()) - dlng, 6),
+        round(float(lats.max()) + dlat, 6),
+        round(float(lngs.max()) + dlng, 6),
+    )
+
+
+class POIRefreshService:
+    """Runs one refresh at a time and keeps its progress for the admin UI."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.status: Dict[str, Any] = {"state": "idle"}
+    
+    def is_running(self) -> bool:
+        return self._lock.locked()
+    
+    def run(
+        self,
+        max_age_days: int = 30,
+        source: str = SOURCE_OVERPASS,
+        concurrency: int = 2,
+        radius: int = 1000,
+        limit_per_category: int = 10,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Recompute nearby POIs for properties not refreshed in `max_age_days`.
+        
+        Args:
+            max_age_days: Refresh properties older than this (0 = all)
+            source: SOURCE_OVERPASS or SOURCE_LOCAL
+            concurrency: Tiles processed (Overpass requests in flight) at once
+            radius: Search radius in meters
+            limit_per_category: Max POIs kept per category and property
+            progress: Called with the timing entry of each finished tile
+        
+        Returns:
+            Dictionary with tile/property counts, failures and duration
+        """
+        if source not in SOURCES:
+            raise ValueError(f"Unknown POI source: {source}")
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("A POI refresh is already running")
+        
+        try:
+            return asyncio.run(
+                self._run(max_age_days, source, concurrency, radius, limit_per_category, progress)
+            )
+        except Exception as e:
+            logger.error(f"POI refresh failed: {e}")
+            self.status["state"] = "failed"
+            self.status["error"] = str(e)
+            self.status["finished_at"] = datetime.utcnow().isoformat()
+            raise
+        finally:
+            self._lock.release()
+    
+    async def _run(
+        self,
+        max_age_days: int,
+        source: str,
+        concurrency: int,
+        radius: int,
+        limit_per_category: int,
+        progress: Optional[Callable[[Dict[str, Any]], None]],
+    ) -> Dict[str, Any]:
+        started = time.perf_counter()
+        
+        db = SessionLocal()
+        try:
+            stale = crud_property.get_stale_poi_coordinates(
+                db, before=datetime.utcnow() - timedelta(days=max_age_days)
+            )
+        finally:
+            db.close()
+        
+        tiles = group_by_tile(stale)
+        self.status = {
+            "state": "running",
+            "source": source,
+            "started_at": datetime.utcnow().isoformat(),
+            "tiles_total": len(tiles),
+            "tiles_done": 0,
+            "tiles_failed": 0,
+            "properties_total": len(stale),
+            "properties_done": 0,
+            "tiles": [],
+        }
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async with osm_service.client(max_connections=concurrency) as client:
+            async def process(tile: Tile, rows: List[Any]) -> Dict[str, Any]:
+                async with semaphore:
+                    return await self._refresh_tile(client, tile, rows, source, radius, limit_per_category)
+            
+            for future in asyncio.as_completed([process(tile, rows) for tile, rows in tiles.items()]):
+                timing = await future
+                if timing.get("error"):
+                    self.status["tiles_failed"] += 1
+                else:
+                    self.status["tiles_done"] += 1
+                    self.status["properties_done"] += timing["properties"]
+                self.status["tiles"].append(timing)
+                if progress:
+                    progress(timing)
+        
+        seconds = time.perf_counter() - started
+        result = {
+            "tiles": len(tiles),
+            "tiles_failed": self.status["tiles_failed"],
+            "properties": self.status["properties_done"],
+            "seconds": round(seconds, 2),
+        }
+        self.status.update(result)
+        self.status["state"] = "succeeded"
+        self.status["finished_at"] = datetime.utcnow().isoformat()
+        return result
+    
+    async def _refresh_tile(
+        self,
+        client: httpx.AsyncClient,
+        tile: Tile,
+        rows: List[Any],
+        source: str,
+        radius: int,
+        limit_per_category: int,
+    ) -> Dict[str, Any]:
+        """Fetch, assign and store POIs for one tile; returns its timing entry."""
+        timing: Dict[str, Any] = {"tile": f"{tile[0]}:{tile[1]}", "properties": len(rows)}
+        started = time.perf_counter()
+        
+        lats = np.array([float(row.lat) for row in rows], dtype=np.float64)
+        lngs = np.array([float(row.lng) for row in rows], dtype=np.float64)
+        bbox = tile_bbox(lats, lngs, radius)
+        
+        try:
+            pois = None
+            if source == SOURCE_OVERPASS:
+                pois = await osm_service.fetch_pois(bbox, client=client)
+            timing["fetch_seconds"] = round(time.perf_counter() - started, 3)
+            
+            timing.update(await asyncio.to_thread(
+                self._assign_and_store, rows, lats, lngs, bbox, pois, radius, limit_per_category
+            ))
+        except Exception as e:
+            logger.error(f"POI refresh failed for tile {timing['tile']}: {e}")
+            timing["error"] = str(e)
+        
+        timing["seconds"] = round(time.perf_counter() - started, 3)
+        return timing
+    
+    def _assign_and_store(
+        self,
+        rows: List[Any],
+        lats: np.ndarray,
+        lngs: np.ndarray,
+        bbox: Tuple[float, float, float, float],
+        pois: Optional[List[Dict[str, Any]]],
+        radius: int,
+        limit_per_category: int,
+    ) -> Dict[str, Any]:
+        db = SessionLocal()
+        try:
+            if pois is None:
+                pois = crud_poi.get_in_bbox(db, bbox=bbox)
+            else:
+                # Keep the local store (used for single-property lookups) current
+                crud_poi.upsert_bulk(db, pois=list({poi["id"]: poi for poi in pois}.values()))
+            
+            started = time.perf_counter()
+            assigned = assign_nearest(lats, lngs, pois, radius, limit_per_category)
+            links = []
+            scores = {}
+            for row, (pois_data, row_scores) in zip(rows, assigned):
+                links.extend(property_poi_links(row.id, pois_data))
+                scores[row.id] = row_scores
+            assign_seconds = time.perf_counter() - started
+            
+            started = time.perf_counter()
+            crud_property_poi.replace_for_properties(
+                db, property_ids=[row.id for row in rows], links=links, scores=scores
+            )
+            return {
+                "pois": len(pois),
+                "links": len(links),
+                "assign_seconds": round(assign_seconds, 3),
+                "write_seconds": round(time.perf_counter() - started, 3),
+            }
+        finally:
+            db.close()
+
+
+# Singleton instance
+poi_refresh_service = POIRefreshService()
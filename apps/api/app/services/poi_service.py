@@ -0,0 +1,293 @@
+"""
+Nearby POI lookups against the local POI table.
+
+The imported POIs are held in memory per category, sorted by grid cell, so a
+lookup only computes distances for points in the few cells around the
+property - with NumPy, in well under a millisecond for the Palestine extract.
+"""
+import logging
+import math
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.geo import degree_span, haversine_m, haversine_matrix
+from app.core.scores import (
+    SCORE_CATEGORIES,
+    SCORE_RADIUS_M,
+    WALKABILITY_FIELD,
+    category_scores,
+    empty_scores,
+    walkability_score,
+)
+from app.crud.crud_poi import crud_poi
+from app.services.osm_service import POI_CATEGORIES
+
+logger = logging.getLogger(__name__)
+
+# Grid cell size in degrees (~1.1 km of latitude)
+CELL_DEGREES = 0.01
+
+# Cell key = lat_cell * CELL_KEY_STRIDE + lng_cell. Longitude cells span at
+# most +/-18000, so each latitude row is one contiguous range of keys.
+CELL_KEY_STRIDE = 100_000
+
+# How often to check the POI table for a new import
+REFRESH_CHECK_SECONDS = 60
+
+
+def _cells(values: np.ndarray) -> np.ndarray:
+    return np.floor(values / CELL_DEGREES).astype(np.int64)
+
+
+def _poi_result(poi: Any, distance: float) -> Dict[str, Any]:
+    get = poi.get if isinstance(poi, dict) else lambda key: getattr(poi, key)
+    return {
+        "id": get("id"),
+        "name": get("name"),
+        "name_en": get("name_en"),
+        "name_ar": get("name_ar"),
+        "lat": get("lat"),
+        "lng": get("lng"),
+        "distance": round(float(distance), 1),  # Distance in meters
+        "type": get("poi_type"),
+        "address": get("address"),
+    }
+
+
+def assign_nearest(
+    lats: np.ndarray,
+    lngs: np.ndarray,
+    pois: List[Dict[str, Any]],
+    radius: float = 1000,
+    limit_per_category: int = 10,
+) -> List[Tuple[Dict[str, List[Dict]], Dict[str, Any]]]:
+    """
+    Nearest POIs and neighborhood scores for many properties at once.
+    
+    Computes one properties x POIs distance matrix per category, so a whole
+    map tile is assigned in a few NumPy operations. `pois` must cover
+    SCORE_RADIUS_M around every property for the scores to be complete.
+    
+    Args:
+        lats, lngs: Property coordinates
+        pois: POI rows (dicts with category, lat, lng, name, ...)
+        radius: Search radius in meters
+        limit_per_category: Max number of results per category
+    
+    Returns:
+        One (get_nearby_pois()-style dict, score columns) pair per property,
+        in input order
+    """
+    results: List[Dict[str, List[Dict]]] = [
+        {category: [] for category in POI_CATEGORIES} for _ in range(len(lats))
+    ]
+    scores = [empty_scores() for _ in range(len(lats))]
+    
+    by_category: Dict[str, List[Dict[str, Any]]] = {}
+    for poi in pois:
+        by_category.setdefault(poi["category"], []).append(poi)
+    
+    for category, category_pois in by_category.items():
+        if category not in POI_CATEGORIES:
+            continue
+        distances = haversine_matrix(
+            lats,
+            lngs,
+            np.array([poi["lat"] for poi in category_pois], dtype=np.float64),
+            np.array([poi["lng"] for poi in category_pois], dtype=np.float64),
+        )
+        if category in SCORE_CATEGORIES:
+            for row_scores, category_row in zip(scores, category_scores(category, distances)):
+                row_scores.update(category_row)
+        distances[distances > radius] = np.inf
+        
+        # Closest `limit` columns per row, then order just those
+        limit = min(limit_per_category, distances.shape[1])
+        nearest = np.argpartition(distances, limit - 1, axis=1)[:, :limit]
+        nearest_distances = np.take_along_axis(distances, nearest, axis=1)
+        order = np.argsort(nearest_distances, axis=1, kind="stable")
+        nearest = np.take_along_axis(nearest, order, axis=1)
+        nearest_distances = np.take_along_axis(nearest_distances, order, axis=1)
+        
+        for i in range(len(lats)):
+            results[i][category] = [
+                _poi_result(category_pois[j], distance)
+                for j, distance in zip(nearest[i], nearest_distances[i])
+                if np.isfinite(distance)
+            ]
+    
+    for row_scores in scores:
+        row_scores[WALKABILITY_FIELD] = walkability_score(row_scores)
+    return list(zip(results, scores))
+
+
+def property_poi_links(property_id: Any, pois_data: Dict[str, List[Dict]]) -> List[Dict[str, Any]]:
+    """property_poi_links rows for one property from a get_nearby_pois()-style dict."""
+    links = []
+    for pois_list in pois_data.values():
+        for rank, poi in enumerate(pois_list):
+            links.append({
+                "property_id": property_id,
+                "poi_id": poi["id"],
+                "distance": poi["distance"],
+                "rank": rank,
+            })
+    return links
+
+
+class _CategoryGrid:
+    """POIs of one category, sorted by grid cell key."""
+    
+    def __init__(self, category: str, rows: List[Any]):
+        self.category = category
+        lats = np.array([row.lat for row in rows], dtype=np.float64)
+        lngs = np.array([row.lng for row in rows], dtype=np.float64)
+        keys = _cells(lats) * CELL_KEY_STRIDE + _cells(lngs)
+        order = np.argsort(keys, kind="stable")
+        
+        self.keys = keys[order]
+        self.lats = lats[order]
+        self.lngs = lngs[order]
+        self.rows = [rows[i] for i in order]
+    
+    def candidates(self, lat: float, lng: float, radius: float) -> np.ndarray:
+        """Indices of POIs in the grid cells overlapping the search radius."""
+        dlat, dlng = degree_span(lat, radius)
+        lng_low = math.floor((lng - dlng) / CELL_DEGREES)
+        lng_high = math.floor((lng + dlng) / CELL_DEGREES)
+        
+        slices = []
+        for lat_cell in range(math.floor((lat - dlat) / CELL_DEGREES), math.floor((lat + dlat) / CELL_DEGREES) + 1):
+            row_key = lat_cell * CELL_KEY_STRIDE
+            start = np.searchsorted(self.keys, row_key + lng_low, side="left")
+            end = np.searchsorted(self.keys, row_key + lng_high, side="right")
+            if end > start:
+                slices.append(np.arange(start, end))
+        
+        if not slices:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(slices)
+    
+    def nearest(self, lat: float, lng: float, radius: float, limit: int) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Up to `limit` POIs within `radius` meters (closest first), and the
+        category's score columns.
+        """
+        candidates = self.candidates(lat, lng, max(radius, SCORE_RADIUS_M))
+        distances = haversine_m(lat, lng, self.lats[candidates], self.lngs[candidates])
+        scores = category_scores(self.category, distances[None, :])[0]
+        
+        within = np.flatnonzero(distances <= radius)
+        if within.size > limit:
+            within = within[np.argpartition(distances[within], limit - 1)[:limit]]
+        within = within[np.argsort(distances[within], kind="stable")]
+        
+        return [_poi_result(self.rows[candidates[i]], distances[i]) for i in within], scores
+
+
+class POIService:
+    """
+    In-memory spatial index over the POI table.
+    
+    Built lazily on first use and rebuilt when the table changes (checked at
+    most every REFRESH_CHECK_SECONDS), so each API worker picks up a new
+    import without a restart.
+    """
+    
+    def __init__(self):
+        self._grids: Dict[str, _CategoryGrid] = {}
+        self._version = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+    
+    def _refresh(self, db: Session):
+        if time.monotonic() - self._checked_at < REFRESH_CHECK_SECONDS and self._version is not None:
+            return
+        
+        with self._lock:
+            if time.monotonic() - self._checked_at < REFRESH_CHECK_SECONDS and self._version is not None:
+                return
+            
+            version = crud_poi.get_version(db)
+            if version != self._version:
+                started = time.perf_counter()
+                by_category: Dict[str, List[Any]] = {}
+                for row in crud_poi.get_all_rows(db):
+                    by_category.setdefault(row.category, []).append(row)
+                self._grids = {
+                    category: _CategoryGrid(category, rows) for category, rows in by_category.items()
+                }
+                self._version = version
+                logger.info(
+                    f"Loaded {version[0]} POIs into the spatial index "
+                    f"in {time.perf_counter() - started:.2f}s"
+                )
+            self._checked_at = time.monotonic()
+    
+    def get_nearby(
+        self,
+        db: Session,
+        lat: float,
+        lng: float,
+        radius: int = 1000,
+        limit_per_category: int = 10,
+    ) -> Tuple[Dict[str, List[Dict]], Dict[str, Any]]:
+        """
+        Nearby POIs of every category plus the neighborhood score columns.
+        
+        Returns:
+            Tuple of (get_nearby_pois()-style dict, score columns)
+        """
+        self._refresh(db)
+        
+        result = {}
+        scores = empty_scores()
+        for category in POI_CATEGORIES:
+            grid = self._grids.get(category)
+            if grid is None:
+                result[category] = []
+                continue
+            result[category], category_row = grid.nearest(lat, lng, radius, limit_per_category)
+            if category in SCORE_CATEGORIES:
+                scores.update(category_row)
+        scores[WALKABILITY_FIELD] = walkability_score(scores)
+        return result, scores
+    
+    def get_nearby_pois(
+        self,
+        db: Session,
+        lat: float,
+        lng: float,
+        radius: int = 1000,
+        categories: Optional[List[str]] = None,
+        limit_per_category: int = 10,
+    ) -> Dict[str, List[Dict]]:
+        """
+        Get nearby Points of Interest from the local POI table.
+        
+        Args:
+            db: Database session (used to load the index)
+            lat: Latitude
+            lng: Longitude
+            radius: Search radius in meters (default: 1000m = 1km)
+            categories: List of category keys (None = all)
+            limit_per_category: Max number of results per category
+        
+        Returns:
+            Dictionary with category keys and lists of POI objects, closest first
+        """
+        if not lat or not lng:
+            return {}
+        
+        result, _ = self.get_nearby(db, lat, lng, radius, limit_per_category)
+        if categories is None:
+            return result
+        return {category: result.get(category, []) for category in categories}
+
+
+# Singleton instance
+poi_service = POIService()
@@ -0,0 +1,150 @@
+"""
+Full search reindex: stream every property from Postgres into a fresh
+Meilisearch index and swap it in once complete.
+
+The outbox relay keeps writing to the live index meanwhile, and those writes
+are discarded by the swap. A catch-up pass then re-pushes everything that
+changed since the reindex started.
+"""
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Set
+from uuid import UUID
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.crud.crud_property import crud_property
+from app.db.models.property import Property
+from app.db.models.search_outbox import SearchOutbox
+from app.db.outbox import LOCATION_ENTITY, PROPERTY_ENTITY
+from app.db.session import SessionLocal
+from app.services.meilisearch_service import meilisearch_service, property_index_data
+
+logger = logging.getLogger(__name__)
+
+# Changes stamped this long before the snapshot may have committed after it
+# (timestamps are set at flush, not commit); re-pushing a row twice is harmless
+CATCH_UP_OVERLAP = timedelta(seconds=60)
+
+
+class ReindexService:
+    """Runs one full reindex at a time and keeps its progress for the admin UI."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.status: Dict[str, Any] = {"state": "idle"}
+    
+    def is_running(self) -> bool:
+        return self._lock.locked()
+    
+    def run(
+        self,
+        batch_size: int = 1000,
+        concurrency: int = 4,
+        progress: Optional[Callable[[int, int, float], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Reindex all properties.
+        
+        Args:
+            batch_size: Rows per database fetch and per Meilisearch batch
+            concurrency: Batches uploaded in parallel
+            progress: Called with (documents uploaded, total, seconds elapsed)
+        
+        Returns:
+            Dictionary with indexed count, duration and throughput
+        """
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("A reindex is already running")
+        
+        db = SessionLocal()
+        try:
+            since = datetime.utcnow() - CATCH_UP_OVERLAP
+            # Every property, published or not, goes into the index
+            total = db.query(func.count(Property.id)).scalar()
+            self.status = {
+                "state": "running",
+                "started_at": datetime.utcnow().isoformat(),
+                "indexed": 0,
+                "total": total,
+            }
+            
+            def on_progress(indexed: int, elapsed: float):
+                self.status["indexed"] = indexed
+                self.status["docs_per_second"] = round(indexed / elapsed, 1) if elapsed else None
+                if progress:
+                    progress(indexed, total, elapsed)
+            
+            uploaded_ids: Set[str] = set()
+            
+            def documents():
+                for row in crud_property.iter_index_rows(db, chunk_size=batch_size):
+                    data = property_index_data(row)
+                    uploaded_ids.add(data["id"])
+                    yield data
+            
+            result = meilisearch_service.reindex(
+                documents(),
+                batch_size=batch_size,
+                concurrency=concurrency,
+                progress=on_progress,
+            )
+            try:
+                result["caught_up"] = self._catch_up(db, since=since, uploaded_ids=uploaded_ids, batch_size=batch_size)
+            except Exception as e:
+                raise RuntimeError(f"New index is live, but the catch-up of changes made during the reindex failed: {e}") from e
+            
+            self.status.update(result)
+            self.status["state"] = "succeeded"
+            self.status["finished_at"] = datetime.utcnow().isoformat()
+            return result
+        except Exception as e:
+            logger.error(f"Reindex failed: {e}")
+            self.status["state"] = "failed"
+            self.status["error"] = str(e)
+            self.status["finished_at"] = datetime.utcnow().isoformat()
+            raise
+        finally:
+            db.close()
+            self._lock.release()
+    
+    def _catch_up(self, db: Session, *, since: datetime, uploaded_ids: Set[str], batch_size: int) -> int:
+        """
+        Re-push the properties changed since `since` to the swapped-in index.
+        
+        Changes are found by timestamp (see CRUDProperty.get_ids_changed_since)
+        and in the outbox rows not consumed yet. Uploaded documents whose
+        property no longer exists are deleted.
+        
+        Returns:
+            Number of documents upserted or deleted
+        """
+        changed = {str(property_id) for property_id in crud_property.get_ids_changed_since(db, since=since)}
+        
+        pending = db.query(SearchOutbox.entity_type, SearchOutbox.entity_id).filter(SearchOutbox.created_at >= since).all()
+        changed.update(str(row.entity_id) for row in pending if row.entity_type == PROPERTY_ENTITY)
+        location_ids = [row.entity_id for row in pending if row.entity_type == LOCATION_ENTITY]
+        if location_ids:
+            changed.update(str(property_id) for property_id in crud_property.get_ids_by_location(db, location_ids=location_ids))
+        
+        existing = {str(property_id) for property_id in crud_property.get_all_ids(db)}
+        delete_ids = sorted((uploaded_ids | changed) - existing)
+        changed = sorted(changed & existing)
+        
+        for start in range(0, len(changed), batch_size):
+            upserts = [
+                property_index_data(row)
+                for row in crud_property.iter_index_rows(db, ids=[UUID(i) for i in changed[start:start + batch_size]])
+            ]
+            meilisearch_service.apply_changes(upserts, [])
+        if delete_ids:
+            meilisearch_service.apply_changes([], delete_ids)
+        
+        logger.info(f"Reindex catch-up: {len(changed)} upserted, {len(delete_ids)} deleted")
+        return len(changed) + len(delete_ids)
+
+
+# Singleton instance
+reindex_service = ReindexService()
@@ -0,0 +1,285 @@
+"""
+Buffered search tracking.
+
+The track endpoint only appends the event to a Redis stream; the flusher
+(run by the worker) drains the stream into search_analytics with one
+multi-row INSERT per batch, every SEARCH_ANALYTICS_FLUSH_BATCH_SIZE events
+or SEARCH_ANALYTICS_FLUSH_SECONDS, whichever comes first.
+
+Entries are read through a consumer group and acknowledged only after the
+insert commits, so events survive a flusher crash; several flushers can run
+at once. A batch the database rejects is retried row by row, and the rows
+that still fail go to a dead-letter stream, so one bad event cannot stall
+ingestion.
+"""
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import redis
+import redis.asyncio as aioredis
+from sqlalchemy.exc import DataError, IntegrityError
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.text import normalize_query
+from app.crud.crud_search_analytics import crud_search_analytics
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+STREAM_KEY = "analytics:search"
+CONSUMER_GROUP = "flushers"
+
+# Events the database rejected, with the error, for inspection
+DEAD_LETTER_KEY = "analytics:search:dead"
+DEAD_LETTER_MAXLEN = 10_000
+
+# Pending entries idle this long belong to a flusher that died; take them over
+CLAIM_IDLE_MS = 60_000
+
+try:
+    # The endpoint appends on the event loop; a slow Redis drops the event
+    # rather than holding the request
+    track_redis_client = aioredis.from_url(
+        settings.REDIS_URL,
+        decode_responses=True,
+        socket_connect_timeout=0.5,
+        socket_timeout=0.5,
+    )
+except Exception:
+    track_redis_client = None
+
+search_track_dropped_counter = metrics.counter(
+    "search_track_dropped_total",
+    "Tracked searches dropped because the Redis buffer was unavailable",
+)
+search_track_dead_letter_counter = metrics.counter(
+    "search_track_dead_lettered_total",
+    "Tracked searches moved to the dead-letter stream because they could not be stored",
+)
+
+Entry = Tuple[str, Dict[str, str]]
+
+
+def filters_fingerprint(filters: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Filter combination of a search: sorted names of the filters with a value, e.g. "bedrooms+purpose"."""
+    if not isinstance(filters, dict):
+        return None
+    used = sorted(key for key, value in filters.items() if value not in (None, "", [], {}))
+    return "+".join(used)[:255] or None
+
+
+def _strip_nul(value: Any) -> Any:
+    """Remove NUL characters, which Postgres text and JSONB values cannot hold."""
+    if isinstance(value, str):
+        return value.replace("\x00", "")
+    if isinstance(value, dict):
+        return {_strip_nul(key): _strip_nul(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_strip_nul(item) for item in value]
+    return value
+
+
+def _event_row(fields: Dict[str, str]) -> Dict[str, Any]:
+    """search_analytics row from a stream entry."""
+    fields = _strip_nul(fields)  # Entries buffered before track_search stripped them
+    filters = _strip_nul(json.loads(fields["filters"])) if fields.get("filters") else None
+    return {
+        "id": uuid.UUID(fields["id"]),
+        "query": fields.get("query"),
+        "query_normalized": normalize_query(fields.get("query")),
+        "filters": filters,
+        "filters_key": filters_fingerprint(filters),
+        "result_count": int(fields["result_count"]) if fields.get("result_count") else None,
+        "ip_address": fields.get("ip_address"),
+        "user_agent": fields.get("user_agent"),
+        "created_at": datetime.utcfromtimestamp(float(fields["created_at"])),
+    }
+
+
+async def track_search(
+    query: Optional[str],
+    filters: Optional[Dict[str, Any]],
+    result_count: Optional[int],
+    ip_address: Optional[str],
+    user_agent: Optional[str],
+) -> Optional[str]:
+    """
+    Buffer one tracked search.
+    
+    Returns:
+        The event id, or None if the event was dropped
+    """
+    query, filters, ip_address, user_agent = _strip_nul([query, filters, ip_address, user_agent])
+    event_id = str(uuid.uuid4())
+    fields = {"id": event_id, "created_at": repr(time.time())}
+    if query:
+        fields["query"] = query[:500]
+    if filters:
+        fields["filters"] = json.dumps(filters)
+    if result_count is not None:
+        fields["result_count"] = str(result_count)
+    if ip_address:
+        fields["ip_address"] = ip_address[:45]
+    if user_agent:
+        fields["user_agent"] = user_agent[:500]
+    
+    try:
+        # Approximate trimming is O(1); it only bites if no flusher runs for a long time
+        await track_redis_client.xadd(
+            STREAM_KEY, fields, maxlen=settings.SEARCH_ANALYTICS_STREAM_MAXLEN, approximate=True
+        )
+    except Exception as e:
+        search_track_dropped_counter.inc()
+        logger.warning(f"Dropped tracked search: {e}")
+        return None
+    return event_id
+
+
+class SearchAnalyticsFlusher:
+    """Drains the tracking stream into Postgres in batches."""
+    
+    def __init__(self, batch_size: int = 1000, flush_seconds: float = 2.0):
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.consumer = f"{socket.gethostname()}-{os.getpid()}"
+        self.client = redis.from_url(
+            settings.REDIS_URL,
+            decode_responses=True,
+            socket_connect_timeout=2,
+            socket_timeout=flush_seconds + 5,  # Outlasts the blocking reads
+        )
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def _ensure_group(self):
+        try:
+            self.client.xgroup_create(STREAM_KEY, CONSUMER_GROUP, id="0", mkstream=True)
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+    
+    def _read_batch(self) -> List[Entry]:
+        """Up to batch_size new entries, waiting at most flush_seconds to fill the batch."""
+        entries: List[Entry] = []
+        
+        # Entries left pending by a flusher that stopped
+        _, claimed, *_ = self.client.xautoclaim(
+            STREAM_KEY, CONSUMER_GROUP, self.consumer, CLAIM_IDLE_MS, count=self.batch_size
+        )
+        entries.extend(entry for entry in claimed if entry[1])
+        
+        deadline = time.monotonic() + self.flush_seconds
+        while len(entries) < self.batch_size and not self._stop.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            response = self.client.xreadgroup(
+                CONSUMER_GROUP,
+                self.consumer,
+                {STREAM_KEY: ">"},
+                count=self.batch_size - len(entries),
+                block=max(1, int(remaining * 1000)),
+            )
+            for _, stream_entries in response or []:
+                entries.extend(stream_entries)
+        return entries
+    
+    def flush(self, entries: List[Entry]) -> int:
+        """
+        Insert a batch and acknowledge it.
+        
+        If the database rejects the batch (DataError or IntegrityError), the
+        rows are retried one by one and the ones that still fail are
+        dead-lettered. Any other error propagates and the batch is retried
+        whole; rows already stored are skipped by id.
+        
+        Returns:
+            Number of rows written
+        """
+        rows = []
+        rejected: List[Tuple[Dict[str, str], str]] = []
+        for _, fields in entries:
+            try:
+                rows.append((fields, _event_row(fields)))
+            except (KeyError, ValueError) as e:
+                rejected.append((fields, f"malformed: {e}"))
+        
+        db = SessionLocal()
+        try:
+            try:
+                written = crud_search_analytics.insert_bulk(db, rows=[row for _, row in rows])
+            except (DataError, IntegrityError) as e:
+                db.rollback()
+                logger.warning(f"Tracked search batch rejected, retrying row by row: {e}")
+                written = 0
+                for fields, row in rows:
+                    try:
+                        written += crud_search_analytics.insert_bulk(db, rows=[row])
+                    except (DataError, IntegrityError) as row_error:
+                        db.rollback()
+                        rejected.append((fields, str(row_error)))
+        finally:
+            db.close()
+        
+        ids = [entry_id for entry_id, _ in entries]
+        pipe = self.client.pipeline(transaction=False)
+        for fields, error in rejected:
+            pipe.xadd(DEAD_LETTER_KEY, {**fields, "error": error[:1000]}, maxlen=DEAD_LETTER_MAXLEN, approximate=True)
+        pipe.xack(STREAM_KEY, CONSUMER_GROUP, *ids)
+        pipe.xdel(STREAM_KEY, *ids)
+        pipe.execute()
+        
+        if rejected:
+            search_track_dead_letter_counter.inc(len(rejected))
+            logger.warning(f"Dead-lettered {len(rejected)} tracked searches to {DEAD_LETTER_KEY}")
+        return written
+    
+    def run(self):
+        """Flush until stop() is called."""
+        entries: List[Entry] = []
+        group_ready = False
+        while not self._stop.is_set():
+            try:
+                if not group_ready:
+                    self._ensure_group()
+                    group_ready = True
+                # A batch that failed to insert is retried before reading more
+                if not entries:
+                    entries = self._read_batch()
+                if entries:
+                    started = time.perf_counter()
+                    written = self.flush(entries)
+                    logger.debug(f"Flushed {written} tracked searches in {time.perf_counter() - started:.3f}s")
+                    entries = []
+            except Exception as e:
+                logger.error(f"Search analytics flush failed, will retry: {e}")
+                group_ready = False  # The stream may have been deleted
+                self._stop.wait(self.flush_seconds)
+    
+    def start(self):
+        """Start the flusher in a background thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, name="search-analytics-flush", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.flush_seconds + 5)
+
+
+# Singleton instance
+search_analytics_flusher = SearchAnalyticsFlusher(
+    batch_size=settings.SEARCH_ANALYTICS_FLUSH_BATCH_SIZE,
+    flush_seconds=settings.SEARCH_ANALYTICS_FLUSH_SECONDS,
+)
@@ -0,0 +1,143 @@
+"""
+Relay from the search_outbox table to Meilisearch.
+
+Outbox rows only name the entity that changed; the relay reads its current
+state when it runs, so any number of edits to a property collapse into one
+upsert (or delete, if the property is gone).
+"""
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.crud_property import crud_property
+from app.db.models.search_outbox import SearchOutbox
+from app.db.outbox import LOCATION_ENTITY, PROPERTY_ENTITY
+from app.db.session import SessionLocal
+from app.services.meilisearch_service import meilisearch_service, property_index_data
+
+logger = logging.getLogger(__name__)
+
+
+class SearchSyncService:
+    """Debounced, batched outbox relay. Safe to run in several processes."""
+    
+    def __init__(
+        self,
+        debounce_seconds: float = 2.0,
+        batch_size: int = 500,
+        poll_interval: float = 1.0,
+    ):
+        self.debounce_seconds = debounce_seconds
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def process_batch(self, db: Session) -> int:
+        """
+        Push one batch of outbox entries to the index.
+        
+        Rows older than the debounce window are claimed with
+        FOR UPDATE SKIP LOCKED (so concurrent relays split the work), together
+        with any newer rows for the same entities. The claimed rows are only
+        deleted once Meilisearch has applied the batch; on failure they stay
+        queued for the next attempt.
+        
+        Returns:
+            Number of outbox rows consumed
+        """
+        due_before = datetime.utcnow() - timedelta(seconds=self.debounce_seconds)
+        rows = (
+            db.query(SearchOutbox)
+            .filter(SearchOutbox.created_at <= due_before)
+            .order_by(SearchOutbox.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        if not rows:
+            db.rollback()
+            return 0
+        
+        # Coalesce: later rows for the same entities are covered by this push
+        entity_ids = {row.entity_id for row in rows}
+        rows += (
+            db.query(SearchOutbox)
+            .filter(
+                SearchOutbox.entity_id.in_(entity_ids),
+                SearchOutbox.id.notin_([row.id for row in rows]),
+            )
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        
+        property_ids = {row.entity_id for row in rows if row.entity_type == PROPERTY_ENTITY}
+        location_ids = {row.entity_id for row in rows if row.entity_type == LOCATION_ENTITY}
+        if location_ids:
+            # Documents embed location names and slugs
+            property_ids.update(crud_property.get_ids_by_location(db, location_ids=list(location_ids)))
+        
+        upserts = []
+        if property_ids:
+            upserts = [
+                property_index_data(row)
+                for row in crud_property.iter_index_rows(db, ids=list(property_ids))
+            ]
+        found = {data["id"] for data in upserts}
+        delete_ids = [str(pid) for pid in property_ids if str(pid) not in found]
+        
+        try:
+            meilisearch_service.apply_changes(upserts, delete_ids)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Search sync failed, will retry: {e}")
+            return 0
+        
+        db.query(SearchOutbox).filter(
+            SearchOutbox.id.in_([row.id for row in rows])
+        ).delete(synchronize_session=False)
+        db.commit()
+        
+        logger.debug(f"Search sync: {len(upserts)} upserted, {len(delete_ids)} deleted")
+        return len(rows)
+    
+    def run(self):
+        """Relay until stop() is called."""
+        while not self._stop.is_set():
+            db = SessionLocal()
+            try:
+                consumed = self.process_batch(db)
+            except Exception as e:
+                logger.error(f"Search sync error: {e}")
+                consumed = 0
+            finally:
+                db.close()
+            
+            # Keep draining while there is a backlog
+            if consumed < self.batch_size:
+                self._stop.wait(self.poll_interval)
+    
+    def start(self):
+        """Start the relay in a background thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, name="search-sync", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+
+# Singleton instance
+search_sync_service = SearchSyncService(
+    debounce_seconds=settings.SEARCH_SYNC_DEBOUNCE_SECONDS,
+    batch_size=settings.SEARCH_SYNC_BATCH_SIZE,
+    poll_interval=settings.SEARCH_SYNC_POLL_SECONDS,
+)
@@ -0,0 +1,182 @@
+"""
+Background job handlers, run by the worker process (python -m app.worker).
+
+API routes call the enqueue_* helpers; everything slow or retryable happens
+here instead of in the API workers.
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from app.core.cache import response_cache, property_tag
+from app.core.config import settings
+from app.core.jobs import job_queue
+from app.crud.crud_property import crud_property
+from app.crud.crud_property_poi import crud_property_poi
+from app.crud.crud_search_analytics import crud_search_analytics
+from app.db import partitions
+from app.db.session import SessionLocal
+from app.services.poi_refresh_service import poi_refresh_service
+from app.services.poi_service import poi_service, property_poi_links
+from app.services.reindex_service import reindex_service
+
+logger = logging.getLogger(__name__)
+
+PROPERTY_POIS_JOB = "pois.refresh_property"
+POI_REFRESH_JOB = "pois.refresh_stale"
+SEARCH_REINDEX_JOB = "search.reindex"
+SEARCH_ROLLUP_JOB = "analytics.rollup_searches"
+PARTITIONS_JOB = "maintenance.partitions"
+
+
+@job_queue.job(PROPERTY_POIS_JOB, queue="pois", max_attempts=5, timeout=120)
+def refresh_property_pois(property_id: str) -> Dict[str, Any]:
+    """Compute nearby POIs and neighborhood scores for one property from the local POI table."""
+    db = SessionLocal()
+    try:
+        prop = crud_property.get(db, id=property_id)
+        if not prop or prop.lat is None or prop.lng is None:
+            return {"links": 0}
+        
+        # Read the coordinates now rather than at enqueue time, so a job
+        # deduplicated across several edits still uses the latest ones
+        pois_data, scores = poi_service.get_nearby(
+            db,
+            lat=float(prop.lat),
+            lng=float(prop.lng),
+            radius=1000,  # 1km radius
+            limit_per_category=10,
+        )
+        
+        property_uuid = UUID(property_id)
+        written = crud_property_poi.replace_for_properties(
+            db,
+            property_ids=[property_uuid],
+            links=property_poi_links(property_uuid, pois_data),
+            scores={property_uuid: scores},
+        )
+    finally:
+        db.close()
+    
+    # Listing cards show the walkability score
+    response_cache.invalidate([property_tag(property_id)])
+    return {"links": written}
+
+
+def enqueue_property_pois(property_id: Any) -> Optional[str]:
+    """
+    Queue a nearby-POI refresh for a property (one pending job per property).
+    
+    Never raises: if Redis is down the property keeps a NULL pois_updated_at
+    and the periodic stale refresh picks it up.
+    """
+    try:
+        return job_queue.enqueue(
+            PROPERTY_POIS_JOB,
+            {"property_id": str(property_id)},
+            dedup_key=f"{PROPERTY_POIS_JOB}:{property_id}",
+        )
+    except Exception as e:
+        logger.error(f"Could not queue POI refresh for property {property_id}: {e}")
+        return None
+
+
+@job_queue.job(
+    POI_REFRESH_JOB,
+    queue="pois",
+    max_attempts=1,
+    timeout=6 * 3600,
+    every=settings.POI_REFRESH_INTERVAL_HOURS * 3600 or None,
+)
+def refresh_stale_pois(
+    max_age_days: int = settings.POI_REFRESH_MAX_AGE_DAYS,
+    source: str = settings.POI_REFRESH_SOURCE,
+    concurrency: int = settings.POI_REFRESH_CONCURRENCY,
+) -> Dict[str, Any]:
+    """Batched refresh of properties whose POIs are older than `max_age_days`."""
+    return poi_refresh_service.run(
+        max_age_days=max_age_days,
+        source=source,
+        concurrency=concurrency,
+        progress=lambda timing: job_queue.report_progress(_refresh_progress()),
+    )
+
+
+def _refresh_progress() -> Dict[str, Any]:
+    # Per-tile timings stay in the job result; progress only needs the counters
+    return {key: value for key, value in poi_refresh_service.status.items() if key != "tiles"}
+
+
+@job_queue.job(SEARCH_REINDEX_JOB, queue="search", max_attempts=1, timeout=2 * 3600)
+def reindex_search(batch_size: int = 1000, concurrency: int = 4) -> Dict[str, Any]:
+    """Rebuild the search index into a fresh index and swap it in."""
+    return reindex_service.run(
+        batch_size=batch_size,
+        concurrency=concurrency,
+        progress=lambda indexed, total, elapsed: job_queue.report_progress(reindex_service.status),
+    )
+
+
+@job_queue.job(
+    SEARCH_ROLLUP_JOB,
+    max_attempts=3,
+    timeout=1800,
+    every=settings.SEARCH_ROLLUP_INTERVAL_MINUTES * 60,
+)
+def rollup_searches() -> Dict[str, Any]:
+    """Fold new search_analytics rows into the hourly and daily rollups, a day at a time."""
+    upto = datetime.utcnow() - timedelta(minutes=settings.SEARCH_ROLLUP_LAG_MINUTES)
+    steps = 0
+    db = SessionLocal()
+    try:
+        while True:
+            watermark, caught_up = crud_search_analytics.rollup(db, upto=upto, max_span=timedelta(days=1))
+            steps += 1
+            if caught_up:
+                break
+    finally:
+        db.close()
+    return {"watermark": watermark, "steps": steps}
+
+
+@job_queue.job(PARTITIONS_JOB, max_attempts=3, timeout=600, every=6 * 3600)
+def maintain_partitions() -> Dict[str, Any]:
+    """
+    Create the coming months' log partitions and drop the ones past retention.
+    
+    Months that landed in the DEFAULT partition (worker was down, skewed
+    created_at) get their partition too, which moves their rows out of it.
+    """
+    this_month = partitions.month_start(datetime.utcnow())
+    retention = {
+        "search_analytics": settings.SEARCH_ANALYTICS_RETENTION_MONTHS,
+        "activity_logs": settings.ACTIVITY_LOG_RETENTION_MONTHS,
+    }
+    result: Dict[str, Any] = {}
+    db = SessionLocal()
+    try:
+        for table in partitions.PARTITIONED_TABLES:
+            created = partitions.create_partitions(
+                db, table, this_month, partitions.add_months(this_month, settings.PARTITION_MONTHS_AHEAD)
+            )
+            for month in partitions.default_partition_months(db, table):
+                created += partitions.create_partitions(db, table, month, month)
+            dropped = []
+            if retention[table]:
+                cutoff = partitions.add_months(this_month, -retention[table])
+                if table == "search_analytics":
+                    # Never drop searches the rollups have not counted yet
+                    oldest = crud_search_analytics.oldest_unrolled(db)
+                    if oldest:
+                        cutoff = min(cutoff, partitions.month_start(oldest))
+                if cutoff:
+                    dropped = partitions.drop_partitions_before(db, table, cutoff)
+            db.commit()
+            
+            if created or dropped:
+                logger.info(f"{table}: created partitions {created}, dropped {dropped}")
+            result[table] = {"created": created, "dropped": dropped}
+    finally:
+        db.close()
+    return result
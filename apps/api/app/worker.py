@@ -0,0 +1,116 @@
+"""
+Background job worker.
+
+Runs the jobs queued by the API (see app.core.jobs and app.services.tasks),
+the periodic jobs, the search outbox relay and the search tracking flusher,
+so API workers only serve requests. Any number of workers can run side by side.
+
+Usage:
+    docker-compose exec api python -m app.worker [--queues pois,search,default] [--concurrency 2]
+"""
+import argparse
+import logging
+import signal
+import threading
+from typing import List
+
+from app.core.config import settings
+from app.core.jobs import job_queue
+from app.services import tasks  # noqa: F401  (registers the job handlers)
+from app.services.meilisearch_service import meilisearch_service
+from app.services.search_analytics_service import search_analytics_flusher
+from app.services.search_sync_service import search_sync_service
+
+logger = logging.getLogger("app.worker")
+
+
+class Worker:
+    """Job threads plus a scheduler loop on the main thread."""
+    
+    def __init__(self, queues: List[str], concurrency: int, poll_seconds: float):
+        self.queues = queues
+        self.concurrency = concurrency
+        self.poll_seconds = poll_seconds
+        self._stop = threading.Event()
+    
+    def stop(self, *args):
+        logger.info("Stopping worker after the running jobs finish")
+        self._stop.set()
+    
+    def _run_jobs(self):
+        while not self._stop.is_set():
+            try:
+                job_id = job_queue.claim(self.queues)
+            except Exception as e:
+                logger.error(f"Could not claim a job: {e}")
+                job_id = None
+            
+            if job_id is None:
+                self._stop.wait(self.poll_seconds)
+                continue
+            
+            try:
+                job_queue.execute(job_id)
+            except Exception as e:
+                # Redis failed while recording the outcome; the lease expiry retries the job
+                logger.error(f"Job {job_id} could not be recorded: {e}")
+    
+    def _schedule(self):
+        """Promote due and retried jobs, recover lost ones and queue periodic jobs."""
+        try:
+            job_queue.promote_due()
+            recovered = job_queue.requeue_expired()
+            if recovered:
+                logger.warning(f"Recovered {recovered} jobs with expired leases")
+            for job_id in job_queue.enqueue_periodic():
+                logger.info(f"Queued periodic job {job_id}")
+        except Exception as e:
+            logger.error(f"Job scheduler error: {e}")
+    
+    def run(self):
+        threads = [
+            threading.Thread(target=self._run_jobs, name=f"job-worker-{i}", daemon=True)
+            for i in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        
+        logger.info(f"Worker started: queues {', '.join(self.queues)}, concurrency {self.concurrency}")
+        while not self._stop.is_set():
+            self._schedule()
+            self._stop.wait(self.poll_seconds)
+        
+        for thread in threads:
+            thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run background jobs")
+    parser.add_argument("--queues", default=settings.WORKER_QUEUES, help="Comma-separated, highest priority first")
+    parser.add_argument("--concurrency", type=int, default=settings.WORKER_CONCURRENCY)
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    
+    worker = Worker(
+        queues=[queue.strip() for queue in args.queues.split(",") if queue.strip()],
+        concurrency=args.concurrency,
+        poll_seconds=settings.WORKER_POLL_SECONDS,
+    )
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    
+    meilisearch_service.ensure_index(force=True)
+    if meilisearch_service.is_available() and settings.SEARCH_SYNC_ENABLED:
+        search_sync_service.start()
+    search_analytics_flusher.start()
+    
+    try:
+        worker.run()
+    finally:
+        search_sync_service.stop()
+        search_analytics_flusher.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -41,6 +41,7 @@ export interface Property {
   agent_id?: string;
   first_image?: string;
   location_name?: string;
+  distance_m?: number;  // Only on near_lat/near_lng searches
   images?: PropertyImage[];
   location?: Location;
   agent?: Agent;
@@ -144,7 +145,11 @@ export async function getProperties(params: {
   parking?: boolean;
   floor?: number;
   featured?: boolean;
-  sort_by?: string;
+  near_lat?: number;
+  near_lng?: number;
+  radius_m?: number;  // Requires near_lat/near_lng
+  polygon?: string;  // GeoJSON Polygon/MultiPolygon or ';'-separated encoded polylines
+  sort_by?: string;  // newest, price_asc, price_desc, walkability, distance
 }): Promise<PropertiesResponse> {
   const queryParams = new URLSearchParams();
   Object.entries(params).forEach(([key, value]) => {
@@ -164,6 +169,83 @@ export async function getProperties(params: {
   return res.json();
 }
 
+export interface PriceFacetBucket {
+  bucket: number;
+  min: number | null;
+  max: number | null;
+  count: number;
+}
+
+export interface LocationFacet {
+  id: string;
+  name_en: string;
+  name_ar: string;
+  slug_en: string;
+  slug_ar: string;
+  count: number;
+}
+
+export interface PropertyFacets {
+  total: number;
+  purpose: Record<string, number>;
+  type: Record<string, number>;
+  bedrooms: Record<string, number>;
+  furnished: Record<string, number>;
+  parking: Record<string, number>;
+  locations: LocationFacet[];
+  price: PriceFacetBucket[];
+}
+
+export async function getPropertyFacets(
+  params: Omit<Parameters<typeof getProperties>[0], 'page' | 'page_size' | 'sort_by'>
+): Promise<PropertyFacets> {
+  const queryParams = new URLSearchParams();
+  Object.entries(params).forEach(([key, value]) => {
+    if (value !== undefined && value !== null && value !== '') {
+      queryParams.append(key, value.toString());
+    }
+  });
+
+  const res = await fetch(`${API_URL}/api/public/properties/facets?${queryParams}`, {
+    next: { revalidate: 60 },
+  });
+  if (!res.ok) throw new Error('Failed to fetch property facets');
+  return res.json();
+}
+
+export interface MapCluster {
+  lat: number;
+  lng: number;
+  count: number;
+  min_price: number;
+  max_price: number;
+  id?: string;  // Only on single-listing clusters
+}
+
+export interface PropertyMapResponse {
+  zoom: number;
+  total: number;
+  clusters: MapCluster[];
+}
+
+export async function getPropertyMap(
+  params: Omit<Parameters<typeof getProperties>[0], 'page' | 'page_size' | 'sort_by'> & {
+    bbox: [number, number, number, number];  // west, south, east, north
+    zoom: number;
+  }
+): Promise<PropertyMapResponse> {
+  const queryParams = new URLSearchParams();
+  Object.entries(params).forEach(([key, value]) => {
+    if (value !== undefined && value !== null && value !== '') {
+      queryParams.append(key, Array.isArray(value) ? value.join(',') : value.toString());
+    }
+  });
+
+  const res = await fetch(`${API_URL}/api/public/properties/map?${queryParams}`);
+  if (!res.ok) throw new Error('Failed to fetch property map');
+  return res.json();
+}
+
 export async function getPropertiesByIds(ids: string[]): Promise<Property[]> {
   const params = new URLSearchParams();
   // Fetch properties by making multiple requests or using a single request with filters